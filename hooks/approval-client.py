@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Thin PreToolUse hook client for the approval daemon.
+
+Forwards the hook payload to approval_daemon.py over a Unix domain socket and
+prints its decision. If the daemon is not running it is started in the
+background and this call is answered in-process, so no request ever waits on
+daemon startup.
+
+Usage (in hooks.json):
+    python3 -S ${CLAUDE_PLUGIN_ROOT}/hooks/approval-client.py <policy>
+
+Policies: rag-memory, gitlab, atlassian, google-drive
+
+The fast path deliberately imports nothing beyond _socket: interpreter startup
+and module imports are the whole cost of a hook call, and `-S` skips site.
+
+If the daemon fails or gives no valid reply, the call is answered in-process
+from a copy of the payload, and if that fails too the hook asks for approval:
+a hook error would otherwise let the call through unprompted.
+"""
+import _socket
+import os
+import sys
+
+# Payload bytes copied in memory before the copy moves to a temporary file
+SPOOL_BYTES = 1024 * 1024
+
+# Environment read while evaluating a call (mirrors approval_daemon.REQUEST_ENV)
+REQUEST_ENV = (b"DEVFLOW_HOOK_POLICY", b"DEVFLOW_HOOK_APPROVAL_CACHE", b"DEVFLOW_HOOK_AUDIT",
+               b"DEVFLOW_HOOK_AUDIT_DIR", b"XDG_CACHE_HOME", b"XDG_STATE_HOME", b"HOME")
+
+
+def request_env():
+    """Return the REQUEST_ENV values for the request header (mirrors approval_daemon.request_env)."""
+    return b"\0".join(os.environb.get(key, b"") for key in REQUEST_ENV)
+
+
+def env_key(env):
+    """64-bit FNV-1a digest of request_env() (mirrors approval_daemon.env_key)."""
+    digest = 0xcbf29ce484222325
+    for byte in env:
+        digest = ((digest ^ byte) * 0x100000001b3) & 0xffffffffffffffff
+    return f"{digest:016x}"
+
+
+def socket_path(env):
+    """Return the per-user, per-environment socket path (mirrors approval_daemon.socket_path)."""
+    override = os.environ.get("DEVFLOW_HOOK_SOCKET")
+    if override:
+        return override
+    key = env_key(env)
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"devflow-hooks-{key}.sock")
+    tmp_dir = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(tmp_dir, f"devflow-hooks-{os.getuid()}", f"hooks-{key}.sock")
+
+
+def connect(env):
+    """Return a socket connected to the daemon, or None if it is not running."""
+    path = socket_path(env)
+    try:
+        # Only trust a socket created by this user
+        if os.stat(path).st_uid != os.getuid():
+            return None
+        client = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+        client.settimeout(5)
+        client.connect(path)
+    except OSError:
+        return None
+    return client
+
+
+class Replay:
+    """
+    A copy of the payload streamed to the daemon, so it can be answered
+    in-process if the daemon fails mid-request. The first SPOOL_BYTES stay in
+    memory; beyond that the copy moves to an unlinked temporary file, keeping
+    memory flat for large payloads.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+        self.fd = None
+
+    def write(self, chunk):
+        if self.fd is None and self.size + len(chunk) > SPOOL_BYTES:
+            self.fd = _spool_file()
+            if self.fd is not None:
+                for pending in self.chunks:
+                    _write_all(self.fd, pending)
+                self.chunks = []
+        if self.fd is None:
+            self.chunks.append(chunk)
+        else:
+            _write_all(self.fd, chunk)
+        self.size += len(chunk)
+
+    def stream(self, rest):
+        """Return a binary stream of the copied bytes followed by the unread rest of stdin."""
+        while True:
+            chunk = rest.read(65536)
+            if not chunk:
+                break
+            self.write(chunk)
+        if self.fd is None:
+            import io
+            return io.BytesIO(b"".join(self.chunks))
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        return os.fdopen(self.fd, "rb")
+
+
+def _spool_file():
+    """An anonymous temporary file descriptor, or None to keep the copy in memory."""
+    try:
+        return os.open(os.environ.get("TMPDIR") or "/tmp", os.O_TMPFILE | os.O_RDWR, 0o600)
+    except (AttributeError, OSError):
+        return None
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def ask_daemon(client, policy, env, stream, replay):
+    """Stream the payload to the daemon, copying it into replay, and return the reply."""
+    try:
+        try:
+            client.sendall(b"%s %d\n%s" % (policy.encode(), len(env), env))
+            while True:
+                chunk = stream.read(65536)
+                if not chunk:
+                    break
+                replay.write(chunk)
+                client.sendall(chunk)
+            client.shutdown(_socket.SHUT_WR)
+        except BrokenPipeError:
+            # The daemon answered early (e.g. an error) and closed; read that answer
+            pass
+        chunks = []
+        while True:
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        client.close()
+    return b"".join(chunks)
+
+
+def reply_error(reply):
+    """Describe why a daemon reply is not a hook output, or return None if it is one."""
+    if reply.startswith(b'{"hookSpecificOutput"'):
+        return None
+    if not reply:
+        return "daemon closed the connection without a reply"
+    if reply.startswith(b'{"error"'):
+        import json
+        try:
+            return f"daemon error: {json.loads(reply)['error']}"
+        except (ValueError, KeyError, TypeError):
+            pass
+    return f"unexpected daemon reply: {reply[:200]!r}"
+
+
+def answer_in_process(policy, stream, start_daemon=False):
+    """
+    Evaluate the payload here, as the <policy>-approval.py hook would. If even
+    that fails, fail closed with an "ask" decision.
+    """
+    emitted = []
+
+    def emit(text):
+        print(text, flush=True)
+        emitted.append(text)
+
+    sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+    try:
+        import approval_daemon
+        if start_daemon:
+            try:
+                approval_daemon.start_daemon()
+            except OSError:
+                pass
+        approval_daemon.run_in_process(policy, stream, emit)
+    except Exception as e:
+        print(f"approval-client: in-process evaluation failed: {e}", file=sys.stderr)
+        if not emitted:
+            import json
+            from hook_policy import policy_error_output
+            print(json.dumps(policy_error_output(e)), flush=True)
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: approval-client.py <policy>", file=sys.stderr)
+        sys.exit(1)
+
+    policy = sys.argv[1]
+
+    env = request_env()
+    client = connect(env)
+    if client is not None:
+        replay = Replay()
+        try:
+            reply = ask_daemon(client, policy, env, sys.stdin.buffer, replay)
+            error = reply_error(reply)
+        except OSError as e:
+            error = f"daemon request failed: {e}"
+        if error is None:
+            sys.stdout.buffer.write(reply + b"\n")
+            sys.exit(0)
+        # Never let a daemon failure skip the prompt: answer from the copy instead
+        print(f"approval-client: {error}; answering in-process", file=sys.stderr)
+        answer_in_process(policy, replay.stream(sys.stdin.buffer))
+        sys.exit(0)
+
+    # Slow path: start the daemon for next time and answer in-process
+    answer_in_process(policy, sys.stdin.buffer, start_daemon=True)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
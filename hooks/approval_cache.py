@@ -0,0 +1,113 @@
+"""
+Session-scoped approval memoization for the PreToolUse hooks.
+
+A PreToolUse hook cannot see whether the user approved its prompt, so
+approvals are recorded afterwards: record-approval.py runs on PostToolUse and
+PostToolUseFailure (the tool ran, so the prompt was approved) and stores a
+fingerprint of the call. An identical call in the same session within the TTL
+is then allowed without asking again.
+
+Fingerprints are SHA-256 over the session id, tool name and canonicalized
+tool_input. Entries live in a small JSON store shared by all hook processes,
+guarded by an flock, bounded by an LRU limit. Destructive operations are never
+recorded or matched.
+
+Enable with "approval_cache": {"enabled": true} in approval-policy.json, or
+DEVFLOW_HOOK_APPROVAL_CACHE=1 (0 forces it off).
+"""
+import fcntl
+import hashlib
+import json
+import os
+import time
+
+from payload_reader import TruncatedString
+
+
+def _canonical(value):
+    """Replace truncated payload strings with their size and content hash."""
+    if isinstance(value, TruncatedString):
+        return {"$truncated": [value.size, value.sha256]}
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def fingerprint(session_id, tool_name, tool_input):
+    """Return a stable hash of a tool call within a session."""
+    canonical = json.dumps(
+        [session_id or "", tool_name, _canonical(tool_input)],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ApprovalCache:
+    """On-disk fingerprint store with TTL, LRU bound and file locking."""
+
+    def __init__(self, directory, ttl_seconds, max_entries):
+        self.path = os.path.join(directory, "approvals.json")
+        self.lock_path = self.path + ".lock"
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+
+    def _locked(self):
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        lock = open(self.lock_path, "a")
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        return lock
+
+    def _read(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+    def _prune(self, entries, now):
+        """Drop expired entries, then least recently used ones over the limit."""
+        live = {fp: e for fp, e in entries.items() if now - e[0] < self.ttl}
+        if len(live) > self.max_entries:
+            keep = sorted(live, key=lambda fp: live[fp][1], reverse=True)[:self.max_entries]
+            live = {fp: live[fp] for fp in keep}
+        return live
+
+    def check(self, fp):
+        """Return True if fp was approved within the TTL, refreshing its LRU slot."""
+        # Lock-free miss path: most calls are not repeats
+        if fp not in self._read():
+            return False
+        now = time.time()
+        with self._locked():
+            entries = self._read()
+            entry = entries.get(fp)
+            if entry is None or now - entry[0] >= self.ttl:
+                return False
+            entry[1] = now
+            self._write(self._prune(entries, now))
+        return True
+
+    def record(self, fp):
+        """Record an approved fingerprint; the TTL starts now."""
+        now = time.time()
+        with self._locked():
+            entries = self._read()
+            entries[fp] = [now, now]
+            self._write(self._prune(entries, now))
+
+    def clear(self):
+        with self._locked():
+            self._write({})
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Long-lived approval hook server.
+
+Holds the compiled approval policy (rag-memory, gitlab, atlassian and
+google-drive groups from approval-policy.json) in memory and answers
+PreToolUse requests over a Unix domain socket, so a protected MCP call
+costs one socket round trip instead of a full hook script run. It is started
+on demand by approval-client.py and exits on its own after an idle timeout. Each connection is answered on its own thread, so a slow
+probe (a directory scan) does not hold up other hook calls.
+
+The socket name carries a digest of the environment that changes how a call
+is evaluated (REQUEST_ENV: policy file, cache, audit and state locations), so
+sessions with different settings get different daemons, and every request
+repeats those values so a daemon never answers for an environment it was not
+started with.
+
+Usage:
+    approval_daemon.py serve [--idle-timeout SECONDS]
+    approval_daemon.py status
+    approval_daemon.py stop
+
+Wire protocol (one request per connection):
+    client -> server: "<policy> <N>\\n", N bytes of REQUEST_ENV values (NUL
+                      separated), the raw PreToolUse JSON, then EOF
+    server -> client: the hook output JSON, or {"error": "<message>"} if the
+                      request failed (the client then answers in-process)
+
+Environment:
+    DEVFLOW_HOOK_SOCKET        Socket path override
+    DEVFLOW_HOOK_IDLE_TIMEOUT  Seconds of inactivity before exit (default 900)
+"""
+import _thread
+import fcntl
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import devflow_trace
+import hook_policy
+from devflow_trace import span
+from payload_reader import read_payload_with_size
+
+DEFAULT_IDLE_TIMEOUT = 900
+# Wake-up interval for flushing batched audit records while idle
+FLUSH_INTERVAL = 1.0
+# Upper bound on the environment block of a request header
+MAX_ENV_BYTES = 65536
+
+# Environment read while evaluating a call (mirrored in approval-client.py)
+REQUEST_ENV = (b"DEVFLOW_HOOK_POLICY", b"DEVFLOW_HOOK_APPROVAL_CACHE", b"DEVFLOW_HOOK_AUDIT",
+               b"DEVFLOW_HOOK_AUDIT_DIR", b"XDG_CACHE_HOME", b"XDG_STATE_HOME", b"HOME")
+
+# AuditLog buffers are shared by the request threads
+_audit_lock = _thread.allocate_lock()
+
+ALLOW_OUTPUT = json.dumps({
+    "hookSpecificOutput": {
+        "hookEventName": "PreToolUse",
+        "permissionDecision": "allow"
+    }
+})
+
+
+def request_env():
+    """Return the REQUEST_ENV values as sent in a request header (mirrored in approval-client.py)."""
+    return b"\0".join(os.environb.get(key, b"") for key in REQUEST_ENV)
+
+
+def env_key(env):
+    """64-bit FNV-1a digest of request_env() (mirrored in approval-client.py)."""
+    digest = 0xcbf29ce484222325
+    for byte in env:
+        digest = ((digest ^ byte) * 0x100000001b3) & 0xffffffffffffffff
+    return f"{digest:016x}"
+
+
+def socket_path():
+    """Return the per-user, per-environment socket path (mirrored in approval-client.py)."""
+    override = os.environ.get("DEVFLOW_HOOK_SOCKET")
+    if override:
+        return override
+    key = env_key(request_env())
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, f"devflow-hooks-{key}.sock")
+    tmp_dir = os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(tmp_dir, f"devflow-hooks-{os.getuid()}", f"hooks-{key}.sock")
+
+
+def evaluate_stream(table, name, stream, emit):
+    """
+    Evaluate a PreToolUse payload read from a binary stream against one policy
+    group and pass the output JSON to emit().
+    """
+    clock = time.perf_counter
+    started = clock()
+    try:
+        with span("parse", "hook") as trace:
+            input_data, size = read_payload_with_size(stream)
+            trace.set(bytes=size)
+    except ValueError:
+        emit(ALLOW_OUTPUT)
+        return
+    parsed = clock()
+
+    timings = {}
+    tools = table["groups"].get(name, {})
+    output = hook_policy.evaluate(tools, input_data, hook_policy.approval_cache_for(table), timings)
+    formatting = clock()
+    with span("emit", "hook"):
+        text = json.dumps(output)
+        emitting = clock()
+        emit(text)
+        emitted = clock()
+
+    log = hook_policy.audit_log_for(table)
+    if log is not None:
+        timings["parse"] = parsed - started
+        timings["format"] = timings.get("format", 0.0) + emitting - formatting
+        timings["emit"] = emitted - emitting
+        with _audit_lock:
+            hook_policy.audit_decision(log, tools, input_data, size, output, timings)
+
+
+def run_in_process(name, stream, emit):
+    """Evaluate a PreToolUse payload without the daemon."""
+    try:
+        table = hook_policy.load_table()
+    except (OSError, hook_policy.PolicyError) as e:
+        emit(json.dumps(hook_policy.policy_error_output(e)))
+        return
+    evaluate_stream(table, name, stream, emit)
+    hook_policy.flush_audit_logs()
+
+
+class PolicyCache:
+    """The compiled policy table, reloaded when the policy file changes."""
+
+    def __init__(self):
+        self._stamp = None
+        self._table = None
+        self._lock = _thread.allocate_lock()
+
+    def get(self):
+        st = os.stat(hook_policy.policy_path())
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                self._table = hook_policy.load_table()
+                self._stamp = stamp
+            return self._table
+
+
+def _read_all(conn):
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def handle(conn, policies, env):
+    """Serve one connection. Returns False when the server should stop."""
+    conn.settimeout(5)
+    stream = conn.makefile("rb")
+    header = stream.readline(256).decode("ascii", "replace").split()
+    name = header[0] if header else ""
+
+    if name == "!stop":
+        conn.sendall(b"stopping")
+        return False
+    if name == "!ping":
+        table = policies.get()
+        conn.sendall(json.dumps({"pid": os.getpid(), "policies": sorted(table["groups"])}).encode())
+        return True
+
+    size = int(header[1]) if len(header) == 2 and header[1].isdigit() else -1
+    if not 0 <= size <= MAX_ENV_BYTES or stream.read(size) != env:
+        conn.sendall(json.dumps({"error": "request environment differs from the daemon's"}).encode())
+        return True
+
+    try:
+        table = policies.get()
+    except (OSError, hook_policy.PolicyError) as e:
+        conn.sendall(json.dumps(hook_policy.policy_error_output(e)).encode())
+        return True
+    if name not in table["groups"]:
+        conn.sendall(json.dumps({"error": f"no policy '{name}'"}).encode())
+        return True
+
+    sent = []
+
+    def emit(text):
+        conn.sendall(text.encode())
+        sent.append(True)
+
+    try:
+        evaluate_stream(table, name, stream, emit)
+    except Exception as e:
+        if not sent:
+            conn.sendall(json.dumps({"error": f"{type(e).__name__}: {e}"}).encode())
+        raise
+    return True
+
+
+def serve(idle_timeout):
+    """Bind the socket and answer requests until idle or stopped."""
+    path = socket_path()
+    directory = os.path.dirname(path)
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    # One daemon per socket: losers of the startup race exit quietly
+    lock_file = open(path + ".lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return 0
+
+    if os.path.exists(path):
+        os.unlink(path)
+
+    env = request_env()
+    policies = PolicyCache()
+    policies.get()
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(old_umask)
+    server.listen(64)
+    server.settimeout(min(idle_timeout, FLUSH_INTERVAL))
+
+    # Imported here: the in-process fallback imports this module too
+    import threading
+    stopping = threading.Event()
+    state_lock = threading.Lock()
+    state = {"active": 0, "last_request": time.monotonic()}
+
+    def worker(conn):
+        with conn, span("request", "daemon"):
+            try:
+                if not handle(conn, policies, env):
+                    stopping.set()
+                    _wake(path)
+            except Exception as e:
+                print(f"approval_daemon: request failed: {e}", file=sys.stderr)
+        with state_lock:
+            state["active"] -= 1
+            state["last_request"] = time.monotonic()
+
+    workers = []
+    try:
+        while not stopping.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                _flush_audit_logs(due_only=True)
+                with state_lock:
+                    idle = not state["active"] and time.monotonic() - state["last_request"] >= idle_timeout
+                if idle:
+                    break
+                continue
+            if stopping.is_set():
+                conn.close()
+                break
+            with state_lock:
+                state["active"] += 1
+            thread = threading.Thread(target=worker, args=(conn,), daemon=True)
+            thread.start()
+            workers = [t for t in workers if t.is_alive()]
+            workers.append(thread)
+            _flush_audit_logs(due_only=True)
+            devflow_trace.flush()
+    finally:
+        server.close()
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        # In-flight requests are bounded by their socket timeout
+        for thread in workers:
+            thread.join(10)
+        _flush_audit_logs()
+        devflow_trace.flush()
+        lock_file.close()
+    return 0
+
+
+def _flush_audit_logs(due_only=False):
+    with _audit_lock:
+        hook_policy.flush_audit_logs(due_only)
+
+
+def _wake(path):
+    """Unblock the accept loop so it notices a stop request."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(1)
+            client.connect(path)
+    except OSError:
+        pass
+
+
+def start_daemon():
+    """Spawn a detached daemon process; returns immediately."""
+    subprocess.Popen(
+        [sys.executable, str(Path(__file__).resolve()), "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def send_control(command):
+    """Send a control message to a running daemon and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(2)
+        client.connect(socket_path())
+        client.sendall(command.encode() + b"\n")
+        client.shutdown(socket.SHUT_WR)
+        return _read_all(client).decode()
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("serve", "status", "stop"):
+        print("Usage: approval_daemon.py serve [--idle-timeout SECONDS]")
+        print("       approval_daemon.py status")
+        print("       approval_daemon.py stop")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "serve":
+        idle_timeout = float(os.environ.get("DEVFLOW_HOOK_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+        if len(sys.argv) == 4 and sys.argv[2] == "--idle-timeout":
+            idle_timeout = float(sys.argv[3])
+        sys.exit(serve(idle_timeout))
+
+    try:
+        reply = send_control("!ping" if command == "status" else "!stop")
+    except OSError:
+        print(f"Not running (socket: {socket_path()})")
+        sys.exit(1)
+
+    if command == "status":
+        info = json.loads(reply)
+        print(f"Running (pid {info['pid']}, socket: {socket_path()})")
+        print(f"Policies: {', '.join(info['policies'])}")
+    else:
+        print("Stopped")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
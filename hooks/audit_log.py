@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Append-only audit log of approval hook decisions.
+
+Every PreToolUse decision (from the hook scripts or the daemon) appends one
+line to ~/.local/state/devflow/audit/audit.jsonl. A line is a compact JSON
+array with the fields in FIELDS order:
+
+    [ts, total_ms, parse_ms, match_ms, format_ms, emit_ms, bytes,
+     decision, input_sha, tool, label]
+
+Records are written with O_APPEND in one write per flush, so concurrent hook
+processes never interleave partial lines. The active file is rotated to
+audit-<timestamp>.jsonl once it reaches max_bytes, keeping the newest `keep`
+segments. With fsync "batch", at most one fdatasync is issued per batch_ms
+across all writers; "always" syncs every flush and "never" leaves it to the
+kernel.
+
+Usage:
+    audit_log.py summary [--since 24h] [--tool SUBSTRING] [--dir DIR]
+    audit_log.py path
+
+Examples:
+    audit_log.py summary
+    audit_log.py summary --since 7d --tool gitlab
+
+Environment:
+    DEVFLOW_HOOK_AUDIT      1/0 to force the audit log on or off
+    DEVFLOW_HOOK_AUDIT_DIR  Log directory (default $XDG_STATE_HOME/devflow/audit)
+"""
+import fcntl
+import json
+import os
+import sys
+import time
+
+FIELDS = ("ts", "total_ms", "parse_ms", "match_ms", "format_ms", "emit_ms",
+          "bytes", "decision", "input_sha", "tool", "label")
+PHASES = ("parse", "match", "format", "emit")
+FSYNC_MODES = ("always", "batch", "never")
+
+ACTIVE = "audit.jsonl"
+SEGMENT_PREFIX = "audit-"
+
+
+def default_dir():
+    """Return the audit log directory."""
+    override = os.environ.get("DEVFLOW_HOOK_AUDIT_DIR")
+    if override:
+        return override
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "devflow", "audit")
+
+
+def segments(directory):
+    """Return the log files in a directory, oldest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    rotated = sorted(n for n in names if n.startswith(SEGMENT_PREFIX) and n.endswith(".jsonl"))
+    if ACTIVE in names:
+        rotated.append(ACTIVE)
+    return [os.path.join(directory, n) for n in rotated]
+
+
+class AuditLog:
+    """Buffered, size-rotated JSONL writer shared by all hook processes."""
+
+    def __init__(self, directory, max_bytes, keep, fsync="batch", batch_records=64, batch_ms=1000):
+        self.directory = directory
+        self.path = os.path.join(directory, ACTIVE)
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.fsync = fsync
+        self.batch_records = batch_records
+        self.batch_ms = batch_ms
+        self._pending = []
+        self._first_pending = 0.0
+
+    def append(self, record):
+        """Buffer one record (a FIELDS-ordered sequence); flushes when a batch is full."""
+        if not self._pending:
+            self._first_pending = time.monotonic()
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        self._pending.append(line.encode("utf-8") + b"\n")
+        if len(self._pending) >= self.batch_records:
+            self.flush()
+
+    def flush_if_due(self):
+        """Flush buffered records older than batch_ms (for long-lived writers)."""
+        if self._pending and (time.monotonic() - self._first_pending) * 1000 >= self.batch_ms:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records in a single append, rotating first if needed."""
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending = []
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            size = os.fstat(fd).st_size
+            if size and size + len(data) > self.max_bytes:
+                os.close(fd)
+                self._rotate(len(data))
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            os.write(fd, data)
+            if self.fsync == "always" or (self.fsync == "batch" and self._sync_due()):
+                os.fdatasync(fd)
+        finally:
+            os.close(fd)
+
+    def _sync_due(self):
+        """Group commit across processes: one fdatasync per batch_ms window."""
+        marker = self.path + ".synced"
+        now = time.time()
+        try:
+            if (now - os.stat(marker).st_mtime) * 1000 < self.batch_ms:
+                return False
+            os.utime(marker, (now, now))
+        except FileNotFoundError:
+            open(marker, "w").close()
+        return True
+
+    def _rotate(self, incoming):
+        with open(os.path.join(self.directory, "audit.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            # Another writer may have rotated while we waited for the lock
+            try:
+                size = os.stat(self.path).st_size
+            except FileNotFoundError:
+                return
+            if not size or size + incoming <= self.max_bytes:
+                return
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + f"{time.time_ns() % 10**9:09d}"
+            os.replace(self.path, os.path.join(self.directory, f"{SEGMENT_PREFIX}{stamp}.jsonl"))
+            rotated = segments(self.directory)[:-1] if os.path.exists(self.path) else segments(self.directory)
+            for old in rotated[:max(0, len(rotated) - self.keep)]:
+                try:
+                    os.unlink(old)
+                except FileNotFoundError:
+                    pass
+
+
+def make_record(tool_name, label, decision, size, tool_input, timings):
+    """Build a FIELDS-ordered record from a decision and its phase timings (seconds)."""
+    from approval_cache import fingerprint
+
+    phases = [round(timings.get(p, 0.0) * 1000, 2) for p in PHASES]
+    return [
+        round(time.time(), 3),
+        round(sum(phases), 2),
+        *phases,
+        size,
+        decision,
+        fingerprint(None, tool_name, tool_input)[:16],
+        tool_name,
+        label,
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Query
+# ---------------------------------------------------------------------------
+
+QUERY_BLOCK_BYTES = 2 * 1024 * 1024
+# Latency histograms kept by the query CLI
+SUMMARY_PHASES = ("total", "parse", "format")
+
+
+def _split_rows(lines):
+    """
+    Split log lines into 11 raw byte fields each.
+
+    Our own lines split cleanly on the first ten commas (only the label, which
+    comes last, may contain commas), which is several times faster than
+    json.loads. Anything else is re-encoded through the JSON parser so the
+    fields look the same. Returns (rows, malformed_count).
+    """
+    rows = [line.split(b",", 10) for line in lines]
+    if all(len(row) == 11 and row[9][-1:] == b'"' for row in rows):
+        return rows, 0
+    good = []
+    malformed = 0
+    for line, row in zip(lines, rows):
+        if len(row) == 11 and row[9][-1:] == b'"' and row[9][-2:] != b'\\"':
+            good.append(row)
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            malformed += 1
+            continue
+        if not isinstance(record, list) or len(record) != len(FIELDS):
+            malformed += 1
+            continue
+        good.append([json.dumps(v, ensure_ascii=False, separators=(",", ":")).encode() for v in record])
+    return good, malformed
+
+
+def _percentiles(counts, points=(50, 95, 99)):
+    """Percentiles plus the maximum from a {value: count} histogram."""
+    values = sorted((float(v), n) for v, n in counts.items())
+    total = sum(n for _, n in values)
+    result = []
+    for p in points:
+        rank = max(1, -(-total * p // 100))
+        seen = 0
+        for value, n in values:
+            seen += n
+            if seen >= rank:
+                result.append(value)
+                break
+    result.append(values[-1][0] if values else 0.0)
+    return result
+
+
+def summarize(paths, since=None, tool_filter=None):
+    """
+    Stream log files in fixed-size blocks and aggregate per tool.
+
+    Memory is bounded by the block size plus the number of distinct
+    (tool, latency) pairs, not by the number of lines: latencies are logged at
+    0.01 ms precision and counted in histograms, which also makes the
+    percentiles exact. Counting runs in C: columns are transposed with zip()
+    and counted with Counter.update, keyed on the raw JSON bytes of the tool
+    name joined to the value (the quotes keep the two apart).
+
+    Returns:
+        ({tool: {"decisions": {decision: n}, "bytes_max",
+                 "latency": {phase: {value: n}}}}, lines, malformed)
+    """
+    from collections import Counter
+
+    decisions = Counter()
+    latency = {phase: Counter() for phase in SUMMARY_PHASES}
+    bytes_max = {}
+    lines = malformed = 0
+    needle = json.dumps(tool_filter)[1:-1].encode() if tool_filter else None
+
+    def add(block):
+        nonlocal lines, malformed
+        raw = block.splitlines()
+        lines += len(raw)
+        rows, bad = _split_rows(raw)
+        malformed += bad
+        if since is not None:
+            rows = [row for row in rows if float(row[0].lstrip(b"[")) >= since]
+        if needle is not None:
+            rows = [row for row in rows if needle in row[9]]
+        if not rows:
+            return
+        _, total, parse, _, fmt, _, size, decision, _, tool, _ = zip(*rows)
+        join = b"".join
+        decisions.update(map(join, zip(decision, tool)))
+        for phase, column in zip(SUMMARY_PHASES, (total, parse, fmt)):
+            latency[phase].update(map(join, zip(tool, column)))
+        for name, value in zip(tool, map(int, size)):
+            if value > bytes_max.get(name, -1):
+                bytes_max[name] = value
+
+    for path in paths:
+        with open(path, "rb") as f:
+            tail = b""
+            while True:
+                block = f.read(QUERY_BLOCK_BYTES)
+                if not block:
+                    break
+                block = tail + block
+                cut = block.rfind(b"\n") + 1
+                tail = block[cut:]
+                add(block[:cut])
+            if tail.strip():
+                add(tail)
+
+    stats = {}
+    for key, n in decisions.items():
+        split = key.index(b'""') + 1
+        tool = key[split:]
+        entry = stats.setdefault(tool, {
+            "decisions": {}, "bytes_max": bytes_max.get(tool, 0),
+            "latency": {phase: {} for phase in latency},
+        })
+        entry["decisions"][json.loads(key[:split])] = n
+    for phase, counts in latency.items():
+        for key, n in counts.items():
+            split = key.rindex(b'"') + 1
+            stats[key[:split]]["latency"][phase][key[split:]] = n
+    return {json.loads(tool): entry for tool, entry in stats.items()}, lines, malformed
+
+
+def _parse_duration(text):
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    if text and text[-1] in units:
+        return float(text[:-1]) * units[text[-1]]
+    return float(text)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("summary", "path"):
+        print("Usage: audit_log.py summary [--since 24h] [--tool SUBSTRING] [--dir DIR]")
+        print("       audit_log.py path")
+        sys.exit(1)
+
+    options = {"--since": None, "--tool": None, "--dir": None}
+    args = sys.argv[2:]
+    while args:
+        flag = args.pop(0)
+        if flag not in options or not args:
+            print(f"❌ Unknown or incomplete option: {flag}")
+            sys.exit(1)
+        options[flag] = args.pop(0)
+
+    directory = options["--dir"] or default_dir()
+    if sys.argv[1] == "path":
+        print(directory)
+        sys.exit(0)
+
+    paths = segments(directory)
+    if not paths:
+        print(f"No audit log in {directory}")
+        sys.exit(0)
+
+    since = None
+    if options["--since"]:
+        try:
+            since = time.time() - _parse_duration(options["--since"])
+        except ValueError:
+            print(f"❌ Invalid duration: {options['--since']} (use e.g. 90s, 30m, 24h, 7d)")
+            sys.exit(1)
+
+    started = time.monotonic()
+    from hook_probes import format_bytes
+
+    stats, lines, malformed = summarize(paths, since, options["--tool"])
+    elapsed = time.monotonic() - started
+
+    print(f"{lines:,} records in {len(paths)} file(s), scanned in {elapsed:.1f}s"
+          + (f" ({malformed:,} malformed)" if malformed else ""))
+    print()
+    print(f"{'tool':<48} {'count':>9} {'ask':>8} {'allow':>8} {'deny':>6}"
+          f" {'p50':>7} {'p95':>7} {'p99':>7} {'max':>8}  {'parse p99':>9} {'format p99':>10} {'max payload':>11}")
+    for tool, entry in sorted(stats.items(), key=lambda item: -sum(item[1]["decisions"].values())):
+        d = entry["decisions"]
+        p50, p95, p99, peak = _percentiles(entry["latency"]["total"])
+        parse_p99 = _percentiles(entry["latency"]["parse"], (99,))[0]
+        format_p99 = _percentiles(entry["latency"]["format"], (99,))[0]
+        print(f"{tool:<48} {sum(d.values()):>9,} {d.get('ask', 0):>8,} {d.get('allow', 0):>8,}"
+              f" {d.get('deny', 0):>6,} {p50:>7.2f} {p95:>7.2f} {p99:>7.2f} {peak:>8.2f}"
+              f"  {parse_p99:>9.2f} {format_p99:>10.2f} {format_bytes(entry['bytes_max']):>11}")
+    print()
+    print("Latencies in ms, measured inside the hook (excludes interpreter startup).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Approval hook benchmark - measures how much time the PreToolUse hooks add.
+
+Drives every *-approval.py script in hooks/ and plugins/devflow/hooks/ with a
+realistic payload for each protected tool in approval-policy.json, plus
+unprotected pass-through calls, and reports:
+
+- cold start: wall time of a full `python3 <script>` run, per payload
+- phases: in-process time for stdin parse, match (lookup, rules, approval
+  cache) and format (prompt rendering, including file and directory probes)
+  as recorded by hook_policy.evaluate, and JSON emit, per payload
+
+File and directory tools point at a temporary fixture, so the file-preview and
+directory-scan probes do real work. The run uses a temporary XDG_CACHE_HOME and
+DEVFLOW_HOOK_AUDIT_DIR, so the approval cache, compiled policy and audit log of
+the user are never touched.
+
+Usage:
+    bench_hooks.py [--runs N] [--phase-runs N] [--save FILE]
+    bench_hooks.py compare <baseline.json> <current.json> [--threshold PCT]
+
+Examples:
+    bench_hooks.py --runs 50 --save baseline.json
+    bench_hooks.py --runs 50 --save current.json
+    bench_hooks.py compare baseline.json current.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import hook_policy
+from payload_reader import read_payload
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPT_DIRS = [REPO_ROOT / "hooks", REPO_ROOT / "plugins" / "devflow" / "hooks"]
+
+LONG_TEXT = (
+    "## Retrospective notes\n\n"
+    "The ingestion pipeline now batches embeddings per collection and retries "
+    "transient failures with exponential backoff. Follow-ups are tracked in the "
+    "backlog.\n"
+) * 40
+
+# Realistic tool_input values, keyed by tool name suffix
+SAMPLE_INPUTS = {
+    "create_collection": {"name": "team-notes", "description": "Team meeting notes", "domain": "engineering"},
+    "delete_collection": {"name": "scratch", "confirm": True},
+    "update_collection_metadata": {"collection_name": "team-notes", "new_fields": {"owner": "string"}},
+    "update_document": {"document_id": 4211, "content": LONG_TEXT, "title": "Sprint 42 retro"},
+    "delete_document": {"document_id": 4211},
+    "manage_collection_link": {"document_id": 4211, "collection_name": "archive", "unlink": False},
+    "ingest_text": {
+        "content": LONG_TEXT, "collection_name": "team-notes", "document_title": "Sprint 42 retro",
+        "topic": "retrospectives", "metadata": {"sprint": 42, "team": "platform"},
+    },
+    "ingest_url": {
+        "url": "https://docs.example.com/guide", "collection_name": "docs", "follow_links": True,
+        "max_pages": 25, "topic": "product docs",
+    },
+    "ingest_file": {"collection_name": "design", "topic": "architecture"},
+    "ingest_directory": {
+        "collection_name": "project-docs",
+        "file_extensions": [".md", ".txt"], "recursive": True,
+    },
+    "create_issue": {"project_id": "platform/api", "title": "Rate limit search endpoint", "description": LONG_TEXT},
+    "update_issue": {"project_id": "platform/api", "issue_iid": 118, "title": "Rate limit search endpoint", "labels": ["perf"]},
+    "delete_issue": {"project_id": "platform/api", "issue_iid": 118},
+    "create_merge_request": {
+        "project_id": "platform/api", "title": "Add search rate limiting", "source_branch": "feature/118-rate-limit",
+        "target_branch": "main", "description": LONG_TEXT,
+    },
+    "update_merge_request": {"project_id": "platform/api", "merge_request_iid": 57, "title": "Add search rate limiting"},
+    "create_note": {"project_id": "platform/api", "issue_iid": 118, "body": "Verified on staging, p99 is back under 200ms."},
+    "createConfluencePage": {"cloudId": "acme", "spaceId": "ENG", "title": "Search rate limiting", "body": LONG_TEXT},
+    "updateConfluencePage": {"cloudId": "acme", "pageId": "983041", "title": "Search rate limiting", "body": LONG_TEXT},
+    "createConfluenceFooterComment": {"cloudId": "acme", "pageId": "983041", "body": "Looks good to me."},
+    "createConfluenceInlineComment": {"cloudId": "acme", "pageId": "983041", "body": "Typo here.", "inlineCommentProperties": {"textSelection": "teh"}},
+    "createJiraIssue": {"cloudId": "acme", "projectKey": "PLAT", "issueTypeName": "Story", "summary": "Rate limit search", "description": LONG_TEXT},
+    "editJiraIssue": {"cloudId": "acme", "issueIdOrKey": "PLAT-118", "fields": {"summary": "Rate limit search endpoint"}},
+    "addCommentToJiraIssue": {"cloudId": "acme", "issueIdOrKey": "PLAT-118", "commentBody": "Deployed to staging."},
+    "transitionJiraIssue": {"cloudId": "acme", "issueIdOrKey": "PLAT-118", "transition": {"id": "31"}},
+    "addWorklogToJiraIssue": {"cloudId": "acme", "issueIdOrKey": "PLAT-118", "timeSpent": "2h"},
+    "upload_file": {"file_name": "Q3 report.pdf", "folder_id": "1AbCdEfGhIjKlMnOpQrStUvWxYz"},
+    "create_folder": {"folder_name": "Q3 Reports", "parent_folder_id": "1AbCdEfGhIjKlMnOpQrStUvWxYz"},
+}
+
+# Path arguments filled in with fixture paths: tool name suffix -> (key, path under the fixture)
+FIXTURE_PATHS = {
+    "ingest_file": ("file_path", "notes/design.md"),
+    "ingest_directory": ("directory_path", "project/docs"),
+    "upload_file": ("local_path", "reports/q3.pdf"),
+}
+# Shape of the fixture docs tree: directories x files per directory
+FIXTURE_DIRS = 10
+FIXTURE_FILES_PER_DIR = 20
+
+# Read-only calls that must pass straight through
+PASS_THROUGH = {
+    "rag-memory": ("mcp__rag-memory__search_documents", {"query": "rate limiting", "limit": 5}),
+    "gitlab": ("mcp__gitlab__get_issue", {"project_id": "platform/api", "issue_iid": 118}),
+    "atlassian": ("mcp__atlassian__getJiraIssue", {"cloudId": "acme", "issueIdOrKey": "PLAT-118"}),
+    "google-drive": ("mcp__google-drive__search_files", {"query": "Q3 report"}),
+}
+
+
+def percentiles(samples):
+    """Return p50/p95/p99/mean/min for a list of samples (milliseconds)."""
+    ordered = sorted(samples)
+    n = len(ordered)
+
+    def pick(q):
+        return ordered[min(n - 1, int(round(q * (n - 1))))]
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "mean": sum(ordered) / n,
+        "min": ordered[0],
+    }
+
+
+def make_fixture(root):
+    """Create the files FIXTURE_PATHS point at: a note, a docs tree and a binary report."""
+    root = Path(root)
+    (root / "notes").mkdir()
+    (root / "notes" / "design.md").write_text(LONG_TEXT)
+    for d in range(FIXTURE_DIRS):
+        directory = root / "project" / "docs" / f"section-{d}"
+        directory.mkdir(parents=True)
+        for f in range(FIXTURE_FILES_PER_DIR):
+            suffix = (".md", ".txt", ".png")[f % 3]
+            (directory / f"page-{f}{suffix}").write_text(LONG_TEXT[:(f + 1) * 200])
+    (root / "reports").mkdir()
+    (root / "reports" / "q3.pdf").write_bytes(os.urandom(256 * 1024))
+
+
+def build_payloads(table, fixture):
+    """Return [(group, tool_name, payload_json)] for every protected and pass-through tool."""
+    payloads = []
+    for group, tools in table["groups"].items():
+        for tool_name in tools:
+            suffix = tool_name.rsplit("__", 1)[-1]
+            tool_input = dict(SAMPLE_INPUTS.get(suffix, {"id": "123"}))
+            if suffix in FIXTURE_PATHS:
+                key, relpath = FIXTURE_PATHS[suffix]
+                tool_input[key] = os.path.join(fixture, relpath)
+            payloads.append((group, tool_name, json.dumps({
+                "session_id": "bench",
+                "hook_event_name": "PreToolUse",
+                "cwd": fixture,
+                "tool_name": tool_name,
+                "tool_input": tool_input,
+            })))
+        if group in PASS_THROUGH:
+            tool_name, tool_input = PASS_THROUGH[group]
+            payloads.append((group, tool_name, json.dumps({
+                "session_id": "bench",
+                "hook_event_name": "PreToolUse",
+                "cwd": fixture,
+                "tool_name": tool_name,
+                "tool_input": tool_input,
+            })))
+    return payloads
+
+
+def discover_scripts():
+    """Return {group: [script paths]} for hooks/ and the plugin's hooks/ directory."""
+    scripts = {}
+    for directory in SCRIPT_DIRS:
+        for script in sorted(directory.glob("*-approval.py")):
+            group = script.name[:-len("-approval.py")]
+            scripts.setdefault(group, []).append(script)
+    return scripts
+
+
+def bench_cold_start(script, payload, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, str(script)], input=payload.encode(), capture_output=True)
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise RuntimeError(f"{script} failed: {result.stderr.decode(errors='replace')}")
+    return percentiles(samples)
+
+
+def bench_phases(tools, payload, runs, cache=None):
+    """Time each hook phase in-process; match and format are the phases hook_policy.evaluate records."""
+    phases = {"parse": [], "match": [], "format": [], "emit": []}
+    clock = time.perf_counter
+    for _ in range(runs):
+        t0 = clock()
+        input_data = read_payload(io.BytesIO(payload.encode()))
+        t1 = clock()
+        timings = {}
+        output = hook_policy.evaluate(tools, input_data, cache, timings)
+        t2 = clock()
+        json.dumps(output)
+        t3 = clock()
+        phases["parse"].append((t1 - t0) * 1000)
+        phases["match"].append(timings["match"] * 1000)
+        phases["format"].append(timings.get("format", 0.0) * 1000)
+        phases["emit"].append((t3 - t2) * 1000)
+    return {name: percentiles(samples) for name, samples in phases.items()}
+
+
+def run_benchmark(runs, phase_runs):
+    with tempfile.TemporaryDirectory(prefix="bench-hooks-") as scratch:
+        # Keep the user's approval cache, compiled policy and audit log out of it
+        # (the hook subprocesses inherit these)
+        os.environ["XDG_CACHE_HOME"] = os.path.join(scratch, "cache")
+        os.environ["DEVFLOW_HOOK_AUDIT_DIR"] = os.path.join(scratch, "audit")
+        fixture = os.path.join(scratch, "fixture")
+        os.mkdir(fixture)
+        make_fixture(fixture)
+        return _run_benchmark(runs, phase_runs, fixture)
+
+
+def _run_benchmark(runs, phase_runs, fixture):
+    table = hook_policy.load_table()
+    cache = hook_policy.approval_cache_for(table)
+    payloads = build_payloads(table, fixture)
+    scripts = discover_scripts()
+    results = []
+
+    for group, tool_name, payload in payloads:
+        tools = table["groups"].get(group, {})
+        phases = bench_phases(tools, payload, phase_runs, cache)
+        for script in scripts.get(group, []):
+            cold = bench_cold_start(script, payload, runs)
+            results.append({
+                "script": str(script.relative_to(REPO_ROOT)),
+                "tool": tool_name,
+                "protected": tool_name in tools,
+                "payload_bytes": len(payload),
+                "cold_start_ms": cold,
+                "phases_ms": phases,
+            })
+            print(
+                f"  {results[-1]['script']:<45} {tool_name:<48} "
+                f"p50 {cold['p50']:6.1f}  p95 {cold['p95']:6.1f}  p99 {cold['p99']:6.1f} ms"
+            )
+
+    # Interpreter floor: what any python3 hook pays before running a line
+    floor = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], capture_output=True)
+        floor.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": runs,
+            "phase_runs": phase_runs,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "interpreter_floor_ms": percentiles(floor),
+        "results": results,
+    }
+
+
+def print_summary(report):
+    floor = report["interpreter_floor_ms"]
+    print(f"\nInterpreter floor (python3 -c pass): p50 {floor['p50']:.1f} ms  p99 {floor['p99']:.1f} ms")
+    print("\nPer-phase p50 / p99 (µs), first script per tool:")
+    seen = set()
+    for row in report["results"]:
+        if row["tool"] in seen:
+            continue
+        seen.add(row["tool"])
+        phases = "  ".join(
+            f"{name} {stats['p50'] * 1000:6.1f}/{stats['p99'] * 1000:6.1f}"
+            for name, stats in row["phases_ms"].items()
+        )
+        print(f"  {row['tool']:<48} {phases}")
+
+
+def compare(baseline_file, current_file, threshold):
+    """Print per-script/tool deltas and return the number of regressions."""
+    baseline = json.loads(Path(baseline_file).read_text())
+    current = json.loads(Path(current_file).read_text())
+    previous = {(r["script"], r["tool"]): r for r in baseline["results"]}
+
+    regressions = 0
+    print(f"{'script':<45} {'tool':<48} {'p50 base':>9} {'p50 now':>9} {'p99 base':>9} {'p99 now':>9}")
+    for row in current["results"]:
+        base = previous.get((row["script"], row["tool"]))
+        if base is None:
+            continue
+        flags = []
+        for q in ("p50", "p99"):
+            before = base["cold_start_ms"][q]
+            after = row["cold_start_ms"][q]
+            if before and (after - before) / before * 100 > threshold:
+                flags.append(q)
+        marker = f"  ⚠️ regression ({', '.join(flags)})" if flags else ""
+        regressions += bool(flags)
+        print(
+            f"{row['script']:<45} {row['tool']:<48} "
+            f"{base['cold_start_ms']['p50']:9.1f} {row['cold_start_ms']['p50']:9.1f} "
+            f"{base['cold_start_ms']['p99']:9.1f} {row['cold_start_ms']['p99']:9.1f}{marker}"
+        )
+    return regressions
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "compare":
+        parser = argparse.ArgumentParser(prog="bench_hooks.py compare")
+        parser.add_argument("baseline")
+        parser.add_argument("current")
+        parser.add_argument("--threshold", type=float, default=15.0,
+                            help="percent slowdown that counts as a regression (default 15)")
+        args = parser.parse_args(sys.argv[2:])
+        regressions = compare(args.baseline, args.current, args.threshold)
+        if regressions:
+            print(f"\n❌ {regressions} regression(s) above {args.threshold:.0f}%")
+            sys.exit(1)
+        print("\n✅ No regressions")
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark the approval hooks.")
+    parser.add_argument("--runs", type=int, default=20, help="cold-start runs per payload (default 20)")
+    parser.add_argument("--phase-runs", type=int, default=2000, help="in-process runs per payload (default 2000)")
+    parser.add_argument("--save", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    print(f"⏱️  Benchmarking approval hooks ({args.runs} cold runs per payload)\n")
+    report = run_benchmark(args.runs, args.phase_runs)
+    print_summary(report)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(report, indent=2))
+        print(f"\n✅ Saved report to: {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+hooks.json compiler - generates the approval hook matchers from approval-policy.json.
+
+Every group in the policy has a `<group>-approval.py` entry point. This writes
+one PreToolUse matcher per group, an anchored alternation of exactly the
+tools in its table, so each tool call is tested against one pattern per hook
+script instead of one per tool. When the approval cache is enabled (in the
+policy, or with DEVFLOW_HOOK_APPROVAL_CACHE set when this runs), it also
+writes one PostToolUse and one PostToolUseFailure matcher for
+record-approval.py, covering every non-destructive tool (destructive calls
+are never recorded). Otherwise no record-approval.py hooks are written, so a
+protected call does not start a second Python process for nothing.
+
+A group's existing command is kept, so a hook routed through
+approval-client.py stays routed through it. Hooks for other scripts are left
+as they are.
+
+With --check nothing is written. Every mismatch between the tables and the
+current matchers is reported as an error:
+- a matcher that sends a tool to a script whose table does not list it
+- a tool in a table that no matcher sends to its script
+- a wildcard matcher, which can send tools the policy does not list
+- a group without an entry point, or an entry point for an unknown group
+- record-approval.py hooks while the approval cache is disabled
+The exit status is 1 if there are errors or the file is not what would be
+generated, so the check can run in CI.
+
+Usage:
+    build_hooks.py [--check] [--policy FILE] [--hooks FILE]
+
+Examples:
+    build_hooks.py
+    build_hooks.py --check
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+from hook_policy import HOOKS_DIR, PolicyError, approval_cache_enabled, compile_policy, policy_path
+
+DEFAULT_HOOKS_JSON = os.path.join(os.path.dirname(HOOKS_DIR), "plugins", "devflow", "hooks", "hooks.json")
+PLUGIN_ROOT = "${CLAUDE_PLUGIN_ROOT}"
+RECORD_EVENTS = ("PostToolUse", "PostToolUseFailure")
+
+# Tool names are emitted into regexes as literals
+_LITERAL_NAME = re.compile(r"^[\w-]+$")
+_GROUP_SCRIPT = re.compile(r"(?:^|/)([\w-]+)-approval\.py\b")
+_CLIENT = re.compile(r"approval-client\.py\s+([\w-]+)")
+_RECORD_SCRIPT = re.compile(r"(?:^|/)record-approval\.py\b")
+_RUN_HOOK = re.compile(r"run_hook\(\s*[\"']([\w-]+)[\"']\s*\)")
+# Above this many expansions a matcher is reported as uncheckable
+MAX_EXPANSIONS = 4096
+
+
+def command_owner(command):
+    """Return ("group", name), ("record", None) or None for a hook command."""
+    match = _CLIENT.search(command)
+    if match:
+        return "group", match.group(1)
+    if _RECORD_SCRIPT.search(command):
+        return "record", None
+    match = _GROUP_SCRIPT.search(command)
+    if match and match.group(1) != "record":
+        return "group", match.group(1)
+    return None
+
+
+def block_owner(block):
+    """The owner shared by every command of a hooks.json block, or None."""
+    owners = {command_owner(hook.get("command", "")) for hook in block.get("hooks", [])}
+    return owners.pop() if len(owners) == 1 else None
+
+
+# ---------------------------------------------------------------------------
+# Generation
+# ---------------------------------------------------------------------------
+
+def tools_matcher(names):
+    """
+    Return an anchored regex matching exactly the given tool names.
+
+    MCP tools are grouped by server, e.g. ^mcp__gitlab__(create_issue|create_note)$.
+    """
+    servers = {}
+    for name in names:
+        if not _LITERAL_NAME.match(name):
+            raise PolicyError(f"{name}: tool names must be letters, digits, '_' or '-' to be matched")
+        server, sep, tool = name[5:].partition("__") if name.startswith("mcp__") else ("", "", "")
+        if sep and server and tool:
+            servers.setdefault(f"mcp__{server}__", []).append(tool)
+        else:
+            servers.setdefault(name, []).append("")
+    parts = []
+    for prefix, tools in servers.items():
+        if tools == [""]:
+            parts.append(prefix)
+        elif len(tools) == 1:
+            parts.append(prefix + tools[0])
+        else:
+            parts.append(f"{prefix}({'|'.join(tools)})")
+    if len(parts) == 1:
+        return f"^{parts[0]}$"
+    return f"^({'|'.join(parts)})$"
+
+
+def _block(matcher, command):
+    return {"matcher": matcher, "hooks": [{"type": "command", "command": command}]}
+
+
+def generate(table, current):
+    """
+    Return the hooks.json document for a compiled policy table.
+
+    current is the existing document; hooks for other scripts and the
+    commands of existing approval hooks are carried over.
+    """
+    events = dict(current.get("hooks", {}))
+    commands = {}
+    for blocks in events.values():
+        for block in blocks:
+            owner = block_owner(block)
+            if owner is not None and len(block["hooks"]) == 1:
+                commands.setdefault(owner, block["hooks"][0]["command"])
+
+    def keep(event):
+        return [block for block in events.get(event, []) if block_owner(block) is None]
+
+    pre = []
+    for group, tools in table["groups"].items():
+        if tools:
+            command = commands.get(("group", group), f"{PLUGIN_ROOT}/hooks/{group}-approval.py")
+            pre.append(_block(tools_matcher(tools), command))
+    events["PreToolUse"] = pre + keep("PreToolUse")
+
+    recorded = [name for tools in table["groups"].values() for name, entry in tools.items() if not entry[1]]
+    if not approval_cache_enabled(table):
+        recorded = []
+    record_command = commands.get(("record", None), f"{PLUGIN_ROOT}/hooks/record-approval.py")
+    for event in RECORD_EVENTS:
+        events[event] = ([_block(tools_matcher(recorded), record_command)] if recorded else []) + keep(event)
+    return {**current, "hooks": {event: blocks for event, blocks in events.items() if blocks}}
+
+
+# ---------------------------------------------------------------------------
+# Checking
+# ---------------------------------------------------------------------------
+
+def _expand(pattern):
+    """
+    Return (names, wildcard) for the tool names a matcher can match.
+
+    Supports what hooks.json matchers use: literals, ^ and $, (a|b) and
+    (?:a|b) groups, backslash escapes and .* (reported as a wildcard and
+    expanded to nothing). Returns None for anything else.
+    """
+    position = 0
+    wildcard = False
+
+    def alternation():
+        nonlocal position
+        options = sequence()
+        while position < len(pattern) and pattern[position] == "|":
+            position += 1
+            options = options | sequence()
+        return options
+
+    def sequence():
+        nonlocal position, wildcard
+        results = {""}
+        while position < len(pattern) and pattern[position] not in "|)":
+            char = pattern[position]
+            if char in "^$":
+                position += 1
+                continue
+            if pattern.startswith(".*", position):
+                wildcard = True
+                position += 2
+                continue
+            if char == "(":
+                position += 3 if pattern.startswith("(?:", position) else 1
+                options = alternation()
+                if position >= len(pattern) or pattern[position] != ")":
+                    raise ValueError("unbalanced group")
+                position += 1
+            elif char == "\\" and position + 1 < len(pattern) and not pattern[position + 1].isalnum():
+                options = {pattern[position + 1]}
+                position += 2
+            elif char.isalnum() or char in "_-":
+                options = {char}
+                position += 1
+            else:
+                raise ValueError(f"unsupported syntax at {char!r}")
+            results = {prefix + option for prefix in results for option in options}
+            if len(results) > MAX_EXPANSIONS:
+                raise ValueError("too many alternatives")
+        return results
+
+    try:
+        names = alternation()
+        if position != len(pattern):
+            raise ValueError("unbalanced group")
+    except ValueError:
+        return None
+    return names, wildcard
+
+
+def check(table, document, hooks_path):
+    """Return a list of error messages for mismatches between a table and hooks.json."""
+    errors = []
+    events = document.get("hooks", {})
+    plugin_root = os.path.dirname(os.path.dirname(os.path.abspath(hooks_path)))
+    known = {name for tools in table["groups"].values() for name in tools}
+    matched = {}
+    record = approval_cache_enabled(table)
+
+    for event, blocks in events.items():
+        for block in blocks:
+            owner = block_owner(block)
+            if owner is None:
+                continue
+            kind, group = owner
+            pattern = block.get("matcher", "")
+            label = f"{event} matcher {pattern!r}"
+            try:
+                regex = re.compile(pattern)
+            except re.error as e:
+                errors.append(f"{label}: invalid regex: {e}")
+                continue
+            if kind == "group" and event != "PreToolUse":
+                errors.append(f"{label}: {group}-approval.py only handles PreToolUse")
+            if kind == "record" and event not in RECORD_EVENTS:
+                errors.append(f"{label}: record-approval.py only handles {' and '.join(RECORD_EVENTS)}")
+            if kind == "record" and not record:
+                errors.append(f"{label}: runs record-approval.py after every call, but the approval "
+                              f"cache is disabled")
+            if kind == "group" and group not in table["groups"]:
+                errors.append(f"{label}: the policy has no '{group}' group")
+                continue
+            matched.setdefault((event, owner), []).append(regex)
+            allowed = set(table["groups"][group]) if kind == "group" else known
+            expanded = _expand(pattern)
+            if expanded is None:
+                errors.append(f"{label}: cannot be checked against the policy")
+                continue
+            names, wildcard = expanded
+            if wildcard:
+                errors.append(f"{label}: wildcard can match tools that are not in the policy")
+            where = f"the '{group}' group" if kind == "group" else "any group"
+            for name in sorted(names - allowed):
+                errors.append(f"{label}: matches {name}, which is not in {where} of the policy")
+
+    for event in RECORD_EVENTS if record else ():
+        if (event, ("record", None)) not in matched:
+            errors.append(f"the approval cache is enabled but no {event} hook runs record-approval.py")
+
+    for group, tools in table["groups"].items():
+        script = os.path.join(plugin_root, "hooks", f"{group}-approval.py")
+        try:
+            with open(script, encoding="utf-8") as f:
+                called = _RUN_HOOK.findall(f.read())
+            if called != [group]:
+                errors.append(f"{group}-approval.py: does not call run_hook(\"{group}\")")
+        except OSError:
+            errors.append(f"'{group}' group: no entry point {script}")
+        regexes = matched.get(("PreToolUse", ("group", group)), [])
+        for name in tools:
+            if not any(regex.search(name) for regex in regexes):
+                errors.append(f"{name}: in the '{group}' group but no PreToolUse matcher sends it to "
+                              f"{group}-approval.py")
+        for event in RECORD_EVENTS if record else ():
+            regexes = matched.get((event, ("record", None)), [])
+            if not regexes:
+                continue
+            for name, entry in tools.items():
+                if not entry[1] and not any(regex.search(name) for regex in regexes):
+                    errors.append(f"{name}: no {event} matcher sends it to record-approval.py")
+    return errors
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _count(document, event):
+    return sum(1 for block in document.get("hooks", {}).get(event, []) if block_owner(block))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the approval hook matchers in hooks.json.")
+    parser.add_argument("--check", action="store_true", help="report mismatches and stale output; write nothing")
+    parser.add_argument("--policy", help="policy file (default: approval-policy.json or $DEVFLOW_HOOK_POLICY)")
+    parser.add_argument("--hooks", default=DEFAULT_HOOKS_JSON, help="hooks.json to check or rewrite")
+    args = parser.parse_args()
+    policy_file = args.policy or policy_path()
+
+    try:
+        with open(policy_file, encoding="utf-8") as f:
+            table = compile_policy(json.load(f))
+        with open(args.hooks, encoding="utf-8") as f:
+            current = json.load(f)
+        generated = generate(table, current)
+    except (OSError, json.JSONDecodeError, PolicyError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    errors = check(table, current, args.hooks)
+    up_to_date = generated == current
+    if args.check:
+        for error in errors:
+            print(f"❌ {error}")
+        if not up_to_date:
+            print(f"❌ {args.hooks} is not what build_hooks.py generates; run it to update")
+        if errors or not up_to_date:
+            sys.exit(1)
+        print(f"✅ {args.hooks} matches {policy_file}")
+        sys.exit(0)
+
+    remaining = check(table, generated, args.hooks)
+    for error in errors:
+        if error not in remaining:
+            print(f"♻️  Fixed: {error}")
+    if remaining:
+        # Not fixable by regenerating, e.g. a missing entry point
+        for error in remaining:
+            print(f"❌ {error}")
+        sys.exit(1)
+    if up_to_date:
+        print(f"✅ {args.hooks} is up to date")
+        sys.exit(0)
+    tmp = f"{args.hooks}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(generated, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, args.hooks)
+    tools = sum(len(tools) for tools in table["groups"].values())
+    print(f"✅ Wrote {args.hooks}: {tools} tools, {_count(current, 'PreToolUse')} -> "
+          f"{_count(generated, 'PreToolUse')} PreToolUse matchers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+../skills/skill-creator/scripts/devflow_trace.py
\ No newline at end of file
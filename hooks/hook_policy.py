@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+"""
+Declarative approval policy engine for the PreToolUse hooks.
+
+approval-policy.json describes, per hook group, which MCP tools need approval,
+their operation labels, destructive flags, argument-level rules and preview
+templates. The policy is compiled once into a lookup table of plain tuples and
+cached on disk (keyed on the policy file's mtime), so evaluating a call costs
+one dict lookup plus a few predicate checks.
+
+Usage:
+    hook_policy.py check [policy.json]
+    hook_policy.py show <tool_name> [policy.json]
+
+Environment:
+    DEVFLOW_HOOK_POLICY          Use a different policy file (e.g. with local rules)
+    DEVFLOW_HOOK_APPROVAL_CACHE  1/0 to force the approval cache on or off
+    DEVFLOW_HOOK_AUDIT           1/0 to force the audit log on or off
+    XDG_CACHE_HOME               Base directory for the compiled policy cache
+"""
+import json
+import marshal
+import os
+import sys
+import time
+import zlib
+
+from devflow_trace import span
+from payload_reader import TruncatedString, read_payload_with_size
+
+# os.path rather than pathlib: this module sits on the per-call hot path
+HOOKS_DIR = os.path.dirname(os.path.realpath(__file__))
+DEFAULT_POLICY = os.path.join(HOOKS_DIR, "approval-policy.json")
+
+# Bump when the compiled table layout changes
+COMPILED_FORMAT = 5
+
+DECISIONS = {"allow", "ask", "deny"}
+PREDICATES = {"equals", "in", "max_bytes"}
+
+ALLOW = {
+    "hookSpecificOutput": {
+        "hookEventName": "PreToolUse",
+        "permissionDecision": "allow"
+    }
+}
+
+
+class PolicyError(ValueError):
+    """Raised when a policy file cannot be compiled."""
+
+
+def policy_path():
+    """Return the active policy file path."""
+    return os.environ.get("DEVFLOW_HOOK_POLICY") or DEFAULT_POLICY
+
+
+def cache_dir():
+    """Return the per-user devflow cache directory."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "devflow")
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+def _compile_field(name, spec):
+    """Compile a field spec to (name, source_keys, default, empty_as_missing, truncate, escape, join)."""
+    spec = spec or {}
+    unknown = set(spec) - {"from", "default", "empty_as_missing", "truncate", "escape_newlines", "join"}
+    if unknown:
+        raise PolicyError(f"Field '{name}': unknown option(s) {', '.join(sorted(unknown))}")
+    sources = spec.get("from", [name])
+    if isinstance(sources, str):
+        sources = [sources]
+    return (
+        name,
+        tuple(sources),
+        spec.get("default"),
+        bool(spec.get("empty_as_missing", False)),
+        spec.get("truncate"),
+        bool(spec.get("escape_newlines", False)),
+        spec.get("join"),
+    )
+
+
+def _compile_preview(name, previews, stack=()):
+    """Compile a named preview into a tuple of line instructions."""
+    if name not in previews:
+        raise PolicyError(f"Unknown preview '{name}'")
+    if name in stack:
+        raise PolicyError(f"Preview include cycle: {' -> '.join(stack + (name,))}")
+
+    import string
+
+    preview = previews[name]
+    fields = preview.get("fields", {})
+    lines = []
+    for line in preview.get("lines", []):
+        if "include" in line:
+            lines.extend(_compile_preview(line["include"], previews, stack + (name,)))
+        elif "params" in line:
+            lines.append(("params", int(line["params"])))
+        elif "probe" in line:
+            from hook_probes import PROBES
+            if line["probe"] not in PROBES:
+                raise PolicyError(f"Preview '{name}': unknown probe '{line['probe']}'")
+            options = tuple(sorted((k, v) for k, v in line.items() if k != "probe"))
+            lines.append(("probe", line["probe"], options))
+        elif "text" in line:
+            text = line["text"]
+            placeholders = [f for _, f, _, _ in string.Formatter().parse(text) if f]
+            conditions = line.get("if", [])
+            equals = tuple(sorted(line.get("if_equals", {}).items()))
+            names = list(dict.fromkeys(placeholders + conditions + [k for k, _ in equals]))
+            specs = tuple(_compile_field(n, fields.get(n)) for n in names)
+            lines.append(("text", text, specs, tuple(conditions), equals))
+        else:
+            raise PolicyError(f"Preview '{name}': line needs 'text', 'params', 'probe' or 'include'")
+    return tuple(lines)
+
+
+def _compile_rules(tool_name, rules, destructive):
+    """Compile argument-level rules to ((decision, reason, predicates), ...)."""
+    compiled = []
+    for rule in rules:
+        decision = rule.get("decision")
+        if decision not in DECISIONS:
+            raise PolicyError(f"{tool_name}: rule decision must be one of {', '.join(sorted(DECISIONS))}")
+        if decision == "allow" and destructive:
+            raise PolicyError(f"{tool_name}: destructive operations cannot be auto-allowed")
+        predicates = []
+        for kind, checks in rule.get("when", {}).items():
+            if kind not in PREDICATES:
+                raise PolicyError(f"{tool_name}: unknown predicate '{kind}'")
+            for field, arg in checks.items():
+                if kind == "in":
+                    arg = tuple(arg)
+                predicates.append((kind, field, arg))
+        compiled.append((decision, rule.get("reason", ""), tuple(predicates)))
+    return tuple(compiled)
+
+
+def compile_policy(policy):
+    """
+    Compile a parsed policy document into a lookup table.
+
+    Returns:
+        {"groups": {group: {tool_name: (label, destructive, header, rules, lines)}},
+         "settings": {"approval_cache": (enabled, ttl_seconds, max_entries),
+                      "audit_log": (enabled, max_bytes, keep, fsync, batch_records, batch_ms)}}
+    """
+    # Compile-time only: keep regex-based modules off the cached hot path
+    import fnmatch
+
+    if policy.get("version") != 1:
+        raise PolicyError(f"Unsupported policy version: {policy.get('version')}")
+
+    patterns = policy.get("destructive_patterns", [])
+    previews = policy.get("previews", {})
+    compiled_previews = {}
+    groups = {}
+
+    for group, spec in policy.get("groups", {}).items():
+        title = spec.get("title", group)
+        tools = {}
+        for tool_name, tool in spec.get("tools", {}).items():
+            if "label" not in tool:
+                raise PolicyError(f"{tool_name}: missing 'label'")
+            label = tool["label"]
+            destructive = bool(tool.get("destructive", False)) or any(
+                fnmatch.fnmatchcase(tool_name, p) for p in patterns
+            )
+            preview = tool.get("preview", "parameters")
+            if preview not in compiled_previews:
+                compiled_previews[preview] = _compile_preview(preview, previews)
+            header = f"⚠️ DESTRUCTIVE: {label}" if destructive else f"{title}: {label}"
+            rules = _compile_rules(tool_name, tool.get("rules", []), destructive)
+            tools[tool_name] = (label, destructive, header, rules, compiled_previews[preview])
+        groups[group] = tools
+
+    cache = policy.get("approval_cache", {})
+    audit = policy.get("audit_log", {})
+    fsync = audit.get("fsync", "batch")
+    if fsync not in ("always", "batch", "never"):
+        raise PolicyError(f"audit_log: fsync must be always, batch or never, not '{fsync}'")
+    settings = {
+        "approval_cache": (
+            bool(cache.get("enabled", False)),
+            float(cache.get("ttl_seconds", 600)),
+            int(cache.get("max_entries", 256)),
+        ),
+        "audit_log": (
+            bool(audit.get("enabled", False)),
+            int(audit.get("max_bytes", 16 * 1024 * 1024)),
+            int(audit.get("keep", 8)),
+            fsync,
+            int(audit.get("batch_records", 64)),
+            float(audit.get("batch_ms", 1000)),
+        ),
+    }
+    return {"groups": groups, "settings": settings}
+
+
+def load_table(path=None):
+    """
+    Return the compiled table for a policy file, using the on-disk cache.
+
+    The cache is keyed on the policy path, mtime, size, compiled format and
+    Python version, and is rewritten atomically whenever the key changes.
+    """
+    path = os.path.realpath(path or policy_path())
+    st = os.stat(path)
+    key = (COMPILED_FORMAT, sys.version_info[:2], path, st.st_mtime_ns, st.st_size)
+    cache_file = os.path.join(cache_dir(), f"hook-policy-{zlib.crc32(path.encode()):08x}.marshal")
+
+    try:
+        with open(cache_file, "rb") as f:
+            cached_key, table = marshal.load(f)
+        if tuple(cached_key) == key:
+            return table
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+
+    with open(path, encoding="utf-8") as f:
+        try:
+            policy = json.load(f)
+        except json.JSONDecodeError as e:
+            raise PolicyError(f"Invalid JSON in {path}: {e}")
+    table = compile_policy(policy)
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            marshal.dump((key, table), f)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+    return table
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+
+def _field_value(spec, tool_input):
+    name, sources, default, empty_as_missing, truncate, escape, join = spec
+    # Only an absent key is missing; an explicit null renders as None, like
+    # tool_input.get(key, default) did in the original hooks
+    missing = True
+    for key in sources:
+        if key in tool_input:
+            value = tool_input[key]
+            missing = False
+            break
+    if missing or (empty_as_missing and (value is None or value == "")):
+        value = default if default is not None else ""
+    if join is not None and isinstance(value, (list, tuple, dict)):
+        value = join.join(str(v) for v in value)
+    if truncate is not None and isinstance(value, str) and len(value) > truncate:
+        value = value[:truncate] + "..."
+    elif isinstance(value, TruncatedString):
+        value = value + "..."
+    if escape and isinstance(value, str):
+        value = value.replace("\n", "\\n")
+    return value
+
+
+def render(entry, tool_input, cwd=None):
+    """
+    Render the approval prompt for a compiled tool entry.
+
+    cwd is the session's working directory from the payload; probes resolve
+    relative paths against it rather than against this process's cwd.
+    """
+    _, destructive, header, _, preview = entry
+    lines = [header, ""]
+
+    for line in preview:
+        if line[0] == "params":
+            limit = line[1]
+            lines.append("Parameters:")
+            for key, value in tool_input.items():
+                if isinstance(value, str) and len(value) > limit:
+                    value = value[:limit] + "..."
+                lines.append(f"  {key}: {value}")
+            continue
+        if line[0] == "probe":
+            from hook_probes import run_probe
+            with span(f"probe:{line[1]}", "hook"):
+                lines.extend(run_probe(line[1], tool_input, line[2], cwd))
+            continue
+
+        _, text, specs, conditions, equals = line
+        values = {spec[0]: _field_value(spec, tool_input) for spec in specs}
+        if any(not values[name] for name in conditions):
+            continue
+        if any(tool_input.get(name) != expected for name, expected in equals):
+            continue
+        lines.append(text.format_map(values))
+
+    if destructive:
+        lines.append("")
+        lines.append("⚠️ This action cannot be undone")
+
+    lines.append("")
+    lines.append("Approve?")
+
+    return "\n".join(lines)
+
+
+def _matches(predicates, tool_input):
+    for kind, field, arg in predicates:
+        value = tool_input.get(field)
+        if kind == "equals":
+            if value != arg:
+                return False
+        elif kind == "in":
+            if value not in arg:
+                return False
+        elif kind == "max_bytes":
+            if value is None:
+                return False
+            size = value.size if isinstance(value, TruncatedString) else len(str(value).encode("utf-8"))
+            if size > arg:
+                return False
+    return True
+
+
+def decide(entry, tool_input):
+    """Return (decision, reason) from the first matching rule, or ("ask", "")."""
+    for decision, reason, predicates in entry[3]:
+        if _matches(predicates, tool_input):
+            return decision, reason
+    return "ask", ""
+
+
+def approval_cache_enabled(table):
+    """Return True if memoization is on, per the policy or DEVFLOW_HOOK_APPROVAL_CACHE."""
+    override = os.environ.get("DEVFLOW_HOOK_APPROVAL_CACHE")
+    if override is not None:
+        return override not in ("", "0", "false", "no")
+    return table["settings"]["approval_cache"][0]
+
+
+def approval_cache_for(table):
+    """Return an ApprovalCache if memoization is enabled, else None."""
+    if not approval_cache_enabled(table):
+        return None
+    _, ttl, max_entries = table["settings"]["approval_cache"]
+    from approval_cache import ApprovalCache
+    return ApprovalCache(cache_dir(), ttl, max_entries)
+
+
+_audit_logs = {}
+
+
+def audit_log_for(table):
+    """Return the process-wide AuditLog if auditing is enabled, else None."""
+    enabled, max_bytes, keep, fsync, batch_records, batch_ms = table["settings"]["audit_log"]
+    override = os.environ.get("DEVFLOW_HOOK_AUDIT")
+    if override is not None:
+        enabled = override not in ("", "0", "false", "no")
+    if not enabled:
+        return None
+    from audit_log import AuditLog, default_dir
+    key = (default_dir(), max_bytes, keep, fsync, batch_records, batch_ms)
+    if key not in _audit_logs:
+        _audit_logs[key] = AuditLog(*key)
+    return _audit_logs[key]
+
+
+def flush_audit_logs(due_only=False):
+    """Flush the AuditLogs opened by this process (all pending, or only overdue batches)."""
+    for log in _audit_logs.values():
+        try:
+            if due_only:
+                log.flush_if_due()
+            else:
+                log.flush()
+        except OSError as e:
+            print(f"audit log: {e}", file=sys.stderr)
+
+
+def audit_decision(log, tools, input_data, size, output, timings):
+    """Append one decision to the audit log; never fails the hook."""
+    from audit_log import make_record
+    tool_name = input_data.get("tool_name", "")
+    entry = tools.get(tool_name)
+    try:
+        log.append(make_record(
+            tool_name,
+            entry[0] if entry is not None else "",
+            output["hookSpecificOutput"]["permissionDecision"],
+            size,
+            input_data.get("tool_input", {}),
+            timings,
+        ))
+    except (OSError, TypeError, ValueError) as e:
+        print(f"audit log: {e}", file=sys.stderr)
+
+
+def _cached_approval(cache, entry, input_data):
+    if cache is None or entry[1]:
+        return False
+    from approval_cache import fingerprint
+    fp = fingerprint(input_data.get("session_id"), input_data.get("tool_name", ""), input_data.get("tool_input", {}))
+    try:
+        return cache.check(fp)
+    except OSError:
+        return False
+
+
+def evaluate(tools, input_data, cache=None, timings=None):
+    """
+    Return the hook output for a parsed PreToolUse payload.
+
+    If timings is a dict, the "match" (lookup, rules, approval cache) and
+    "format" (prompt rendering) phases are recorded in it, in seconds.
+    """
+    started = time.perf_counter()
+    tool_name = input_data.get("tool_name", "")
+    tool_input = input_data.get("tool_input", {})
+
+    with span("match", "hook", tool=tool_name) as trace:
+        entry = tools.get(tool_name)
+        if entry is not None:
+            decision, reason = decide(entry, tool_input)
+            if decision == "ask" and _cached_approval(cache, entry, input_data):
+                decision, reason = "allow", "Identical call already approved in this session"
+            trace.set(decision=decision)
+    if entry is None:
+        if timings is not None:
+            timings["match"] = time.perf_counter() - started
+        return ALLOW
+
+    matched = time.perf_counter()
+    if decision == "ask":
+        with span("format", "hook", tool=tool_name):
+            reason = render(entry, tool_input, input_data.get("cwd"))
+    output = {"hookEventName": "PreToolUse", "permissionDecision": decision}
+    if reason:
+        output["permissionDecisionReason"] = reason
+    if timings is not None:
+        timings["match"] = matched - started
+        timings["format"] = time.perf_counter() - matched
+    return {"hookSpecificOutput": output}
+
+
+def policy_error_output(error):
+    """Fail closed: ask for approval when the policy itself is broken."""
+    return {
+        "hookSpecificOutput": {
+            "hookEventName": "PreToolUse",
+            "permissionDecision": "ask",
+            "permissionDecisionReason": f"Approval policy error: {error}\n\nApprove?"
+        }
+    }
+
+
+def run_hook(group):
+    """Entry point for the per-group hook scripts."""
+    clock = time.perf_counter
+    started = clock()
+    try:
+        with span("parse", "hook") as trace:
+            input_data, size = read_payload_with_size(sys.stdin.buffer)
+            trace.set(bytes=size)
+    except ValueError:
+        print(json.dumps(ALLOW))
+        sys.exit(0)
+    parsed = clock()
+
+    try:
+        with span("load_policy", "hook"):
+            table = load_table()
+    except (OSError, PolicyError) as e:
+        print(json.dumps(policy_error_output(e)))
+        sys.exit(0)
+
+    timings = {}
+    tools = table["groups"].get(group, {})
+    loaded = clock()
+    output = evaluate(tools, input_data, approval_cache_for(table), timings)
+    formatting = clock()
+    with span("emit", "hook"):
+        text = json.dumps(output)
+        emitting = clock()
+        print(text, flush=True)
+        emitted = clock()
+
+    log = audit_log_for(table)
+    if log is not None:
+        timings["parse"] = parsed - started
+        timings["match"] += loaded - parsed
+        timings["format"] = timings.get("format", 0.0) + emitting - formatting
+        timings["emit"] = emitted - emitting
+        with span("audit", "hook"):
+            audit_decision(log, tools, input_data, size, output, timings)
+            flush_audit_logs()
+    sys.exit(0)
+
+
+def record_approval(table, input_data):
+    """Record a call that ran (and so was approved) in the approval cache."""
+    cache = approval_cache_for(table)
+    if cache is None:
+        return False
+    tool_name = input_data.get("tool_name", "")
+    for tools in table["groups"].values():
+        entry = tools.get(tool_name)
+        if entry is not None:
+            break
+    else:
+        return False
+    if entry[1]:
+        return False
+    from approval_cache import fingerprint
+    cache.record(fingerprint(input_data.get("session_id"), tool_name, input_data.get("tool_input", {})))
+    return True
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("check", "show"):
+        print("Usage: hook_policy.py check [policy.json]")
+        print("       hook_policy.py show <tool_name> [policy.json]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    if command == "show" and len(sys.argv) < 3:
+        print("Usage: hook_policy.py show <tool_name> [policy.json]")
+        sys.exit(1)
+    path_index = 3 if command == "show" else 2
+    path = sys.argv[path_index] if len(sys.argv) > path_index else policy_path()
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            table = compile_policy(json.load(f))
+    except (OSError, json.JSONDecodeError, PolicyError) as e:
+        print(f"❌ {path}: {e}")
+        sys.exit(1)
+
+    if command == "check":
+        for group, tools in table["groups"].items():
+            destructive = sum(1 for entry in tools.values() if entry[1])
+            rules = sum(len(entry[3]) for entry in tools.values())
+            print(f"  {group}: {len(tools)} tools, {destructive} destructive, {rules} rules")
+        print(f"✅ Policy is valid: {path}")
+        sys.exit(0)
+
+    tool_name = sys.argv[2]
+    for group, tools in table["groups"].items():
+        if tool_name in tools:
+            label, destructive, _, rules, _ = tools[tool_name]
+            print(f"Group: {group}")
+            print(f"Label: {label}")
+            print(f"Destructive: {'yes' if destructive else 'no'}")
+            for decision, reason, predicates in rules:
+                checks = ", ".join(f"{kind}({field}={arg!r})" for kind, field, arg in predicates)
+                print(f"Rule: {decision} when {checks or 'always'}{f' - {reason}' if reason else ''}")
+            sys.exit(0)
+    print(f"{tool_name} is not protected (pass-through)")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+"""
+Filesystem probes for approval prompts.
+
+A preview line of the form {"probe": "<name>", ...options} runs a probe and
+appends the lines it returns, so the approver sees what a call will actually
+touch rather than just its arguments. Probes never fail the hook: errors are
+reported as a preview line. Relative paths are resolved against the
+session's cwd from the hook payload, not the cwd of the hook process (which,
+for the approval daemon, is unrelated to the session).
+
+Probes:
+    directory-scan   File count, bytes, largest files and estimated chunks for
+                     rag-memory ingest_directory (time-budgeted parallel walk,
+                     cached per tree until a directory mtime changes)
+    file-preview     Size, detected type, line count and a text head for a
+                     local file about to be ingested or uploaded (mmap-based,
+                     line counting capped by a time budget)
+"""
+import heapq
+import json
+import os
+import time
+
+DEFAULT_BUDGET_MS = 300
+DEFAULT_WORKERS = 8
+DEFAULT_TOP = 3
+DEFAULT_CHUNK_BYTES = 1000
+DEFAULT_CHUNK_OVERLAP = 200
+DEFAULT_HEAD_LINES = 5
+DEFAULT_HEAD_WIDTH = 100
+DEFAULT_COUNT_BUDGET_MS = 50
+# Entries listed between deadline checks in a directory scan
+SCAN_CHECK_EVERY = 256
+# How long past the deadline to wait for the partial listings in flight
+SCAN_GRACE_MS = 20
+
+# Bytes sniffed for type detection and the text head
+SNIFF_BYTES = 8 * 1024
+# Slice size for line counting; bounds memory regardless of file size
+COUNT_STEP = 1024 * 1024
+
+# (offset, magic, description), checked in order
+MAGIC = (
+    (0, b"%PDF-", "PDF document"),
+    (0, b"\x89PNG\r\n\x1a\n", "PNG image"),
+    (0, b"\xff\xd8\xff", "JPEG image"),
+    (0, b"GIF8", "GIF image"),
+    (0, b"PK\x03\x04", "ZIP archive (or docx/xlsx/jar)"),
+    (0, b"\x1f\x8b", "gzip archive"),
+    (0, b"BZh", "bzip2 archive"),
+    (0, b"\xfd7zXZ\x00", "xz archive"),
+    (0, b"7z\xbc\xaf\x27\x1c", "7-Zip archive"),
+    (257, b"ustar", "tar archive"),
+    (0, b"\x7fELF", "ELF executable"),
+    (0, b"MZ", "Windows executable"),
+    (0, b"SQLite format 3\x00", "SQLite database"),
+    (0, b"\xd0\xcf\x11\xe0", "legacy Office document"),
+    (4, b"ftyp", "MP4/QuickTime media"),
+    (0, b"RIFF", "RIFF media (WAV/AVI/WebP)"),
+    (0, b"wOF2", "WOFF2 font"),
+)
+
+
+def format_bytes(size):
+    """Return a human-readable size, e.g. '1.2 MB'."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+# ---------------------------------------------------------------------------
+# directory-scan
+# ---------------------------------------------------------------------------
+
+def _normalize_extensions(extensions):
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    return tuple(sorted({
+        (e if e.startswith(".") else f".{e}").lower() for e in extensions or () if e
+    }))
+
+
+def _scan_one(path, extensions, deadline=None):
+    """
+    List one directory: ([(size, path), ...], [(subdir, mtime_ns), ...], complete).
+
+    The deadline is checked before listing and every SCAN_CHECK_EVERY entries,
+    so a huge flat directory returns a partial listing on time.
+    """
+    files = []
+    subdirs = []
+    if deadline is not None and time.monotonic() > deadline:
+        return files, subdirs, False
+    with os.scandir(path) as it:
+        for count, entry in enumerate(it, 1):
+            if deadline is not None and count % SCAN_CHECK_EVERY == 0 and time.monotonic() > deadline:
+                return files, subdirs, False
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, entry.stat(follow_symlinks=False).st_mtime_ns))
+                elif entry.is_file():
+                    if extensions and os.path.splitext(entry.name)[1].lower() not in extensions:
+                        continue
+                    files.append((entry.stat().st_size, entry.path))
+            except OSError:
+                continue
+    return files, subdirs, True
+
+
+def _estimate_chunks(size, chunk_bytes, overlap):
+    if size <= chunk_bytes:
+        return 1 if size else 0
+    step = max(1, chunk_bytes - overlap)
+    return 1 + -(-(size - chunk_bytes) // step)
+
+
+def scan_directory(root, extensions=(), recursive=False, budget_ms=DEFAULT_BUDGET_MS,
+                   workers=DEFAULT_WORKERS, top=DEFAULT_TOP,
+                   chunk_bytes=DEFAULT_CHUNK_BYTES, chunk_overlap=DEFAULT_CHUNK_OVERLAP):
+    """
+    Walk a directory tree the way ingest_directory will and summarize it.
+
+    Directories are listed on daemon threads (os.scandir releases the GIL), so
+    a scan cut short never delays process exit. Symlinked directories are not
+    followed. When the budget runs out, pending directories are dropped and
+    the counts so far are returned with complete=False.
+
+    Returns:
+        {"files", "bytes", "chunks", "largest": [[size, relpath], ...],
+         "dirs": {path: mtime_ns}, "complete", "elapsed_ms"}
+    """
+    start = time.monotonic()
+    deadline = start + budget_ms / 1000
+    result = {"files": 0, "bytes": 0, "chunks": 0, "largest": [], "dirs": {}, "complete": True}
+    largest = []
+    dirs = {root: os.stat(root).st_mtime_ns}
+
+    def add(files):
+        # Whole-list builtins: a huge directory must not blow the budget here
+        sizes = [size for size, _ in files]
+        result["files"] += len(sizes)
+        result["bytes"] += sum(sizes)
+        result["chunks"] += sum(_estimate_chunks(size, chunk_bytes, chunk_overlap) for size in sizes if size)
+        largest[:] = heapq.nlargest(top, largest + heapq.nlargest(top, files))
+
+    if not recursive:
+        files, _, result["complete"] = _scan_one(root, extensions, deadline)
+        add(files)
+    else:
+        import queue
+        import threading
+
+        tasks = queue.SimpleQueue()
+        results = queue.SimpleQueue()
+
+        def worker():
+            while (path := tasks.get()) is not None:
+                try:
+                    results.put(_scan_one(path, extensions, deadline))
+                except OSError:
+                    # Unreadable directories are skipped, as ingest_directory would
+                    results.put(([], [], True))
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+        for thread in threads:
+            thread.start()
+        tasks.put(root)
+        pending = 1
+        # Workers stop within SCAN_CHECK_EVERY entries of the deadline; wait that
+        # long for their partial listings so a huge directory is not counted as 0
+        collect_until = deadline + SCAN_GRACE_MS / 1000
+        try:
+            while pending:
+                try:
+                    files, subdirs, complete = results.get(timeout=max(0, collect_until - time.monotonic()))
+                except queue.Empty:
+                    result["complete"] = False
+                    break
+                pending -= 1
+                add(files)
+                if not complete:
+                    result["complete"] = False
+                for subdir, mtime_ns in subdirs:
+                    dirs[subdir] = mtime_ns
+                    if result["complete"]:
+                        tasks.put(subdir)
+                        pending += 1
+        finally:
+            # Queued directories are dropped at once: the deadline has passed
+            for _ in threads:
+                tasks.put(None)
+
+    result["largest"] = [[size, os.path.relpath(path, root)] for size, path in largest]
+    result["dirs"] = dirs
+    result["elapsed_ms"] = round((time.monotonic() - start) * 1000, 1)
+    return result
+
+
+def _scan_cache_file(key):
+    import hashlib
+
+    from hook_policy import cache_dir
+    digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()[:32]
+    return os.path.join(cache_dir(), "preflight", f"{digest}.json")
+
+
+def _cached_scan(cache_file, key):
+    """Return a cached complete scan if no directory in the tree changed."""
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("key") != key:
+            return None
+        for path, mtime_ns in cached["result"]["dirs"].items():
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                return None
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+    return cached["result"]
+
+
+def _store_scan(cache_file, key, result):
+    try:
+        os.makedirs(os.path.dirname(cache_file), mode=0o700, exist_ok=True)
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "result": result}, f, separators=(",", ":"))
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+
+
+def preflight_directory(root, extensions=(), recursive=False, **options):
+    """
+    scan_directory() with an on-disk cache keyed on (path, extensions,
+    recursive, chunking) and validated against every directory's mtime.
+    Only complete scans are cached. Adds "cached": True/False to the result.
+    """
+    root = os.path.realpath(os.path.expanduser(root))
+    extensions = _normalize_extensions(extensions)
+    key = [root, list(extensions), bool(recursive),
+           options.get("chunk_bytes", DEFAULT_CHUNK_BYTES),
+           options.get("chunk_overlap", DEFAULT_CHUNK_OVERLAP),
+           options.get("top", DEFAULT_TOP)]
+    cache_file = _scan_cache_file(key)
+
+    result = _cached_scan(cache_file, key)
+    if result is not None:
+        result["cached"] = True
+        return result
+
+    result = scan_directory(root, extensions, recursive, **options)
+    if result["complete"]:
+        _store_scan(cache_file, key, result)
+    result["cached"] = False
+    return result
+
+
+def local_path(path, cwd=None):
+    """Expand ~ and resolve a relative path against the session's cwd, if known."""
+    path = os.path.expanduser(path)
+    if not os.path.isabs(path) and isinstance(cwd, str) and os.path.isabs(cwd):
+        path = os.path.join(cwd, path)
+    return path
+
+
+def directory_scan(tool_input, options, cwd=None):
+    """Preview lines for a directory about to be ingested."""
+    root = tool_input.get(options.get("path", "directory_path"))
+    if not isinstance(root, str) or not root:
+        return []
+    root = local_path(root, cwd)
+    scan_options = {k: options[k] for k in
+                    ("budget_ms", "workers", "top", "chunk_bytes", "chunk_overlap") if k in options}
+    try:
+        result = preflight_directory(
+            root,
+            tool_input.get(options.get("extensions", "file_extensions")) or (),
+            tool_input.get(options.get("recursive", "recursive"), False),
+            **scan_options,
+        )
+    except FileNotFoundError:
+        return ["  └─ Pre-flight: directory not found"]
+    except OSError as e:
+        return [f"  └─ Pre-flight: cannot read directory ({e.strerror})"]
+
+    lines = [
+        f"  └─ Pre-flight: {result['files']:,} files, {format_bytes(result['bytes'])}, "
+        f"~{result['chunks']:,} chunks to embed"
+    ]
+    if result["largest"]:
+        lines.append("  └─ Largest: " + ", ".join(
+            f"{path} ({format_bytes(size)})" for size, path in result["largest"]
+        ))
+    if not result["complete"]:
+        lines.append(
+            f"  └─ ⚠️  Partial: scan stopped after {result['elapsed_ms']:.0f} ms "
+            f"({len(result['dirs']):,} directories seen), actual totals are higher"
+        )
+    return lines
+
+
+# ---------------------------------------------------------------------------
+# file-preview
+# ---------------------------------------------------------------------------
+
+def detect_type(sniff):
+    """Return (description, is_text) for the first bytes of a file."""
+    for offset, magic, description in MAGIC:
+        if sniff.startswith(magic, offset):
+            return description, False
+    if sniff.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "text (UTF-16)", False
+    if b"\x00" in sniff:
+        return "binary data", False
+    # A multi-byte character may be cut at the end of the sniffed block
+    for trim in range(4):
+        try:
+            sniff[:len(sniff) - trim].decode("utf-8")
+            return "text (UTF-8)", True
+        except UnicodeDecodeError:
+            continue
+    return "text (non-UTF-8)", True
+
+
+def count_lines(mm, size, budget_ms=DEFAULT_COUNT_BUDGET_MS):
+    """
+    Count newlines in a mapped file, COUNT_STEP bytes at a time.
+
+    Returns (lines, scanned_bytes). When the budget runs out before the end,
+    scanned_bytes < size and the caller should extrapolate.
+    """
+    import mmap
+
+    # Drop counted pages from our RSS (COUNT_STEP is page aligned)
+    release = getattr(mmap, "MADV_DONTNEED", None) if hasattr(mm, "madvise") else None
+    deadline = time.monotonic() + budget_ms / 1000
+    lines = 0
+    pos = 0
+    while pos < size:
+        step = min(COUNT_STEP, size - pos)
+        lines += mm[pos:pos + step].count(b"\n")
+        if release is not None:
+            mm.madvise(release, pos, step)
+        pos += step
+        if time.monotonic() > deadline:
+            break
+    if pos == size and size and mm[size - 1:size] != b"\n":
+        lines += 1
+    return lines, pos
+
+
+def _special_type(mode):
+    import stat
+    for test, description in ((stat.S_ISFIFO, "named pipe (FIFO)"), (stat.S_ISCHR, "character device"),
+                              (stat.S_ISBLK, "block device"), (stat.S_ISSOCK, "socket")):
+        if test(mode):
+            return f"{description}, not a regular file"
+    return "not a regular file"
+
+
+def preview_file(path, head_lines=DEFAULT_HEAD_LINES, head_width=DEFAULT_HEAD_WIDTH,
+                 budget_ms=DEFAULT_COUNT_BUDGET_MS):
+    """
+    Describe a local file without reading all of it.
+
+    The file is memory-mapped; only the first SNIFF_BYTES and one COUNT_STEP
+    slice at a time are ever copied, so memory use is independent of file size.
+    It is opened non-blocking and only regular files are read, so a FIFO or
+    device never stalls the hook; for those only the type is returned, with
+    size None.
+
+    Returns:
+        {"size", "type", "is_text", "lines", "lines_exact", "head": [str, ...]}
+    """
+    import mmap
+    import stat
+
+    # O_NONBLOCK: opening a FIFO for reading would otherwise wait for a writer
+    fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK | getattr(os, "O_CLOEXEC", 0))
+    with open(fd, "rb") as f:
+        st = os.fstat(fd)
+        if stat.S_ISDIR(st.st_mode):
+            raise IsADirectoryError(21, "Is a directory", path)
+        if not stat.S_ISREG(st.st_mode):
+            return {"size": None, "type": _special_type(st.st_mode), "is_text": False,
+                    "lines": None, "lines_exact": False, "head": []}
+        size = st.st_size
+        if size == 0:
+            return {"size": 0, "type": "empty file", "is_text": True,
+                    "lines": 0, "lines_exact": True, "head": []}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            sniff = mm[:SNIFF_BYTES]
+            description, is_text = detect_type(sniff)
+            result = {"size": size, "type": description, "is_text": is_text,
+                      "lines": None, "lines_exact": False, "head": []}
+            if not is_text:
+                return result
+
+            lines, scanned = count_lines(mm, size, budget_ms)
+            if scanned == size:
+                result["lines"], result["lines_exact"] = lines, True
+            else:
+                result["lines"] = int(lines * size / scanned)
+
+    head = sniff.decode("utf-8", "replace").splitlines()[:head_lines]
+    result["head"] = [line[:head_width] + ("..." if len(line) > head_width else "") for line in head]
+    return result
+
+
+def file_preview(tool_input, options, cwd=None):
+    """Preview lines for a local file about to be ingested or uploaded."""
+    path = tool_input.get(options.get("path", "file_path"))
+    if not isinstance(path, str) or not path:
+        return []
+    path = local_path(path, cwd)
+    try:
+        result = preview_file(
+            path,
+            options.get("head_lines", DEFAULT_HEAD_LINES),
+            options.get("head_width", DEFAULT_HEAD_WIDTH),
+            options.get("budget_ms", DEFAULT_COUNT_BUDGET_MS),
+        )
+    except FileNotFoundError:
+        return ["  └─ ⚠️  File not found"]
+    except IsADirectoryError:
+        return ["  └─ ⚠️  Path is a directory"]
+    except (OSError, ValueError) as e:
+        return [f"  └─ Cannot read file ({getattr(e, 'strerror', None) or e})"]
+
+    if result["size"] is None:
+        return [f"  └─ ⚠️  Type: {result['type']}"]
+    lines = [f"  └─ Size: {format_bytes(result['size'])}", f"  └─ Type: {result['type']}"]
+    if result["lines"] is not None:
+        count = f"{result['lines']:,}" if result["lines_exact"] else f"~{result['lines']:,} (estimated)"
+        lines.append(f"  └─ Lines: {count}")
+    if result["head"]:
+        lines.append("  └─ Head:")
+        lines.extend(f"       │ {line}" for line in result["head"])
+    return lines
+
+
+PROBES = {
+    "directory-scan": directory_scan,
+    "file-preview": file_preview,
+}
+
+
+def run_probe(name, tool_input, options, cwd=None):
+    """Return the preview lines produced by a named probe; cwd is the payload's cwd."""
+    return PROBES[name](tool_input, dict(options), cwd)
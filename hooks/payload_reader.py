@@ -0,0 +1,249 @@
+"""
+Bounded-memory reader for PreToolUse hook payloads.
+
+Hook payloads can carry multi-megabyte strings (e.g. rag-memory ingest_text
+content) of which the approval prompt shows only the first ~150 characters.
+read_payload() parses stdin incrementally and keeps long strings only as a
+TruncatedString: the first max_string bytes, plus the full size and a SHA-256
+of the string as it appeared on the wire. Peak memory and parse time therefore
+stay flat regardless of payload size.
+
+Payloads that fit in the first chunk take the plain json.loads path.
+"""
+import json
+import re
+
+DEFAULT_CHUNK_SIZE = 256 * 1024
+DEFAULT_MAX_STRING = 8 * 1024
+
+# Bytes scanned per step inside a string with escapes, doubling from MIN to MAX
+MIN_WINDOW = 256
+MAX_WINDOW = 256 * 1024
+
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_NUMBER = re.compile(rb"-?(?:0|[1-9][0-9]*)(\.[0-9]+)?([eE][-+]?[0-9]+)?")
+_NUMBER_CHARS = re.compile(rb"[-+0-9.eE]*")
+
+
+class TruncatedString(str):
+    """
+    Leading part of a string too large to keep in memory.
+
+    Attributes:
+        size: Size of the full string in bytes, as escaped in the payload
+        sha256: Hex SHA-256 of those bytes
+    """
+
+    def __new__(cls, head, size, sha256):
+        value = super().__new__(cls, head)
+        value.size = size
+        value.sha256 = sha256
+        return value
+
+
+def _decode(raw):
+    if b"\\" not in raw:
+        return raw.decode("utf-8")
+    return json.loads(b'"' + raw + b'"')
+
+
+def _decode_head(raw):
+    """Decode a byte prefix that may end mid-escape or mid-character."""
+    for trim in range(8):
+        try:
+            head = _decode(raw[:len(raw) - trim])
+        except ValueError:
+            continue
+        # Drop half of an escaped surrogate pair cut at the boundary
+        if head and "\ud800" <= head[-1] <= "\udbff":
+            head = head[:-1]
+        return head
+    return ""
+
+
+class PayloadReader:
+    """Incremental JSON parser over a binary stream."""
+
+    def __init__(self, stream, chunk_size=DEFAULT_CHUNK_SIZE, max_string=DEFAULT_MAX_STRING, prefix=b""):
+        self._stream = stream
+        self._buf = prefix
+        self._pos = 0
+        self.chunk_size = chunk_size
+        self.max_string = max_string
+        self.bytes_read = len(prefix)
+        self.truncated = 0
+
+    def _fill(self):
+        """Append the next chunk to the buffer. Returns False at EOF."""
+        data = self._stream.read(self.chunk_size)
+        if not data:
+            return False
+        self.bytes_read += len(data)
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Skip whitespace and return the next byte (or -1 at EOF)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return -1
+
+    def _expect(self, char):
+        if self._peek() != ord(char):
+            raise ValueError(f"Expected '{char}' at byte {self.bytes_read - len(self._buf) + self._pos}")
+        self._pos += 1
+
+    def parse(self):
+        """Parse the whole stream and return the top-level value."""
+        value = self._value()
+        if self._peek() != -1:
+            raise ValueError("Extra data after payload")
+        return value
+
+    def _value(self):
+        c = self._peek()
+        if c == 0x7B:  # {
+            return self._object()
+        if c == 0x5B:  # [
+            return self._array()
+        if c == 0x22:  # "
+            self._pos += 1
+            return self._string(self.max_string)
+        if c == -1:
+            raise ValueError("Unexpected end of payload")
+        return self._scalar()
+
+    def _object(self):
+        self._pos += 1
+        result = {}
+        if self._peek() == 0x7D:
+            self._pos += 1
+            return result
+        while True:
+            self._expect('"')
+            # Keys are never truncated, so distinct keys cannot collide
+            key = self._string(None)
+            self._expect(":")
+            result[key] = self._value()
+            c = self._peek()
+            self._pos += 1
+            if c == 0x7D:
+                return result
+            if c != 0x2C:
+                raise ValueError("Expected ',' or '}' in object")
+
+    def _array(self):
+        self._pos += 1
+        result = []
+        if self._peek() == 0x5D:
+            self._pos += 1
+            return result
+        while True:
+            result.append(self._value())
+            c = self._peek()
+            self._pos += 1
+            if c == 0x5D:
+                return result
+            if c != 0x2C:
+                raise ValueError("Expected ',' or ']' in array")
+
+    def _string(self, max_string):
+        pieces = []
+        size = 0
+        hasher = None
+        window = MIN_WINDOW
+        while True:
+            buf = self._buf
+            start = self._pos
+            quote = buf.find(b'"', start)
+            if quote != -1 and buf.find(b"\\", start, quote) == -1:
+                # Common case: no escapes before the closing quote
+                end, closed = quote, True
+            else:
+                # Blank out escaped backslashes, then escaped quotes; the first
+                # quote left is the closing one. Same length, so offsets hold.
+                stop = min(len(buf), start + window)
+                region = buf[start:stop]
+                neutral = region.replace(b"\\\\", b"__").replace(b'\\"', b"__")
+                quote = neutral.find(b'"')
+                if quote != -1:
+                    end, closed = start + quote, True
+                else:
+                    # A trailing lone backslash escapes a byte we have not read yet
+                    end, closed = stop - neutral.endswith(b"\\"), False
+                    window = min(window * 2, MAX_WINDOW)
+
+            segment = buf[start:end]
+            if segment:
+                size += len(segment)
+                if hasher is not None:
+                    hasher.update(segment)
+                else:
+                    pieces.append(segment)
+                    if max_string is not None and size > max_string:
+                        from hashlib import sha256
+                        head = b"".join(pieces)
+                        hasher = sha256(head)
+                        pieces = [head[:max_string]]
+
+            if closed:
+                self._pos = end + 1
+                break
+            self._pos = end
+            if stop == len(buf) and not self._fill():
+                raise ValueError("Unterminated string")
+
+        raw = b"".join(pieces)
+        if hasher is None:
+            return _decode(raw)
+        self.truncated += 1
+        return TruncatedString(_decode_head(raw), size, hasher.hexdigest())
+
+    def _scalar(self):
+        # A literal or number may straddle a chunk boundary; buffer all of it
+        while len(self._buf) - self._pos < 5 and self._fill():
+            pass
+        for literal, value in ((b"true", True), (b"false", False), (b"null", None)):
+            if self._buf.startswith(literal, self._pos):
+                self._pos += len(literal)
+                return value
+        while True:
+            end = _NUMBER_CHARS.match(self._buf, self._pos).end()
+            if not (end == len(self._buf) and self._fill()):
+                break
+        match = _NUMBER.fullmatch(self._buf, self._pos, end)
+        if not match:
+            raise ValueError(f"Invalid value at byte {self.bytes_read - len(self._buf) + self._pos}")
+        self._pos = match.end()
+        text = match.group(0)
+        if match.group(1) or match.group(2):
+            return float(text)
+        return int(text)
+
+
+def read_payload_with_size(stream, chunk_size=DEFAULT_CHUNK_SIZE, max_string=DEFAULT_MAX_STRING):
+    """
+    Parse a JSON payload from a binary stream with bounded memory.
+
+    Returns (value, payload size in bytes). Raises ValueError for malformed JSON.
+    """
+    first = stream.read(chunk_size)
+    if len(first) < chunk_size:
+        return json.loads(first), len(first)
+
+    reader = PayloadReader(stream, chunk_size, max_string, prefix=first)
+    value = reader.parse()
+    return value, reader.bytes_read
+
+
+def read_payload(stream, chunk_size=DEFAULT_CHUNK_SIZE, max_string=DEFAULT_MAX_STRING):
+    """
+    Parse a JSON payload from a binary stream with bounded memory.
+
+    Raises ValueError for malformed JSON.
+    """
+    return read_payload_with_size(stream, chunk_size, max_string)[0]
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+PostToolUse / PostToolUseFailure hook that records approved calls.
+
+A protected tool only runs after the user approved its prompt, so seeing it
+here means the call was approved. Its fingerprint is stored in the approval
+cache, and an identical retry in the same session skips the prompt. This does
+nothing unless the approval cache is enabled (see approval_cache.py).
+"""
+import sys
+
+from hook_policy import PolicyError, load_table, record_approval
+from payload_reader import read_payload
+
+if __name__ == "__main__":
+    try:
+        input_data = read_payload(sys.stdin.buffer)
+        record_approval(load_table(), input_data)
+    except (OSError, ValueError, PolicyError):
+        pass
+    sys.exit(0)
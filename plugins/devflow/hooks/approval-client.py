@@ -0,0 +1 @@
+../../../hooks/approval-client.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../hooks/approval_cache.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../hooks/approval_daemon.py
\ No newline at end of file
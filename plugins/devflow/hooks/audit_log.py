@@ -0,0 +1 @@
+../../../hooks/audit_log.py
\ No newline at end of file
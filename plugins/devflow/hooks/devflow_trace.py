@@ -0,0 +1 @@
+../../../hooks/devflow_trace.py
\ No newline at end of file
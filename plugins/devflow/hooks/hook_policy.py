@@ -0,0 +1 @@
+../../../hooks/hook_policy.py
\ No newline at end of file
@@ -0,0 +1 @@
+../../../hooks/hook_probes.py
\ No newline at end of file
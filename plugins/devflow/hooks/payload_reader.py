@@ -0,0 +1 @@
+../../../hooks/payload_reader.py
\ No newline at end of file
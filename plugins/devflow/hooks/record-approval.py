@@ -0,0 +1 @@
+../../../hooks/record-approval.py
\ No newline at end of file
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Frontmatter benchmark - compares frontmatter.py with read_text + regex + PyYAML
+
+Parses every SKILL.md and agents/*.md in a repository both ways, checks that
+the results (or error messages) are identical, and reports:
+
+- per-file: in-process time to read and parse one file, both ways
+- startup: wall time of `python3 -c` importing quick_validate and validating
+  one skill, which now no longer imports PyYAML for plain frontmatter
+
+Usage:
+    bench_frontmatter.py [repository-root] [--runs N]
+
+Example:
+    bench_frontmatter.py . --runs 200
+"""
+
+import os
+import re
+import subprocess
+import sys
+import time
+
+import frontmatter
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def legacy_read(path):
+    """quick_validate's original extraction: the whole file, a regex and yaml.safe_load."""
+    import yaml
+    with open(path) as f:
+        content = f.read()
+    if not content.startswith("---"):
+        return "error", "No YAML frontmatter found"
+    match = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
+    if not match:
+        return "error", "Invalid frontmatter format"
+    try:
+        return "ok", yaml.safe_load(match.group(1))
+    except yaml.YAMLError as e:
+        return "error", f"Invalid YAML in frontmatter: {e}"
+
+
+def fast_read(path):
+    import yaml
+    try:
+        return "ok", frontmatter.read_frontmatter(path)
+    except frontmatter.FrontmatterError as e:
+        return "error", str(e)
+    except yaml.YAMLError as e:
+        return "error", f"Invalid YAML in frontmatter: {e}"
+
+
+def find_files(root):
+    found = []
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if d not in (".git", "node_modules", "__pycache__"))
+        for name in files:
+            if name == "SKILL.md" or (os.path.basename(directory) == "agents" and name.endswith(".md")):
+                found.append(os.path.join(directory, name))
+    return sorted(found)
+
+
+def per_file_us(fn, paths, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        for path in paths:
+            fn(path)
+    return (time.perf_counter() - started) / (runs * len(paths)) * 1e6
+
+
+def startup_ms(skill, runs, import_yaml):
+    code = ("import yaml\n" if import_yaml else "") + (
+        f"import sys; sys.path.insert(0, {SCRIPTS_DIR!r})\n"
+        f"from quick_validate import validate_skill; validate_skill({skill!r})"
+    )
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    runs = 100
+    if "--runs" in sys.argv:
+        index = sys.argv.index("--runs")
+        runs = int(sys.argv[index + 1])
+        del sys.argv[index:index + 2]
+    root = sys.argv[1] if len(sys.argv) > 1 else "."
+
+    paths = find_files(root)
+    if not paths:
+        print(f"❌ No SKILL.md or agents/*.md files under {root}")
+        sys.exit(1)
+    mismatches = [path for path in paths if legacy_read(path) != fast_read(path)]
+    for path in mismatches:
+        print(f"❌ {path}: results differ")
+    print(f"🔍 {len(paths)} files, {len(paths) - len(mismatches)} identical")
+
+    legacy = per_file_us(legacy_read, paths, runs)
+    fast = per_file_us(fast_read, paths, runs)
+    print(f"   per file: {legacy:.1f} µs legacy, {fast:.1f} µs fast ({legacy / fast:.1f}x)")
+
+    skill = os.path.dirname(next(path for path in paths if path.endswith("SKILL.md")))
+    startup_runs = max(5, runs // 10)
+    with_yaml = startup_ms(skill, startup_runs, True)
+    without = startup_ms(skill, startup_runs, False)
+    print(f"   validate one skill in a fresh process: {with_yaml:.1f} ms with PyYAML loaded, "
+          f"{without:.1f} ms without")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
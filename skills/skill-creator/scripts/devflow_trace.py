@@ -0,0 +1,194 @@
+"""
+Opt-in span tracing for the devflow hooks and skill-creator scripts.
+
+Set DEVFLOW_TRACE=1 (or a file path) to record monotonic-clock spans in the
+Chrome trace event format; open the file in chrome://tracing or
+https://ui.perfetto.dev. Every traced process appends its events to the same
+file, so a whole session (many short-lived hook runs) lands in one trace.
+The file is a JSON array that is never closed, which both viewers accept.
+
+Set DEVFLOW_TRACE_MEMORY=1 to also record the tracemalloc peak of each span
+(slower; use it to find allocations, not to measure time).
+
+The skill-creator scripts accept --trace[=FILE] instead of the environment
+variable. This file lives in skills/skill-creator/scripts/ so the skill works
+when copied on its own; hooks/devflow_trace.py is a symlink to it.
+
+Usage:
+    from devflow_trace import span
+    with span("parse", "hook", bytes=size):
+        ...
+
+Environment:
+    DEVFLOW_TRACE         1 for ~/.cache/devflow/trace.json, or a trace file path
+    DEVFLOW_TRACE_MEMORY  1 to add tracemalloc peaks (peak_kb) to every span
+"""
+import _thread
+import os
+import sys
+import time
+
+
+class _NullSpan:
+    """Shared no-op span used while tracing is off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL = _NullSpan()
+_tracer = None
+
+
+class _Span:
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def set(self, **args):
+        """Attach extra arguments (e.g. counts known only at the end) to the span."""
+        self.args.update(args)
+
+    def __enter__(self):
+        self.tracer._enter()
+        self.start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.monotonic_ns()
+        peak = self.tracer._exit()
+        if peak is not None:
+            self.args["peak_kb"] = round(peak / 1024, 1)
+        event = {
+            "name": self.name, "cat": self.category, "ph": "X",
+            "ts": self.start / 1000, "dur": (end - self.start) / 1000,
+            "pid": os.getpid(), "tid": _thread.get_native_id(),
+        }
+        if self.args:
+            event["args"] = self.args
+        self.tracer.events.append(event)
+        return False
+
+
+class _Tracer:
+    def __init__(self, path, memory):
+        self.path = path
+        self._reset()
+        self.peaks = None
+        if memory:
+            import tracemalloc
+            tracemalloc.start()
+            self.tracemalloc = tracemalloc
+            self.peaks = []
+        # Forked workers (process pools) must not re-emit the parent's events
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self.events = [{
+            "name": "process_name", "ph": "M", "pid": os.getpid(), "tid": 0,
+            "args": {"name": os.path.basename(sys.argv[0]) or "python"},
+        }]
+
+    def _enter(self):
+        if self.peaks is not None:
+            # The parent's peak so far must survive our reset
+            if self.peaks:
+                self.peaks[-1] = max(self.peaks[-1], self.tracemalloc.get_traced_memory()[1])
+            self.tracemalloc.reset_peak()
+            self.peaks.append(0)
+
+    def _exit(self):
+        if self.peaks is None:
+            return None
+        peak = max(self.peaks.pop(), self.tracemalloc.get_traced_memory()[1])
+        if self.peaks:
+            self.peaks[-1] = max(self.peaks[-1], peak)
+        return peak
+
+    def flush(self):
+        """Append buffered events to the trace file in one write."""
+        if not any(e["ph"] != "M" for e in self.events):
+            return
+        import json
+        # Swap first: threads of a long-lived process keep appending
+        events, self.events = self.events, []
+        data = "".join(json.dumps(e, separators=(",", ":")) + ",\n" for e in events)
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            if not os.path.exists(self.path):
+                # Publish the opening bracket atomically so racing writers agree
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "w") as f:
+                    f.write("[\n")
+                try:
+                    os.link(tmp, self.path)
+                except FileExistsError:
+                    pass
+                finally:
+                    os.unlink(tmp)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+            try:
+                os.write(fd, data.encode())
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"devflow_trace: cannot write {self.path}: {e}", file=sys.stderr)
+
+
+def _default_path():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "devflow", "trace.json")
+
+
+def enable(path=None, memory=None):
+    """Turn tracing on for this process; events are written at exit."""
+    global _tracer
+    if _tracer is not None:
+        return
+    if memory is None:
+        memory = os.environ.get("DEVFLOW_TRACE_MEMORY", "") not in ("", "0")
+    _tracer = _Tracer(os.path.abspath(path or _default_path()), memory)
+    import atexit
+    atexit.register(_tracer.flush)
+
+
+def enable_from_argv(argv):
+    """Handle and remove a --trace or --trace=FILE flag from argv (in place)."""
+    for i, arg in enumerate(argv):
+        if arg == "--trace" or arg.startswith("--trace="):
+            del argv[i]
+            enable(arg.partition("=")[2] or None)
+            return True
+    return False
+
+
+def span(name, category="", **args):
+    """Return a context manager that records a span (a no-op unless tracing is on)."""
+    if _tracer is None:
+        return _NULL
+    return _Span(_tracer, name, category, args)
+
+
+def enabled():
+    return _tracer is not None
+
+
+def flush():
+    """Write buffered events now (long-lived processes; others flush at exit)."""
+    if _tracer is not None:
+        _tracer.flush()
+
+
+_setting = os.environ.get("DEVFLOW_TRACE", "")
+if _setting and _setting != "0":
+    enable(None if _setting == "1" else _setting)
@@ -0,0 +1,163 @@
+"""
+Frontmatter reader - Reads the YAML frontmatter of SKILL.md and agent files
+
+Reads a file only up to the closing '---' line and parses the flat subset of
+YAML that frontmatter uses in practice (key: scalar, quoted strings, booleans,
+"key:" followed by "  - item" lists, and one level of nested "  key: value"
+mappings) without importing PyYAML. Anything outside that subset -- block
+scalars, flow collections, numbers, comments, escapes, anchors -- is handed
+to yaml.safe_load (imported on first use), so results always equal PyYAML's.
+
+The delimiters follow quick_validate's original rules: the file must start
+with a '---' line, and the frontmatter ends at the first later line starting
+with '---'.
+"""
+
+import io
+import re
+
+_KEY = re.compile(r"([A-Za-z_][A-Za-z0-9_-]*):(?: (.*))?\Z")
+_ITEM = re.compile(r"  - (.*)\Z")
+_NESTED = re.compile(r"  ([A-Za-z_][A-Za-z0-9_-]*):(?: (.*))?\Z")
+# Characters PyYAML rejects or treats as line breaks, plus the BOM
+_UNUSUAL = re.compile("[^\x0A\x20-\x7E\xA0-\u2027\u202A-\uD7FF\uE000-\uFEFE\uFF00-\uFFFD\U00010000-\U0010FFFF]")
+
+# PyYAML's implicit bool and null spellings (YAML 1.1)
+_BOOLEANS = {
+    "yes": True, "Yes": True, "YES": True, "true": True, "True": True, "TRUE": True,
+    "on": True, "On": True, "ON": True,
+    "no": False, "No": False, "NO": False, "false": False, "False": False, "FALSE": False,
+    "off": False, "Off": False, "OFF": False,
+}
+_NULLS = {"", "~", "null", "Null", "NULL"}
+# First characters that make a plain scalar special (indicators, numbers, dates)
+_SPECIAL_START = set("-?:,[]{}#&*!|>'\"%@`+.0123456789=<")
+
+
+class _Complex(Exception):
+    """The text is outside the fast subset; use PyYAML."""
+
+
+class FrontmatterError(Exception):
+    """Missing or malformed frontmatter; str() is the validation message."""
+
+
+def _take_frontmatter(f):
+    """Consume lines from f up to and including the closing delimiter."""
+    first = f.readline()
+    if not first.startswith("---"):
+        raise FrontmatterError("No YAML frontmatter found")
+    if first != "---\n":
+        raise FrontmatterError("Invalid frontmatter format")
+    lines = []
+    for line in f:
+        # The line right after the opening delimiter cannot close it
+        if lines and line.startswith("---"):
+            return "".join(lines)[:-1]
+        lines.append(line)
+    raise FrontmatterError("Invalid frontmatter format")
+
+
+def read_frontmatter_text(path):
+    """
+    Return the raw frontmatter text of a file, reading no further than the
+    closing delimiter. Raises FrontmatterError if there is none.
+    """
+    with open(path) as f:
+        return _take_frontmatter(f)
+
+
+def split_frontmatter(content):
+    """
+    Split already-read file content into (frontmatter text, body), where the
+    body starts after the closing delimiter line. Raises FrontmatterError.
+    """
+    f = io.StringIO(content, newline="\n")
+    text = _take_frontmatter(f)
+    return text, f.read()
+
+
+def _scalar(text):
+    """Convert a fast-subset scalar; raise _Complex for anything else."""
+    text = text.strip(" ")
+    if not text:
+        return None
+    first = text[0]
+    if first == '"':
+        inner = text[1:-1]
+        if len(text) < 2 or text[-1] != '"' or '"' in inner or "\\" in inner:
+            raise _Complex
+        return inner
+    if first == "'":
+        inner = text[1:-1]
+        if len(text) < 2 or text[-1] != "'" or "'" in inner:
+            raise _Complex
+        return inner
+    if first in _SPECIAL_START or ": " in text or " #" in text or text.endswith(":"):
+        raise _Complex
+    if text in _BOOLEANS:
+        return _BOOLEANS[text]
+    if text in _NULLS:
+        return None
+    return text
+
+
+def parse_flat(text):
+    """Parse the fast YAML subset into a dict; raise _Complex otherwise."""
+    if _UNUSUAL.search(text):
+        raise _Complex
+    result = {}
+    block = None
+    for line in text.split("\n"):
+        if not line.strip(" "):
+            continue
+        match = _KEY.match(line)
+        if match and match.group(1) not in _BOOLEANS and match.group(1) not in _NULLS:
+            key, value = match.groups()
+            if value is not None and value.strip(" "):
+                result[key] = _scalar(value)
+                block = None
+            else:
+                result[key] = None
+                block = key
+            continue
+        if block is None:
+            raise _Complex
+        item = _ITEM.match(line)
+        if item and (result[block] is None or isinstance(result[block], list)):
+            if result[block] is None:
+                result[block] = []
+            result[block].append(_scalar(item.group(1)))
+            continue
+        nested = _NESTED.match(line)
+        if nested and (result[block] is None or isinstance(result[block], dict)):
+            if result[block] is None:
+                result[block] = {}
+            value = nested.group(2)
+            if value is None or not value.strip(" "):
+                raise _Complex
+            result[block][nested.group(1)] = _scalar(value)
+            continue
+        raise _Complex
+    if not result:
+        # An empty document is None to PyYAML, not {}
+        raise _Complex
+    return result
+
+
+def parse_frontmatter(text):
+    """
+    Parse frontmatter text like yaml.safe_load, using the fast path when it
+    can. Raises yaml.YAMLError for invalid YAML (only possible on the PyYAML
+    path, which is imported lazily).
+    """
+    try:
+        return parse_flat(text)
+    except _Complex:
+        import yaml
+        return yaml.safe_load(text)
+
+
+def read_frontmatter(path):
+    """Return the parsed frontmatter of a file (see read_frontmatter_text)."""
+    return parse_frontmatter(read_frontmatter_text(path))
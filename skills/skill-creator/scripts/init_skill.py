@@ -1,18 +1,61 @@
 #!/usr/bin/env python3
 """
-Skill Initializer - Creates a new skill from template
+Skill Initializer - Creates new skills from a template
+
+Creates one skill, or every skill listed in a manifest, from the built-in
+template or from a template directory. Each skill is built in a temporary
+directory next to its destination and renamed into place, so a failure never
+leaves a half-built skill behind.
+
+A template directory is any folder with a SKILL.md. All of its files are
+copied (build debris such as __pycache__ is skipped; executable bits are kept)
+and {skill_name}, {skill_title} and any manifest "vars" placeholders are
+replaced in file contents and paths; other braces are left untouched.
+
+A manifest is a JSON file; relative paths in it are relative to the manifest,
+and each template is loaded once however many skills use it:
+
+    {
+      "path": "skills",
+      "template": "templates/api-skill",
+      "vars": {"team": "platform"},
+      "skills": [
+        "billing-api",
+        {"name": "search-api", "vars": {"team": "search"}},
+        {"name": "notes", "path": "skills/private", "template": null}
+      ]
+    }
+
+"template": null (or none at all) uses the built-in template; --path and
+--template give the defaults when the manifest does not.
 
 Usage:
-    init_skill.py <skill-name> --path <path>
+    init_skill.py <skill-name> --path <path> [--template DIR] [--trace[=FILE]]
+    init_skill.py --manifest FILE [--path <path>] [--template DIR] [--trace[=FILE]]
 
 Examples:
     init_skill.py my-new-skill --path skills/public
     init_skill.py my-api-helper --path skills/private
     init_skill.py custom-skill --path /custom/location
+    init_skill.py api-client --path skills --template templates/api-skill
+    init_skill.py --manifest new-skills.json
 """
 
+import json
+import os
+import re
+import shutil
 import sys
+import time
 from pathlib import Path
+from devflow_trace import enable_from_argv, span
+from package_skill import pop_option
+from skill_files import DEFAULT_IGNORES, IGNORE_FILE, IgnoreRules, walk_skill_files
+
+BUILTIN_TEMPLATE = "built-in template"
+SKILL_NAME = re.compile(r'^[a-z0-9]+(-[a-z0-9]+)*$')
+MAX_NAME_LENGTH = 64
+PLACEHOLDER = re.compile(r'\{(\w+)\}')
 
 
 SKILL_TEMPLATE = """---
@@ -191,107 +234,282 @@ def title_case_skill_name(skill_name):
     return ' '.join(word.capitalize() for word in skill_name.split('-'))
 
 
-def init_skill(skill_name, path):
+class Template:
+    """A skill template held in memory as (relative path, bytes, executable) per file."""
+
+    def __init__(self, name, files):
+        self.name = name
+        self.files = files
+
+
+def builtin_template():
+    """The inline SKILL_TEMPLATE and example files."""
+    return Template(BUILTIN_TEMPLATE, [
+        ('SKILL.md', SKILL_TEMPLATE.encode(), False),
+        ('scripts/example.py', EXAMPLE_SCRIPT.encode(), True),
+        ('references/api_reference.md', EXAMPLE_REFERENCE.encode(), False),
+        ('assets/example_asset.txt', EXAMPLE_ASSET.encode(), False),
+    ])
+
+
+def load_template(template_dir):
     """
-    Initialize a new skill directory with template SKILL.md.
+    Read a template directory into memory.
+
+    Build debris is skipped as when packaging (see skill_files.py), but the
+    template's .skillignore is copied rather than applied. Raises ValueError
+    if the directory has no SKILL.md.
+    """
+    rules = IgnoreRules([pattern for pattern in DEFAULT_IGNORES if pattern != IGNORE_FILE])
+    files = []
+    with span("load_template", "init", template=str(template_dir)):
+        for relpath, file_path, _ in walk_skill_files(template_dir, rules):
+            files.append((relpath, Path(file_path).read_bytes(), os.access(file_path, os.X_OK)))
+    if not any(relpath == 'SKILL.md' for relpath, _, _ in files):
+        raise ValueError(f"Template has no SKILL.md: {template_dir}")
+    return Template(str(template_dir), files)
+
+
+def render(text, variables):
+    """Replace {name} placeholders for known variables; other braces are left as they are."""
+    return PLACEHOLDER.sub(lambda m: variables.get(m.group(1), m.group(0)), text)
+
+
+def scaffold(skill_name, path, template, variables=None, verbose=True):
+    """
+    Build a skill from a template in a temporary directory, then rename it into place.
+
+    The temporary directory sits next to the target, so the rename is atomic:
+    the skill either appears complete or not at all.
 
     Args:
         skill_name: Name of the skill
         path: Path where the skill directory should be created
+        template: Template to render
+        variables: Extra {placeholder} values; skill_name always wins
+        verbose: Print each created file
 
     Returns:
         Path to created skill directory, or None if error
     """
-    # Determine skill directory path
     skill_dir = Path(path).resolve() / skill_name
-
-    # Check if directory already exists
     if skill_dir.exists():
         print(f"❌ Error: Skill directory already exists: {skill_dir}")
         return None
 
-    # Create skill directory
+    values = {'skill_title': title_case_skill_name(skill_name), **(variables or {}), 'skill_name': skill_name}
+    tmp_dir = skill_dir.with_name(f".{skill_name}.{os.getpid()}.tmp")
     try:
-        skill_dir.mkdir(parents=True, exist_ok=False)
-        print(f"✅ Created skill directory: {skill_dir}")
+        with span("mkdir", "init", path=str(skill_dir)):
+            skill_dir.parent.mkdir(parents=True, exist_ok=True)
+            if tmp_dir.exists():
+                shutil.rmtree(tmp_dir)
+            tmp_dir.mkdir()
+        created = []
+        for relpath, data, executable in template.files:
+            relpath = render(relpath, values)
+            try:
+                data = render(data.decode('utf-8'), values).encode('utf-8')
+            except UnicodeDecodeError:
+                # Binary assets are copied as they are
+                pass
+            target = tmp_dir / relpath
+            with span("write", "init", file=relpath, bytes=len(data)):
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+                if executable:
+                    target.chmod(0o755)
+            created.append(relpath)
+        with span("rename", "init", path=str(skill_dir)):
+            os.rename(tmp_dir, skill_dir)
     except Exception as e:
-        print(f"❌ Error creating directory: {e}")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        print(f"❌ Error creating {skill_dir}: {e}")
         return None
 
-    # Create SKILL.md from template
-    skill_title = title_case_skill_name(skill_name)
-    skill_content = SKILL_TEMPLATE.format(
-        skill_name=skill_name,
-        skill_title=skill_title
-    )
+    if verbose:
+        print(f"✅ Created skill directory: {skill_dir}")
+        for relpath in created:
+            print(f"✅ Created {relpath}")
+    return skill_dir
+
+
+def init_skill(skill_name, path, template_dir=None):
+    """
+    Initialize a new skill directory with template SKILL.md.
 
-    skill_md_path = skill_dir / 'SKILL.md'
+    Args:
+        skill_name: Name of the skill
+        path: Path where the skill directory should be created
+        template_dir: Template directory to copy instead of the built-in files
+
+    Returns:
+        Path to created skill directory, or None if error
+    """
     try:
-        skill_md_path.write_text(skill_content)
-        print("✅ Created SKILL.md")
-    except Exception as e:
-        print(f"❌ Error creating SKILL.md: {e}")
+        template = load_template(Path(template_dir)) if template_dir else builtin_template()
+    except (OSError, ValueError) as e:
+        print(f"❌ Error loading template: {e}")
         return None
 
-    # Create resource directories with example files
-    try:
-        # Create scripts/ directory with example script
-        scripts_dir = skill_dir / 'scripts'
-        scripts_dir.mkdir(exist_ok=True)
-        example_script = scripts_dir / 'example.py'
-        example_script.write_text(EXAMPLE_SCRIPT.format(skill_name=skill_name))
-        example_script.chmod(0o755)
-        print("✅ Created scripts/example.py")
-
-        # Create references/ directory with example reference doc
-        references_dir = skill_dir / 'references'
-        references_dir.mkdir(exist_ok=True)
-        example_reference = references_dir / 'api_reference.md'
-        example_reference.write_text(EXAMPLE_REFERENCE.format(skill_title=skill_title))
-        print("✅ Created references/api_reference.md")
-
-        # Create assets/ directory with example asset placeholder
-        assets_dir = skill_dir / 'assets'
-        assets_dir.mkdir(exist_ok=True)
-        example_asset = assets_dir / 'example_asset.txt'
-        example_asset.write_text(EXAMPLE_ASSET)
-        print("✅ Created assets/example_asset.txt")
-    except Exception as e:
-        print(f"❌ Error creating resource directories: {e}")
+    skill_dir = scaffold(skill_name, path, template)
+    if skill_dir is None:
         return None
 
     # Print next steps
     print(f"\n✅ Skill '{skill_name}' initialized successfully at {skill_dir}")
     print("\nNext steps:")
     print("1. Edit SKILL.md to complete the TODO items and update the description")
-    print("2. Customize or delete the example files in scripts/, references/, and assets/")
+    if template_dir:
+        print("2. Customize or delete the files copied from the template")
+    else:
+        print("2. Customize or delete the example files in scripts/, references/, and assets/")
     print("3. Run the validator when ready to check the skill structure")
 
     return skill_dir
 
 
+def read_manifest(manifest_path, default_path=None, default_template=None):
+    """
+    Parse a manifest into a list of (name, path, template directory or None, variables).
+
+    Relative paths in the manifest are relative to the manifest file. Raises
+    ValueError listing every problem, so nothing is created from a bad manifest.
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('skills'), list):
+        raise ValueError("Manifest must be an object with a \"skills\" list")
+    base = manifest_path.resolve().parent
+
+    def resolve(value):
+        return str(base / value) if isinstance(value, str) else None
+
+    top_path = resolve(manifest.get('path')) or default_path
+    # An explicit "template": null selects the built-in template
+    top_template = resolve(manifest['template']) if 'template' in manifest else default_template
+    top_vars = manifest.get('vars', {})
+
+    entries = []
+    problems = []
+    seen = set()
+    for index, item in enumerate(manifest['skills']):
+        spec = {'name': item} if isinstance(item, str) else item
+        name = spec.get('name') if isinstance(spec, dict) else None
+        if not isinstance(name, str) or not SKILL_NAME.match(name) or len(name) > MAX_NAME_LENGTH:
+            problems.append(f"skills[{index}]: name must be hyphen-case, at most {MAX_NAME_LENGTH} characters")
+            continue
+        path = resolve(spec.get('path')) or top_path
+        if path is None:
+            problems.append(f"{name}: no path (set \"path\" in the manifest or pass --path)")
+            continue
+        spec_vars = spec.get('vars', {})
+        if not isinstance(top_vars, dict) or not isinstance(spec_vars, dict) \
+                or not all(isinstance(value, str) for value in {**top_vars, **spec_vars}.values()):
+            problems.append(f"{name}: vars must map names to strings")
+            continue
+        variables = {**top_vars, **spec_vars}
+        target = Path(path).resolve() / name
+        if target in seen:
+            problems.append(f"{name}: listed twice for {target}")
+            continue
+        seen.add(target)
+        template_dir = resolve(spec['template']) if 'template' in spec else top_template
+        entries.append((name, path, template_dir, variables))
+    if problems:
+        raise ValueError("; ".join(problems))
+    return entries
+
+
+def init_from_manifest(manifest_path, default_path=None, default_template=None):
+    """
+    Create every skill listed in a manifest, loading each template once.
+
+    A skill that cannot be created is reported and does not stop the others.
+
+    Returns (created, failed) lists of skill names, or None if the manifest
+    or a template cannot be read.
+    """
+    try:
+        entries = read_manifest(manifest_path, default_path, default_template)
+        templates = {}
+        for _, _, template_dir, _ in entries:
+            if template_dir not in templates:
+                templates[template_dir] = load_template(Path(template_dir)) if template_dir else builtin_template()
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: {e}")
+        return None
+
+    created, failed = [], []
+    for name, path, template_dir, variables in entries:
+        template = templates[template_dir]
+        with span("init_skill", "init", skill=name):
+            skill_dir = scaffold(name, path, template, variables, verbose=False)
+        if skill_dir is None:
+            failed.append(name)
+        else:
+            created.append(name)
+            print(f"✅ {name}: {skill_dir} ({len(template.files)} files from {template.name})")
+    return created, failed
+
+
+def usage():
+    print("Usage: init_skill.py <skill-name> --path <path> [--template DIR] [--trace[=FILE]]")
+    print("       init_skill.py --manifest FILE [--path <path>] [--template DIR] [--trace[=FILE]]")
+    print("\nSkill name requirements:")
+    print("  - Hyphen-case identifier (e.g., 'data-analyzer')")
+    print("  - Lowercase letters, digits, and hyphens only")
+    print(f"  - Max {MAX_NAME_LENGTH} characters")
+    print("  - Must match directory name exactly")
+    print("\nExamples:")
+    print("  init_skill.py my-new-skill --path skills/public")
+    print("  init_skill.py my-api-helper --path skills/private")
+    print("  init_skill.py custom-skill --path /custom/location")
+    print("  init_skill.py api-client --path skills --template templates/api-skill")
+    print("  init_skill.py --manifest new-skills.json")
+    sys.exit(1)
+
+
 def main():
-    if len(sys.argv) < 4 or sys.argv[2] != '--path':
-        print("Usage: init_skill.py <skill-name> --path <path>")
-        print("\nSkill name requirements:")
-        print("  - Hyphen-case identifier (e.g., 'data-analyzer')")
-        print("  - Lowercase letters, digits, and hyphens only")
-        print("  - Max 40 characters")
-        print("  - Must match directory name exactly")
-        print("\nExamples:")
-        print("  init_skill.py my-new-skill --path skills/public")
-        print("  init_skill.py my-api-helper --path skills/private")
-        print("  init_skill.py custom-skill --path /custom/location")
-        sys.exit(1)
+    enable_from_argv(sys.argv)
+    path = pop_option(sys.argv, '--path')
+    template_dir = pop_option(sys.argv, '--template')
+    manifest_path = pop_option(sys.argv, '--manifest')
+    if path == "" or template_dir == "" or manifest_path == "" \
+            or any(arg.startswith('-') for arg in sys.argv[1:]):
+        usage()
+
+    if manifest_path is not None:
+        if len(sys.argv) != 1:
+            usage()
+        print(f"🚀 Initializing skills from {manifest_path}")
+        print()
+        started = time.perf_counter()
+        with span("init_from_manifest", "init", manifest=manifest_path):
+            result = init_from_manifest(manifest_path, path, template_dir)
+        if result is None:
+            sys.exit(1)
+        created, failed = result
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"\n📦 Created {len(created)} of {len(created) + len(failed)} skills in {elapsed:.0f} ms")
+        for name in failed:
+            print(f"   ❌ {name}")
+        sys.exit(1 if failed else 0)
+
+    if len(sys.argv) != 2 or path is None:
+        usage()
 
     skill_name = sys.argv[1]
-    path = sys.argv[3]
 
     print(f"🚀 Initializing skill: {skill_name}")
     print(f"   Location: {path}")
+    if template_dir:
+        print(f"   Template: {template_dir}")
     print()
 
-    result = init_skill(skill_name, path)
+    with span("init_skill", "init", skill=skill_name):
+        result = init_skill(skill_name, path, template_dir)
 
     if result:
         sys.exit(0)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Link Graph Checker - Checks the progressive-disclosure links of skills and agents
+
+Builds a graph of the files each SKILL.md and agent file can lead Claude to
+load, and reports:
+
+- dangling links: Markdown links ([text](path) and [ref]: path definitions)
+  whose target does not exist, or that leave the skill folder and so are not
+  packaged with it
+- unreachable files: files that would be packaged with a skill (see
+  skill_files.py and .skillignore) but that nothing reachable from its
+  SKILL.md refers to
+- the total bytes reachable from each entry point
+
+Edges come from Markdown links, from paths mentioned in the text (such as
+`references/schema.md` or "See references/workflows.md") when they name an
+existing file or directory (relative to the file, the skill folder or the
+repository root), and from Python imports of sibling modules, so a script
+mentioned in SKILL.md keeps its helpers reachable. A Markdown link to a
+directory reaches every file in it. A skill's graph stays inside its own folder:
+mentions of other skills' files are not followed. Links inside fenced code
+blocks (examples), URLs and ${VARIABLE} paths are ignored.
+
+The references found in each file are cached by path, size and modification
+time, so a re-run only re-parses files that changed.
+
+Usage:
+    python link_graph.py [repository-root] [--no-cache] [--trace[=FILE]]
+
+Example:
+    python link_graph.py
+    python link_graph.py ~/src/claude-code-primitives --no-cache
+
+Environment:
+    XDG_CACHE_HOME  Cache location (default ~/.cache); references are kept in
+                    devflow/link-graph-cache.json
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import unquote
+
+from devflow_trace import enable_from_argv, span
+from skill_files import walk_skill_files
+from validate_all import cache_path, discover_agents, discover_skills
+
+CACHE_NAME = "link-graph-cache.json"
+CACHE_MAX_ENTRIES = 8192
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_LINK = re.compile(r"!?\[[^\]]*\]\(\s*<?([^)\s>]+)>?(?:\s+[\"'(][^)]*)?\)")
+_DEFINITION = re.compile(r"^\s{0,3}\[[^\]]+\]:\s*<?([^\s>]+)>?(?:\s+[\"'(].*)?\s*$")
+_PATHLIKE = re.compile(r"^[\w.][\w./-]*\.\w+$")
+# Punctuation around a path mentioned in prose or inline code
+_TOKEN_EDGES = "`\"'()[]<>,;:*"
+_SCHEME = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+_IMPORT = re.compile(r"^\s*(?:from\s+(\w+)\s+import\b|import\s+([\w, ]+))")
+
+_version = None
+
+
+def graph_version():
+    """Hash of this file: changing the parser invalidates cached references."""
+    global _version
+    if _version is None:
+        with open(os.path.abspath(__file__), "rb") as f:
+            _version = hashlib.sha256(f.read()).hexdigest()[:16]
+    return _version
+
+
+class ReferenceCache:
+    """References found in each file, keyed by path and checked by size and mtime."""
+
+    def __init__(self, path=None):
+        self.path = path or cache_path(CACHE_NAME)
+        self.files = {}
+        self.dirty = False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == graph_version():
+                self.files = data["files"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def get(self, path, stat):
+        entry = self.files.pop(path, None)
+        if entry is None:
+            return None
+        # Re-insert so dict order tracks recent use
+        self.files[path] = entry
+        if entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size:
+            return None
+        return entry[2]
+
+    def put(self, path, stat, refs):
+        self.files.pop(path, None)
+        self.files[path] = [stat.st_mtime_ns, stat.st_size, refs]
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        files = dict(list(self.files.items())[-CACHE_MAX_ENTRIES:])
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"version": graph_version(), "files": files}, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"link_graph: cannot write cache {self.path}: {e}", file=sys.stderr)
+
+
+def _clean_target(target):
+    """Strip anchors and queries; None for URLs, anchors and templated paths."""
+    if target.startswith("#") or _SCHEME.match(target) or "$" in target or "{" in target:
+        return None
+    target = unquote(target.split("#", 1)[0].split("?", 1)[0])
+    return target or None
+
+
+def parse_markdown(text):
+    """Return the [kind, target, line] references of a Markdown file; kind is "link" or "path"."""
+    refs = []
+    in_fence = None
+    for number, line in enumerate(text.split("\n"), 1):
+        fence = _FENCE.match(line)
+        if fence:
+            if in_fence is None:
+                in_fence = fence.group(1)
+            elif fence.group(1) == in_fence:
+                in_fence = None
+            continue
+        targets = []
+        # Links in code blocks are examples; paths there are usually commands to run
+        if in_fence is None:
+            targets.extend(("link", m.group(1)) for m in _LINK.finditer(line))
+            definition = _DEFINITION.match(line)
+            if definition:
+                targets.append(("link", definition.group(1)))
+        for token in _LINK.sub(" ", line).split():
+            token = token.strip(_TOKEN_EDGES).rstrip(".").strip(_TOKEN_EDGES)
+            if ("/" in token or "." in token) and _PATHLIKE.match(token):
+                targets.append(("path", token))
+        for kind, target in targets:
+            target = _clean_target(target)
+            if target:
+                refs.append([kind, target, number])
+    return refs
+
+
+def parse_python(text):
+    """Return the ["import", module, line] references of a Python file."""
+    refs = []
+    for number, line in enumerate(text.split("\n"), 1):
+        match = _IMPORT.match(line)
+        if not match:
+            continue
+        if match.group(1):
+            modules = [match.group(1)]
+        else:
+            modules = [part.split()[0] for part in match.group(2).split(",") if part.strip()]
+        refs.extend(["import", module, number] for module in modules)
+    return refs
+
+
+def file_refs(path, cache):
+    """References of one file, from the cache when it is unchanged."""
+    parser = parse_markdown if path.endswith(".md") else parse_python if path.endswith(".py") else None
+    if parser is None:
+        return []
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return []
+    refs = cache.get(path, stat) if cache is not None else None
+    if refs is None:
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                refs = parser(f.read())
+        except OSError:
+            refs = []
+        if cache is not None:
+            cache.put(path, stat, refs)
+    return refs
+
+
+def _resolve(kind, target, source, skill_root, root):
+    """Return the normalized path a reference points at, or None if it does not exist."""
+    if kind == "import":
+        candidates = [os.path.join(os.path.dirname(source), target + ".py")]
+    elif kind == "link" or os.path.isabs(target):
+        candidates = [os.path.join(os.path.dirname(source), target)]
+    else:
+        candidates = [os.path.join(base, target) for base in (os.path.dirname(source), skill_root, root) if base]
+    for candidate in candidates:
+        if os.path.exists(candidate):
+            return os.path.normpath(candidate)
+    return None
+
+
+def walk_entry(entry, skill_root, root, cache):
+    """
+    Follow every reference reachable from one entry point.
+
+    Returns (reachable, dangling): a dict of reachable file paths to their
+    sizes, and a list of (source, line, target, reason) for broken links.
+    Paths are normalized but not resolved, so a symlinked file inside a skill
+    folder counts as part of that skill.
+    """
+    reachable = {entry: os.path.getsize(entry)}
+    dangling = []
+    queue = [entry]
+    while queue:
+        source = queue.pop()
+        for kind, target, line in file_refs(source, cache):
+            resolved = _resolve(kind, target, source, skill_root, root)
+            if resolved is None:
+                if kind == "link":
+                    dangling.append((source, line, target, "does not exist"))
+                continue
+            if skill_root and os.path.commonpath([resolved, skill_root]) != skill_root:
+                if kind == "link":
+                    dangling.append((source, line, target, "is outside the skill folder and not packaged"))
+                continue
+            if os.path.isdir(resolved):
+                if kind != "link":
+                    continue
+                files = [os.path.join(directory, name) for directory, _, names in os.walk(resolved) for name in names]
+            else:
+                files = [resolved]
+            for path in files:
+                if path not in reachable:
+                    reachable[path] = os.path.getsize(path)
+                    queue.append(path)
+    return reachable, dangling
+
+
+def check_links(root, use_cache=True):
+    """
+    Build the link graph of every skill and agent under root.
+
+    Returns a dict with:
+        entries: list of {"path", "kind", "files", "bytes"} per entry point
+        dangling: list of (path, line, target, reason)
+        unreachable: list of (path, size) of packaged but unreferenced files
+    Paths are relative to root; symlinked copies are checked once.
+    """
+    root = os.path.realpath(root)
+    cache = ReferenceCache() if use_cache else None
+    seen = set()
+    entries = []
+    dangling = set()
+    unreachable = []
+
+    found = [("skill", relpath) for relpath in discover_skills(root)]
+    found += [("agent", relpath) for relpath in discover_agents(root)]
+    for kind, relpath in found:
+        real = os.path.realpath(os.path.join(root, relpath))
+        if real in seen:
+            continue
+        seen.add(real)
+        with span("walk", "links", path=relpath):
+            if kind == "skill":
+                entry = os.path.join(real, "SKILL.md")
+                reachable, broken = walk_entry(entry, real, root, cache)
+                for file_relpath, file_path, size in walk_skill_files(real):
+                    if os.path.normpath(file_path) not in reachable:
+                        unreachable.append((os.path.relpath(file_path, root), size))
+            else:
+                entry = real
+                reachable, broken = walk_entry(entry, None, root, cache)
+        dangling.update((os.path.relpath(source, root), line, target, reason)
+                        for source, line, target, reason in broken)
+        entries.append({
+            "path": os.path.relpath(entry, root),
+            "kind": kind,
+            "files": len(reachable),
+            "bytes": sum(reachable.values()),
+        })
+
+    if cache is not None:
+        cache.save()
+    return {"entries": entries, "dangling": sorted(dangling), "unreachable": sorted(unreachable)}
+
+
+def main():
+    enable_from_argv(sys.argv)
+    use_cache = "--no-cache" not in sys.argv
+    if not use_cache:
+        sys.argv.remove("--no-cache")
+    if len(sys.argv) > 2 or any(arg.startswith("-") for arg in sys.argv[1:]):
+        print("Usage: python link_graph.py [repository-root] [--no-cache] [--trace[=FILE]]")
+        sys.exit(1)
+
+    root = sys.argv[1] if len(sys.argv) > 1 else "."
+    started = time.perf_counter()
+    with span("link_graph", "links", root=root):
+        report = check_links(root, use_cache)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for path, line, target, reason in report["dangling"]:
+        print(f"❌ {path}:{line}: {target} {reason}")
+    for path, size in report["unreachable"]:
+        print(f"⚠️  {path}: not reachable from SKILL.md ({size:,} bytes packaged)")
+    if report["dangling"] or report["unreachable"]:
+        print()
+
+    print("📋 Bytes reachable per entry point:")
+    for entry in sorted(report["entries"], key=lambda e: (-e["bytes"], e["path"])):
+        print(f"   {entry['bytes']:>9,}  {entry['files']:>3} files  {entry['path']}")
+    print(f"\n🔍 {len(report['entries'])} entry points: {len(report['dangling'])} dangling links, "
+          f"{len(report['unreachable'])} unreachable files in {elapsed:.0f} ms")
+    sys.exit(1 if report["dangling"] or report["unreachable"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Bulk Skill Packager - Packages every skill of every plugin in a marketplace
+
+Reads .claude-plugin/marketplace.json and each plugin's plugin.json, collects
+the skill folders (the plugin's skills/ directory plus any "skills" paths in
+plugin.json), resolves symlinks to real directories and packages each real
+directory once. Skills are validated and packaged in a process pool; a skill
+that fails is reported and does not stop the others.
+
+Packages are written to <output-directory>/<plugin>/<skill>.skill, and a
+summary manifest (manifest.json) lists each skill's output, size, SHA-256 and
+timing.
+
+With --bundle FILE, the validated skills are written to a single
+content-addressed bundle instead (see skill_bundle.py), storing each distinct
+file once; skill names must then be unique across plugins.
+
+quick_validate only accepts the portable skill format (hyphen-case names,
+standard frontmatter keys). Plugin skills with namespaced names such as
+devflow:pm:define-prd or extra keys such as user-invocable fail it, so
+--no-validate packages them without that check.
+
+Usage:
+    python package_all.py [marketplace.json] [output-directory] [--workers N] [--incremental]
+                          [--bundle FILE] [--no-validate] [--trace[=FILE]]
+
+Example:
+    python package_all.py
+    python package_all.py .claude-plugin/marketplace.json ./dist
+    python package_all.py .claude-plugin/marketplace.json ./dist --workers 4 --incremental
+    python package_all.py .claude-plugin/marketplace.json ./dist --bundle devflow.skillbundle
+    python package_all.py .claude-plugin/marketplace.json ./dist --no-validate
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import devflow_trace
+from devflow_trace import enable_from_argv, span
+from package_skill import file_sha256, package_skill, pop_option
+from quick_validate import validate_skill
+from skill_bundle import create_bundle
+
+DEFAULT_MARKETPLACE = os.path.join(".claude-plugin", "marketplace.json")
+DEFAULT_OUTPUT = "dist"
+MANIFEST_NAME = "manifest.json"
+
+
+def _skill_dirs(base):
+    """Yield base if it is a skill folder, else the skill folders directly inside it."""
+    if os.path.isfile(os.path.join(base, "SKILL.md")):
+        yield base
+        return
+    try:
+        names = sorted(os.listdir(base))
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(base, name)
+        if os.path.isfile(os.path.join(path, "SKILL.md")):
+            yield path
+
+
+def discover_skills(marketplace_path):
+    """
+    Return the skills of a marketplace as a list of dicts with the real skill
+    directory, the owning plugin and every path that links to it.
+
+    Each real directory appears once; the first plugin that references it
+    owns the package.
+    """
+    with open(marketplace_path) as f:
+        marketplace = json.load(f)
+    root = os.path.dirname(os.path.abspath(marketplace_path))
+    if os.path.basename(root) == ".claude-plugin":
+        root = os.path.dirname(root)
+
+    skills = {}
+    for plugin in marketplace.get("plugins", []):
+        source = plugin.get("source")
+        if not isinstance(source, str):
+            # Remote sources (github, url) have nothing local to package
+            continue
+        plugin_root = os.path.normpath(os.path.join(root, source))
+        bases = ["skills"]
+        try:
+            with open(os.path.join(plugin_root, ".claude-plugin", "plugin.json")) as f:
+                extra = json.load(f).get("skills", [])
+            bases.extend([extra] if isinstance(extra, str) else extra)
+        except FileNotFoundError:
+            pass
+        for base in bases:
+            for path in _skill_dirs(os.path.normpath(os.path.join(plugin_root, base))):
+                real = os.path.realpath(path)
+                entry = skills.setdefault(real, {"plugin": plugin["name"], "source": real, "links": []})
+                if path != real:
+                    entry["links"].append(os.path.relpath(path, root))
+    return list(skills.values())
+
+
+def package_one(source, output_dir, incremental, validate=True):
+    """
+    Worker: validate (unless told not to) and package one skill, capturing its output.
+
+    Never raises; failures are returned in the result so the pool carries on.
+    """
+    started = time.perf_counter()
+    log = io.StringIO()
+    result = {"ok": False, "output": None, "bytes": None, "sha256": None}
+    try:
+        with contextlib.redirect_stdout(log), span("package_one", "package", skill=source):
+            path = package_skill(source, output_dir, incremental, validate=validate)
+        if path is not None:
+            result.update(ok=True, output=str(path), bytes=os.path.getsize(path), sha256=file_sha256(path))
+    except Exception as e:
+        log.write(f"❌ {type(e).__name__}: {e}\n")
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    if not result["ok"]:
+        errors = [line.strip().lstrip("❌").strip()
+                  for line in log.getvalue().splitlines() if line.lstrip().startswith("❌")]
+        result["error"] = "; ".join(errors) or "packaging failed"
+    # Pool workers exit without running atexit handlers
+    devflow_trace.flush()
+    return result
+
+
+def validate_one(source, validate=True):
+    """Worker for --bundle: validate one skill (or just accept it); never raises."""
+    started = time.perf_counter()
+    if not validate:
+        return {"ok": True, "output": None, "bytes": None, "sha256": None, "seconds": 0.0, "error": None}
+    try:
+        with span("validate_one", "package", skill=source):
+            valid, message = validate_skill(source)
+        error = None if valid else f"Validation failed: {message}"
+    except Exception as e:
+        valid, error = False, f"{type(e).__name__}: {e}"
+    devflow_trace.flush()
+    return {"ok": valid, "output": None, "bytes": None, "sha256": None,
+            "seconds": round(time.perf_counter() - started, 3), "error": error}
+
+
+def package_all(marketplace_path, output_dir, workers=None, incremental=False, bundle=None, validate=True):
+    """
+    Package every skill of a marketplace and write the summary manifest.
+
+    With bundle set to a file name, the validated skills go into one
+    content-addressed bundle in output_dir instead of separate .skill files.
+    With validate false, skills are packaged without running quick_validate.
+
+    Returns the manifest dict, or None if the marketplace cannot be read.
+    """
+    try:
+        skills = discover_skills(marketplace_path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error: Cannot read {marketplace_path}: {e}")
+        return None
+
+    output_dir = os.path.abspath(output_dir)
+    started = time.perf_counter()
+    results = []
+    claimed = {}
+    jobs = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for skill in skills:
+            name = os.path.basename(skill["source"])
+            skill.update(name=name)
+            plugin_dir = os.path.join(output_dir, skill["plugin"])
+            # A bundle holds every plugin's skills side by side
+            other = claimed.setdefault((None if bundle else skill["plugin"], name), skill["source"])
+            if other != skill["source"]:
+                skill.update(ok=False, output=None, bytes=None, sha256=None, seconds=0.0,
+                             error=f"package name '{name}' already used by {other}")
+                results.append(skill)
+                print(f"❌ {skill['plugin']}/{name}: {skill['error']}")
+                continue
+            if bundle:
+                jobs[executor.submit(validate_one, skill["source"], validate)] = skill
+            else:
+                jobs[executor.submit(package_one, skill["source"], plugin_dir, incremental, validate)] = skill
+
+        for future in as_completed(jobs):
+            skill = jobs[future]
+            try:
+                skill.update(future.result())
+            except Exception as e:
+                # The worker process itself died (e.g. killed or out of memory)
+                skill.update(ok=False, output=None, bytes=None, sha256=None, seconds=None,
+                             error=f"{type(e).__name__}: {e}")
+            results.append(skill)
+            if skill["ok"] and bundle:
+                state = "valid" if validate else "not validated"
+                print(f"✅ {skill['plugin']}/{skill['name']} ({state}, {skill['seconds']:.2f}s)")
+            elif skill["ok"]:
+                print(f"✅ {skill['plugin']}/{skill['name']} ({skill['bytes']:,} bytes, {skill['seconds']:.2f}s)")
+            else:
+                print(f"❌ {skill['plugin']}/{skill['name']}: {skill['error']}")
+
+    results.sort(key=lambda skill: (skill["plugin"], skill["name"]))
+    os.makedirs(output_dir, exist_ok=True)
+    bundle_info = None
+    if bundle:
+        bundle_path = os.path.join(output_dir, bundle)
+        valid = [skill for skill in results if skill["ok"]]
+        try:
+            with span("create_bundle", "package", bundle=bundle_path):
+                bundle_info = create_bundle([(skill["name"], skill["source"]) for skill in valid], bundle_path)
+        except (OSError, ValueError) as e:
+            print(f"❌ Error writing bundle {bundle_path}: {e}")
+            for skill in valid:
+                skill.update(ok=False, error=f"bundle not written: {e}")
+        else:
+            bundle_info.update(output=bundle, size=os.path.getsize(bundle_path), sha256=file_sha256(bundle_path))
+            for skill in valid:
+                skill["output"] = bundle
+    for skill in results:
+        if skill["output"] and not bundle:
+            skill["output"] = os.path.relpath(skill["output"], output_dir)
+    manifest = {
+        "marketplace": os.path.abspath(marketplace_path),
+        "validated": validate,
+        "packaged": sum(1 for skill in results if skill["ok"]),
+        "failed": sum(1 for skill in results if not skill["ok"]),
+        "seconds": round(time.perf_counter() - started, 3),
+        "skills": results,
+    }
+    if bundle_info is not None:
+        manifest["bundle"] = bundle_info
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(manifest_path + ".tmp", manifest_path)
+    print(f"\n📦 Packaged {manifest['packaged']} of {len(results)} skills in {manifest['seconds']:.1f}s")
+    if bundle_info is not None:
+        print(f"   Bundle: {bundle_info['output']} ({bundle_info['size']:,} bytes; "
+              f"{bundle_info['unique_bytes']:,} unique of {bundle_info['bytes']:,} content bytes)")
+    print(f"   Manifest: {manifest_path}")
+    return manifest
+
+
+def main():
+    enable_from_argv(sys.argv)
+    incremental = "--incremental" in sys.argv
+    if incremental:
+        sys.argv.remove("--incremental")
+    workers = pop_option(sys.argv, "--workers")
+    if workers is not None and (not workers.isdigit() or int(workers) < 1):
+        print("❌ Error: --workers needs a positive number")
+        sys.exit(1)
+    bundle = pop_option(sys.argv, "--bundle")
+    validate = "--no-validate" not in sys.argv
+    if not validate:
+        sys.argv.remove("--no-validate")
+    if len(sys.argv) > 3 or any(arg.startswith("-") for arg in sys.argv[1:]) or bundle == "":
+        print("Usage: python package_all.py [marketplace.json] [output-directory] [--workers N] [--incremental]")
+        print("                             [--bundle FILE] [--no-validate] [--trace[=FILE]]")
+        print("\nExample:")
+        print("  python package_all.py")
+        print("  python package_all.py .claude-plugin/marketplace.json ./dist --workers 4")
+        print("  python package_all.py .claude-plugin/marketplace.json ./dist --bundle devflow.skillbundle")
+        sys.exit(1)
+
+    marketplace_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_MARKETPLACE
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUTPUT
+
+    print(f"📦 Packaging marketplace: {marketplace_path}")
+    print(f"   Output directory: {output_dir}\n")
+
+    with span("package_all", "package", marketplace=marketplace_path):
+        manifest = package_all(marketplace_path, output_dir, int(workers) if workers else None,
+                               incremental, bundle, validate)
+
+    sys.exit(0 if manifest is not None and manifest["failed"] == 0 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,32 +3,313 @@
 Skill Packager - Creates a distributable .skill file of a skill folder
 
 Usage:
-    python utils/package_skill.py <path/to/skill-folder> [output-directory]
+    python utils/package_skill.py <path/to/skill-folder> [output-directory] [--incremental] [--workers N]
+                                  [--compression deflate|deflate:LEVEL|lzma] [--dry-run] [--watch]
+                                  [--trace[=FILE]]
 
 Example:
     python utils/package_skill.py skills/public/my-skill
     python utils/package_skill.py skills/public/my-skill ./dist
+    python utils/package_skill.py skills/public/my-skill ./dist --incremental
+    python utils/package_skill.py skills/public/my-skill ./dist --workers 4
+    python utils/package_skill.py skills/public/my-skill ./dist --compression deflate:9
+    python utils/package_skill.py skills/public/my-skill --dry-run
+    python utils/package_skill.py skills/public/my-skill --trace=/tmp/package.json
+    python utils/package_skill.py skills/public/my-skill ./dist --watch
+
+Build debris (__pycache__, .git, node_modules, virtualenvs, editor files) and
+anything matched by a gitignore-style .skillignore in the skill folder is left
+out; see skill_files.py. --dry-run lists what would be packed, with sizes.
+
+Archives are reproducible: entries are sorted, timestamps are fixed (to
+SOURCE_DATE_EPOCH when set, else 1980-01-01) and permissions are normalized to
+0644/0755, so identical skill folders produce bit-identical .skill files.
+Already-compressed formats (STORED_EXTENSIONS) are stored; everything else is
+compressed with --compression (deflate at zlib's default level unless given).
+
+Every entry carries the SHA-256 of its content in its zip entry comment, so the
+archive's central directory doubles as a manifest. With --incremental, files
+whose hash matches an entry of the previous .skill archive are copied over as
+raw compressed bytes instead of being recompressed.
+
+With --workers N, files are hashed and compressed on N threads (zlib releases
+the GIL) and written to the archive in order. The result is byte-identical to
+the serial path.
+
+With --watch (Linux), the skill is re-validated and incrementally re-packaged
+every time it changes; see skill_watch.py.
 """
 
+import contextlib
+import hashlib
+import os
+import stat
+import struct
 import sys
+import time
 import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from quick_validate import validate_skill
+from devflow_trace import enable_from_argv, span
+from validate_all import validate_skill_cached
+from skill_files import walk_skill_files
+
+
+HASH_PREFIX = b"sha256:"
+# Local file header: signature, then name and extra lengths at offsets 26 and 28
+LOCAL_HEADER = struct.Struct("<4s22xHH")
+COPY_CHUNK = 1 << 20
+# Bit 1 of the general purpose flags: LZMA data ends with an end-of-stream marker
+LZMA_EOS_FLAG = 0x02
+
+# Formats that are already compressed; deflating them costs CPU for no gain
+STORED_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif",
+    ".woff", ".woff2",
+    ".zip", ".skill", ".jar", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z",
+    ".mp3", ".mp4", ".m4a", ".ogg", ".webm",
+})
+COMPRESSION_METHODS = {"deflate": zipfile.ZIP_DEFLATED, "lzma": zipfile.ZIP_LZMA}
+
+
+def parse_compression(spec):
+    """
+    Parse a --compression value ("deflate", "deflate:LEVEL" or "lzma").
+
+    Returns (compress_type, level); raises ValueError for anything else.
+    """
+    method, _, level = spec.partition(":")
+    if method not in COMPRESSION_METHODS:
+        raise ValueError(f"unknown compression method '{method}' (use deflate or lzma)")
+    if not level:
+        return COMPRESSION_METHODS[method], None
+    if method != "deflate" or not level.isdigit() or int(level) > 9:
+        raise ValueError(f"invalid compression '{spec}' (levels are deflate:0 to deflate:9)")
+    return zipfile.ZIP_DEFLATED, int(level)
+
+
+def entry_compression(arcname, compression):
+    """Return the (compress_type, level) used for one archive entry."""
+    if os.path.splitext(arcname)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED, None
+    return compression
 
 
-def package_skill(skill_path, output_dir=None):
+def archive_date_time():
+    """Entry timestamp: SOURCE_DATE_EPOCH if set, else the earliest zip date."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if not epoch:
+        return (1980, 1, 1, 0, 0, 0)
+    return max((1980, 1, 1, 0, 0, 0), time.gmtime(int(epoch))[:6])
+
+
+def file_sha256(file_path):
+    """Return the hex SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(COPY_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def known_sha256(file_path, digests):
+    """
+    file_sha256, remembered in digests (path -> (mtime_ns, size, hash)) so a
+    long-running caller does not re-hash files whose size and mtime are unchanged.
+    """
+    if digests is None:
+        return file_sha256(file_path)
+    st = os.stat(file_path)
+    known = digests.get(file_path)
+    if known is not None and known[:2] == (st.st_mtime_ns, st.st_size):
+        return known[2]
+    digest = file_sha256(file_path)
+    digests[file_path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def entry_zipinfo(arcname, digest, compress_type, date_time, size, executable):
+    """Build a ZipInfo that depends only on the entry's name, content and mode."""
+    zinfo = zipfile.ZipInfo(arcname, date_time)
+    zinfo.create_system = 3  # Unix, whatever the host
+    zinfo.external_attr = (stat.S_IFREG | (0o755 if executable else 0o644)) << 16
+    zinfo.file_size = size
+    zinfo.CRC = 0
+    zinfo.compress_type = compress_type
+    if compress_type == zipfile.ZIP_LZMA:
+        zinfo.flag_bits |= LZMA_EOS_FLAG
+    zinfo.comment = HASH_PREFIX + digest.encode("ascii")
+    return zinfo
+
+
+def make_zipinfo(file_path, arcname, digest, compress_type, date_time):
+    """Build the ZipInfo for a file on disk (see entry_zipinfo)."""
+    st = os.stat(file_path)
+    return entry_zipinfo(arcname, digest, compress_type, date_time,
+                         st.st_size, bool(st.st_mode & stat.S_IXUSR))
+
+
+def read_manifest(archive_path, spec):
+    """
+    Map content hashes to the reusable entries of a previous .skill archive.
+
+    The archive must have been written with the same --compression spec
+    (recorded in its archive comment). Only entries written with a hash
+    comment, unencrypted and without a trailing data descriptor qualify;
+    anything else is simply recompressed.
+    """
+    entries = {}
+    try:
+        with zipfile.ZipFile(archive_path) as zipf:
+            if zipf.comment != archive_comment(spec):
+                return {}
+            for info in zipf.infolist():
+                if info.comment.startswith(HASH_PREFIX) and not info.flag_bits & 0x09:
+                    entries[info.comment[len(HASH_PREFIX):].decode("ascii")] = info
+    except (OSError, zipfile.BadZipFile):
+        return {}
+    return entries
+
+
+def archive_comment(spec):
+    return f"compression={spec}".encode("ascii")
+
+
+def read_raw_entry(source, old_info):
+    """Yield the compressed bytes of old_info from an open archive file."""
+    source.seek(old_info.header_offset)
+    signature, name_length, extra_length = LOCAL_HEADER.unpack(source.read(LOCAL_HEADER.size))
+    if signature != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"bad local header for {old_info.filename}")
+    source.seek(name_length + extra_length, 1)
+    remaining = old_info.compress_size
+    while remaining:
+        chunk = source.read(min(remaining, COPY_CHUNK))
+        if not chunk:
+            raise zipfile.BadZipFile(f"truncated entry {old_info.filename}")
+        yield chunk
+        remaining -= len(chunk)
+
+
+def compress_stream(f, zinfo, level):
+    """
+    Yield the data of a binary stream compressed for zinfo.compress_type, as
+    ZipFile.open would write it, and set zinfo.CRC and zinfo.file_size once
+    exhausted.
+    """
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+        compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+                                      zlib.DEFLATED, -15)
+    elif zinfo.compress_type == zipfile.ZIP_LZMA:
+        compressor = zipfile.LZMACompressor()
+    else:
+        compressor = None
+    crc = size = 0
+    while data := f.read(COPY_CHUNK):
+        crc = zlib.crc32(data, crc)
+        size += len(data)
+        yield compressor.compress(data) if compressor else data
+    if compressor:
+        yield compressor.flush()
+    zinfo.CRC = crc
+    zinfo.file_size = size
+
+
+def compressed_chunks(file_path, zinfo, level):
+    """compress_stream over a file on disk."""
+    with open(file_path, "rb") as f:
+        yield from compress_stream(f, zinfo, level)
+
+
+def write_entry(zipf, zinfo, chunks):
+    """
+    Append an entry of already-compressed chunks to zipf.
+
+    chunks may be a lazy generator that fills in zinfo.CRC and file_size as it
+    finishes; the local header is rewritten once the data is in place.
+    """
+    # Same ZIP64 rule as ZipFile.open: compressed data may outgrow the input
+    zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+    zipf.fp.seek(zipf.start_dir)
+    zinfo.header_offset = zipf.start_dir
+    zipf.fp.write(zinfo.FileHeader(zip64))
+    compress_size = 0
+    for chunk in chunks:
+        zipf.fp.write(chunk)
+        compress_size += len(chunk)
+    zinfo.compress_size = compress_size
+    end = zipf.fp.tell()
+    zipf.fp.seek(zinfo.header_offset)
+    zipf.fp.write(zinfo.FileHeader(zip64))
+    zipf.fp.seek(end)
+    zipf.filelist.append(zinfo)
+    zipf.NameToInfo[zinfo.filename] = zinfo
+    zipf.start_dir = end
+
+
+def reusable(previous, zinfo):
+    """Return the previous entry holding zinfo's content with the same method, if any."""
+    old_info = previous.get(zinfo.comment[len(HASH_PREFIX):].decode("ascii"))
+    if old_info is not None and old_info.compress_type == zinfo.compress_type:
+        return old_info
+    return None
+
+
+def prepare_entry(file_path, arcname, previous, compression, date_time, digests=None):
+    """
+    Hash a file and, unless previous already holds it, compress it.
+
+    Returns (zinfo, chunks); chunks is None when the entry will be reused.
+    Runs on the worker threads with --workers.
+    """
+    compress_type, level = entry_compression(arcname, compression)
+    digest = known_sha256(file_path, digests)
+    zinfo = make_zipinfo(file_path, arcname, digest, compress_type, date_time)
+    if reusable(previous, zinfo) is not None:
+        return zinfo, None
+    return zinfo, list(compressed_chunks(file_path, zinfo, level))
+
+
+def ordered_results(executor, fn, items, window):
+    """Run fn over items on executor, yielding results in input order."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, *item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def package_skill(skill_path, output_dir=None, incremental=False, workers=1, compression="deflate",
+                  digests=None, cache=None, validate=True):
     """
     Package a skill folder into a .skill file.
 
     Args:
         skill_path: Path to the skill folder
         output_dir: Optional output directory for the .skill file (defaults to current directory)
+        incremental: Reuse compressed entries of an existing .skill file for unchanged files
+        workers: Number of threads hashing and compressing files (1 streams serially)
+        compression: "deflate", "deflate:LEVEL" or "lzma" for compressible files
+        digests: Optional dict kept between calls (see known_sha256) to skip
+            re-hashing unchanged files
+        cache: Optional validate_all.ValidationCache kept between calls
+        validate: Run quick_validate first and refuse invalid skills (default)
 
     Returns:
         Path to the created .skill file, or None if error
     """
     skill_path = Path(skill_path).resolve()
 
+    try:
+        text_compression = parse_compression(compression)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return None
+
     # Validate skill folder exists
     if not skill_path.exists():
         print(f"❌ Error: Skill folder not found: {skill_path}")
@@ -45,13 +326,16 @@ def package_skill(skill_path, output_dir=None):
         return None
 
     # Run validation before packaging
-    print("🔍 Validating skill...")
-    valid, message = validate_skill(skill_path)
-    if not valid:
-        print(f"❌ Validation failed: {message}")
-        print("   Please fix the validation errors before packaging.")
-        return None
-    print(f"✅ {message}\n")
+    if validate:
+        print("🔍 Validating skill...")
+        valid, message = validate_skill_cached(skill_path, cache)
+        if not valid:
+            print(f"❌ Validation failed: {message}")
+            print("   Please fix the validation errors before packaging.")
+            return None
+        print(f"✅ {message}\n")
+    else:
+        print("⚠️  Skipping validation\n")
 
     # Determine output location
     skill_name = skill_path.name
@@ -63,42 +347,154 @@ def package_skill(skill_path, output_dir=None):
 
     skill_filename = output_path / f"{skill_name}.skill"
 
-    # Create the .skill file (zip format)
+    # Create the .skill file (zip format) next to the old one, then swap it in
+    previous = read_manifest(skill_filename, compression) if incremental else {}
+    tmp_filename = skill_filename.with_name(skill_filename.name + ".tmp")
+    date_time = archive_date_time()
     try:
-        with zipfile.ZipFile(skill_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory
-            for file_path in skill_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate the relative path within the zip
-                    arcname = file_path.relative_to(skill_path.parent)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
+        # Walk through the skill directory; entries are sorted by archive name
+        with span("walk", "package", path=str(skill_path)) as trace:
+            entries = [(f"{skill_name}/{relpath}", file_path)
+                       for relpath, file_path, _ in walk_skill_files(skill_path)]
+            trace.set(files=len(entries))
 
+        reused = 0
+        with contextlib.ExitStack() as stack:
+            source = stack.enter_context(open(skill_filename, "rb")) if previous else None
+            zipf = stack.enter_context(zipfile.ZipFile(tmp_filename, 'w'))
+            zipf.comment = archive_comment(compression)
+            jobs = ((file_path, arcname, previous, text_compression, date_time, digests)
+                    for arcname, file_path in entries)
+            if workers > 1:
+                # At most two finished-but-unwritten files per worker are held in memory
+                executor = stack.enter_context(ThreadPoolExecutor(workers))
+                prepared = ordered_results(executor, prepare_entry, jobs, 2 * workers)
+            else:
+                prepared = None
+
+            for arcname, file_path in entries:
+                if prepared is not None:
+                    zinfo, chunks = next(prepared)
+                else:
+                    compress_type, level = entry_compression(arcname, text_compression)
+                    digest = known_sha256(file_path, digests)
+                    zinfo = make_zipinfo(file_path, arcname, digest, compress_type, date_time)
+                    chunks = compressed_chunks(file_path, zinfo, level)
+
+                old_info = reusable(previous, zinfo)
+                if old_info is not None:
+                    with span("reuse", "package", file=arcname) as trace:
+                        zinfo.CRC = old_info.CRC
+                        zinfo.file_size = old_info.file_size
+                        write_entry(zipf, zinfo, read_raw_entry(source, old_info))
+                        trace.set(bytes=zinfo.file_size, compressed=zinfo.compress_size)
+                    reused += 1
+                    print(f"  Reused: {arcname}")
+                    continue
+
+                with span("compress", "package", file=arcname) as trace:
+                    write_entry(zipf, zinfo, chunks)
+                    trace.set(bytes=zinfo.file_size, compressed=zinfo.compress_size)
+                print(f"  {'Stored' if zinfo.compress_type == zipfile.ZIP_STORED else 'Added'}: {arcname}")
+
+        os.replace(tmp_filename, skill_filename)
+        if incremental:
+            print(f"\n♻️  Reused {reused} of {len(entries)} entries from the previous package")
         print(f"\n✅ Successfully packaged skill to: {skill_filename}")
         return skill_filename
 
     except Exception as e:
         print(f"❌ Error creating .skill file: {e}")
+        tmp_filename.unlink(missing_ok=True)
         return None
 
 
+def dry_run(skill_path, compression="deflate"):
+    """Print the files package_skill would pack, with sizes, without writing anything."""
+    try:
+        text_compression = parse_compression(compression)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return False
+    if not os.path.isdir(skill_path):
+        print(f"❌ Error: Path is not a directory: {skill_path}")
+        return False
+
+    files = walk_skill_files(skill_path)
+    for relpath, _, size in files:
+        method = "stored" if entry_compression(relpath, text_compression)[0] == zipfile.ZIP_STORED else ""
+        print(f"  {size:>12,}  {relpath}  {method}".rstrip())
+    total = sum(size for _, _, size in files)
+    print(f"\n📋 Would pack {len(files)} files, {total:,} bytes before compression")
+    return True
+
+
+def pop_option(argv, name):
+    """Remove "name VALUE" from argv and return VALUE (None if absent, "" if missing)."""
+    if name not in argv:
+        return None
+    index = argv.index(name)
+    value = argv[index + 1] if index + 1 < len(argv) else ""
+    del argv[index:index + 2]
+    return value
+
+
 def main():
+    enable_from_argv(sys.argv)
+    incremental = "--incremental" in sys.argv
+    if incremental:
+        sys.argv.remove("--incremental")
+    listing = "--dry-run" in sys.argv
+    if listing:
+        sys.argv.remove("--dry-run")
+    watching = "--watch" in sys.argv
+    if watching:
+        sys.argv.remove("--watch")
+    workers = pop_option(sys.argv, "--workers")
+    if workers is not None:
+        if not workers.isdigit() or int(workers) < 1:
+            print("❌ Error: --workers needs a positive number")
+            sys.exit(1)
+    workers = int(workers or 1)
+    compression = pop_option(sys.argv, "--compression") or "deflate"
     if len(sys.argv) < 2:
-        print("Usage: python utils/package_skill.py <path/to/skill-folder> [output-directory]")
+        print("Usage: python utils/package_skill.py <path/to/skill-folder> [output-directory] [--incremental] [--workers N]")
+        print("                                         [--compression deflate|deflate:LEVEL|lzma] [--dry-run] [--watch]")
+        print("                                         [--trace[=FILE]]")
         print("\nExample:")
         print("  python utils/package_skill.py skills/public/my-skill")
         print("  python utils/package_skill.py skills/public/my-skill ./dist")
+        print("  python utils/package_skill.py skills/public/my-skill ./dist --incremental")
+        print("  python utils/package_skill.py skills/public/my-skill ./dist --workers 4")
+        print("  python utils/package_skill.py skills/public/my-skill ./dist --compression deflate:9")
+        print("  python utils/package_skill.py skills/public/my-skill --dry-run")
+        print("  python utils/package_skill.py skills/public/my-skill ./dist --watch")
         sys.exit(1)
 
     skill_path = sys.argv[1]
     output_dir = sys.argv[2] if len(sys.argv) > 2 else None
 
+    if listing:
+        print(f"📋 Files that would be packaged from: {skill_path}\n")
+        sys.exit(0 if dry_run(skill_path, compression) else 1)
+
+    if watching:
+        from skill_watch import watch
+        sys.exit(watch([skill_path], output_dir, compression=compression))
+
     print(f"📦 Packaging skill: {skill_path}")
     if output_dir:
         print(f"   Output directory: {output_dir}")
+    if incremental:
+        print("   Incremental: reusing unchanged entries")
+    if workers > 1:
+        print(f"   Workers: {workers}")
+    if compression != "deflate":
+        print(f"   Compression: {compression}")
     print()
 
-    result = package_skill(skill_path, output_dir)
+    with span("package_skill", "package", skill=skill_path):
+        result = package_skill(skill_path, output_dir, incremental, workers, compression)
 
     if result:
         sys.exit(0)
@@ -6,89 +6,113 @@ Quick validation script for skills - minimal version
 import sys
 import os
 import re
-import yaml
 from pathlib import Path
+from devflow_trace import enable_from_argv, span
+from frontmatter import FrontmatterError, parse_frontmatter, read_frontmatter_text
+
+# Define allowed properties
+ALLOWED_PROPERTIES = {'name', 'description', 'license', 'allowed-tools', 'metadata'}
 
 def validate_skill(skill_path):
     """Basic validation of a skill"""
+    with span("validate_skill", "skill", path=str(skill_path)) as trace:
+        _, problems = skill_report(skill_path)
+        trace.set(valid=not problems)
+    return not problems, "; ".join(problems) or "Skill is valid!"
+
+def skill_report(skill_path):
+    """
+    Return (frontmatter, problems) for a skill: the parsed frontmatter dict
+    (None if it cannot be read) and every violation found, in check order.
+    """
     skill_path = Path(skill_path)
 
     # Check SKILL.md exists
     skill_md = skill_path / 'SKILL.md'
     if not skill_md.exists():
-        return False, "SKILL.md not found"
-
-    # Read and validate frontmatter
-    content = skill_md.read_text()
-    if not content.startswith('---'):
-        return False, "No YAML frontmatter found"
+        return None, ["SKILL.md not found"]
 
-    # Extract frontmatter
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if not match:
-        return False, "Invalid frontmatter format"
-
-    frontmatter_text = match.group(1)
+    # Read and validate frontmatter (only up to the closing delimiter)
+    try:
+        frontmatter_text = read_frontmatter_text(skill_md)
+    except FrontmatterError as e:
+        return None, [str(e)]
 
-    # Parse YAML frontmatter
+    # Parse YAML frontmatter; PyYAML is only imported for non-trivial YAML
     try:
-        frontmatter = yaml.safe_load(frontmatter_text)
+        with span("parse_frontmatter", "skill", bytes=len(frontmatter_text)):
+            frontmatter = parse_frontmatter(frontmatter_text)
         if not isinstance(frontmatter, dict):
-            return False, "Frontmatter must be a YAML dictionary"
-    except yaml.YAMLError as e:
-        return False, f"Invalid YAML in frontmatter: {e}"
+            return None, ["Frontmatter must be a YAML dictionary"]
+    except Exception as e:
+        import yaml
+        if not isinstance(e, yaml.YAMLError):
+            raise
+        return None, [f"Invalid YAML in frontmatter: {e}"]
+
+    return frontmatter, frontmatter_problems(frontmatter)
 
-    # Define allowed properties
-    ALLOWED_PROPERTIES = {'name', 'description', 'license', 'allowed-tools', 'metadata'}
+def frontmatter_problems(frontmatter):
+    """Check a parsed SKILL.md frontmatter dict; returns every problem found."""
+    problems = []
 
     # Check for unexpected properties (excluding nested keys under metadata)
     unexpected_keys = set(frontmatter.keys()) - ALLOWED_PROPERTIES
     if unexpected_keys:
-        return False, (
-            f"Unexpected key(s) in SKILL.md frontmatter: {', '.join(sorted(unexpected_keys))}. "
+        problems.append(
+            f"Unexpected key(s) in SKILL.md frontmatter: {', '.join(sorted(map(str, unexpected_keys)))}. "
             f"Allowed properties are: {', '.join(sorted(ALLOWED_PROPERTIES))}"
         )
 
     # Check required fields
     if 'name' not in frontmatter:
-        return False, "Missing 'name' in frontmatter"
+        problems.append("Missing 'name' in frontmatter")
     if 'description' not in frontmatter:
-        return False, "Missing 'description' in frontmatter"
+        problems.append("Missing 'description' in frontmatter")
 
     # Extract name for validation
     name = frontmatter.get('name', '')
     if not isinstance(name, str):
-        return False, f"Name must be a string, got {type(name).__name__}"
-    name = name.strip()
-    if name:
+        problems.append(f"Name must be a string, got {type(name).__name__}")
+    elif name.strip():
+        name = name.strip()
         # Check naming convention (hyphen-case: lowercase with hyphens)
         if not re.match(r'^[a-z0-9-]+$', name):
-            return False, f"Name '{name}' should be hyphen-case (lowercase letters, digits, and hyphens only)"
-        if name.startswith('-') or name.endswith('-') or '--' in name:
-            return False, f"Name '{name}' cannot start/end with hyphen or contain consecutive hyphens"
+            problems.append(f"Name '{name}' should be hyphen-case (lowercase letters, digits, and hyphens only)")
+        elif name.startswith('-') or name.endswith('-') or '--' in name:
+            problems.append(f"Name '{name}' cannot start/end with hyphen or contain consecutive hyphens")
         # Check name length (max 64 characters per spec)
         if len(name) > 64:
-            return False, f"Name is too long ({len(name)} characters). Maximum is 64 characters."
+            problems.append(f"Name is too long ({len(name)} characters). Maximum is 64 characters.")
 
     # Extract and validate description
     description = frontmatter.get('description', '')
     if not isinstance(description, str):
-        return False, f"Description must be a string, got {type(description).__name__}"
-    description = description.strip()
-    if description:
+        problems.append(f"Description must be a string, got {type(description).__name__}")
+    elif description.strip():
+        description = description.strip()
         # Check for angle brackets
         if '<' in description or '>' in description:
-            return False, "Description cannot contain angle brackets (< or >)"
+            problems.append("Description cannot contain angle brackets (< or >)")
         # Check description length (max 1024 characters per spec)
         if len(description) > 1024:
-            return False, f"Description is too long ({len(description)} characters). Maximum is 1024 characters."
+            problems.append(f"Description is too long ({len(description)} characters). Maximum is 1024 characters.")
 
-    return True, "Skill is valid!"
+    return problems
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python quick_validate.py <skill_directory>")
+    enable_from_argv(sys.argv)
+    watching = "--watch" in sys.argv
+    if watching:
+        sys.argv.remove("--watch")
+    if len(sys.argv) < 2 or (len(sys.argv) > 2 and not watching):
+        print("Usage: python quick_validate.py <skill_directory> [--trace[=FILE]]")
+        print("       python quick_validate.py <skill_directory>... --watch")
         sys.exit(1)
+    if watching:
+        # Re-validate the given skills on every change (Linux); see skill_watch.py
+        from skill_watch import watch
+        sys.exit(watch(sys.argv[1:], validate_only=True))
     
     valid, message = validate_skill(sys.argv[1])
     print(message)
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Skill Bundles - Many skills in one file, each distinct file content stored once
+
+A .skillbundle is a zip archive with:
+    blobs/<sha256>           file contents, keyed by the SHA-256 of the content
+    manifests/<skill>.json   per-skill manifest: every file's path, hash, size and mode
+
+Files shared by several skills (or repeated within one) are stored once, so a
+bundle of a whole plugin costs its unique bytes rather than the sum of every
+copy. Blobs are compressed with the same per-extension policy as .skill files
+(see package_skill.py), and bundles are reproducible in the same way.
+
+The extractor rebuilds any single skill either as a .skill file -- byte-
+identical to what package_skill.py produces, copying compressed blobs without
+recompressing them -- or as a plain directory. Bundles are written by
+package_all.py --bundle.
+
+Usage:
+    python skill_bundle.py list <bundle>
+    python skill_bundle.py extract <bundle> <skill-name> [output-directory] [--dir]
+
+Example:
+    python package_all.py .claude-plugin/marketplace.json --bundle dist/devflow.skillbundle
+    python skill_bundle.py list dist/devflow.skillbundle
+    python skill_bundle.py extract dist/devflow.skillbundle repo-explorer ./dist
+    python skill_bundle.py extract dist/devflow.skillbundle repo-explorer ./skills --dir
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import zipfile
+
+from devflow_trace import enable_from_argv, span
+from package_skill import (
+    COPY_CHUNK, archive_comment, archive_date_time, compress_stream, compressed_chunks,
+    entry_compression, entry_zipinfo, file_sha256, parse_compression, read_raw_entry, write_entry,
+)
+from skill_files import walk_skill_files
+
+BUNDLE_FORMAT = "devflow-skill-bundle/1"
+BLOB_DIR = "blobs/"
+MANIFEST_DIR = "manifests/"
+
+
+def _bundle_comment(spec):
+    return f"{BUNDLE_FORMAT} ".encode("ascii") + archive_comment(spec)
+
+
+def _bundle_spec(bundle):
+    """Return the compression spec recorded in an open bundle, validating the format."""
+    prefix = _bundle_comment("")
+    if not bundle.comment.startswith(prefix):
+        raise ValueError("not a skill bundle")
+    return bundle.comment[len(prefix):].decode("ascii")
+
+
+def create_bundle(skills, bundle_path, compression="deflate"):
+    """
+    Write a bundle of skills.
+
+    Args:
+        skills: Iterable of (name, skill directory) pairs; names must be unique
+        bundle_path: Output file, replaced atomically
+        compression: "deflate", "deflate:LEVEL" or "lzma", as for package_skill
+
+    Returns:
+        Dict of totals: skills, files, blobs, bytes (sum of all files) and
+        unique_bytes (sum of distinct contents)
+    """
+    text_compression = parse_compression(compression)
+    date_time = archive_date_time()
+    manifests = {}
+    blobs = {}
+    total = 0
+    for name, source in skills:
+        if name in manifests:
+            raise ValueError(f"duplicate skill name '{name}'")
+        files = []
+        with span("hash", "bundle", skill=name):
+            for relpath, file_path, size in walk_skill_files(source):
+                digest = file_sha256(file_path)
+                mode = 0o755 if os.stat(file_path).st_mode & 0o100 else 0o644
+                files.append({"path": relpath, "sha256": digest, "size": size, "mode": mode})
+                # The first file with this content decides the blob's compression
+                blobs.setdefault(digest, (file_path, f"{name}/{relpath}", size))
+                total += size
+        manifests[name] = {"name": name, "files": files}
+
+    tmp_path = bundle_path + ".tmp"
+    try:
+        with zipfile.ZipFile(tmp_path, "w") as zipf:
+            zipf.comment = _bundle_comment(compression)
+            for digest in sorted(blobs):
+                file_path, arcname, size = blobs[digest]
+                compress_type, level = entry_compression(arcname, text_compression)
+                zinfo = entry_zipinfo(BLOB_DIR + digest, digest, compress_type, date_time, size, False)
+                with span("blob", "bundle", file=arcname):
+                    write_entry(zipf, zinfo, compressed_chunks(file_path, zinfo, level))
+            for name in sorted(manifests):
+                data = json.dumps(manifests[name], indent=1, sort_keys=True).encode("utf-8")
+                zinfo = zipfile.ZipInfo(f"{MANIFEST_DIR}{name}.json", date_time)
+                zinfo.create_system = 3
+                zinfo.external_attr = 0o100644 << 16
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                zipf.writestr(zinfo, data)
+        os.replace(tmp_path, bundle_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    return {
+        "skills": len(manifests),
+        "files": sum(len(m["files"]) for m in manifests.values()),
+        "blobs": len(blobs),
+        "bytes": total,
+        "unique_bytes": sum(size for _, _, size in blobs.values()),
+    }
+
+
+def list_bundle(bundle_path):
+    """Return the manifests of every skill in a bundle, sorted by name."""
+    with zipfile.ZipFile(bundle_path) as bundle:
+        _bundle_spec(bundle)
+        return [json.loads(bundle.read(name)) for name in sorted(bundle.namelist())
+                if name.startswith(MANIFEST_DIR)]
+
+
+def _read_manifest(bundle, name):
+    try:
+        return json.loads(bundle.read(f"{MANIFEST_DIR}{name}.json"))
+    except KeyError:
+        raise ValueError(f"skill '{name}' is not in the bundle") from None
+
+
+def extract_skill(bundle_path, name, output_dir, as_directory=False):
+    """
+    Rebuild one skill from a bundle.
+
+    Writes <output_dir>/<name>.skill (the same bytes package_skill.py would
+    produce with the bundle's compression), or the <output_dir>/<name>/ folder
+    when as_directory is set. Returns the path written.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with zipfile.ZipFile(bundle_path) as bundle:
+        spec = _bundle_spec(bundle)
+        manifest = _read_manifest(bundle, name)
+        if as_directory:
+            return _extract_directory(bundle, manifest, os.path.join(output_dir, name))
+        return _extract_package(bundle, manifest, spec, os.path.join(output_dir, f"{name}.skill"))
+
+
+def _extract_directory(bundle, manifest, target):
+    for entry in manifest["files"]:
+        relpath = entry["path"]
+        if relpath.startswith("/") or ".." in relpath.split("/"):
+            raise ValueError(f"unsafe path in manifest: {relpath}")
+        path = os.path.join(target, *relpath.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        digest = hashlib.sha256()
+        with bundle.open(BLOB_DIR + entry["sha256"]) as src, open(path, "wb") as dst:
+            while chunk := src.read(COPY_CHUNK):
+                digest.update(chunk)
+                dst.write(chunk)
+        if digest.hexdigest() != entry["sha256"]:
+            raise ValueError(f"content of {relpath} does not match its hash")
+        # Only the executable bit comes from the (untrusted) manifest, as in package_skill.py
+        os.chmod(path, 0o755 if entry["mode"] & 0o100 else 0o644)
+    return target
+
+
+def _extract_package(bundle, manifest, spec, target):
+    text_compression = parse_compression(spec)
+    date_time = archive_date_time()
+    tmp_path = target + ".tmp"
+    try:
+        with open(bundle.filename, "rb") as source, zipfile.ZipFile(tmp_path, "w") as zipf:
+            zipf.comment = archive_comment(spec)
+            for entry in sorted(manifest["files"], key=lambda e: e["path"]):
+                arcname = f"{manifest['name']}/{entry['path']}"
+                blob = bundle.getinfo(BLOB_DIR + entry["sha256"])
+                compress_type, level = entry_compression(arcname, text_compression)
+                zinfo = entry_zipinfo(arcname, entry["sha256"], compress_type, date_time,
+                                      entry["size"], entry["mode"] & 0o100)
+                if blob.compress_type == compress_type:
+                    # Same method as the blob: copy the compressed bytes as they are
+                    zinfo.CRC = blob.CRC
+                    write_entry(zipf, zinfo, read_raw_entry(source, blob))
+                else:
+                    with bundle.open(blob) as data:
+                        write_entry(zipf, zinfo, compress_stream(data, zinfo, level))
+        os.replace(tmp_path, target)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    return target
+
+
+def main():
+    enable_from_argv(sys.argv)
+    as_directory = "--dir" in sys.argv
+    if as_directory:
+        sys.argv.remove("--dir")
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if not ((command == "list" and len(sys.argv) == 3)
+            or (command == "extract" and len(sys.argv) in (4, 5))):
+        print("Usage: python skill_bundle.py list <bundle>")
+        print("       python skill_bundle.py extract <bundle> <skill-name> [output-directory] [--dir]")
+        print("\nExample:")
+        print("  python skill_bundle.py list dist/devflow.skillbundle")
+        print("  python skill_bundle.py extract dist/devflow.skillbundle repo-explorer ./dist")
+        sys.exit(1)
+
+    bundle_path = sys.argv[2]
+    try:
+        if command == "list":
+            for manifest in list_bundle(bundle_path):
+                size = sum(entry["size"] for entry in manifest["files"])
+                print(f"  {manifest['name']}  ({len(manifest['files'])} files, {size:,} bytes)")
+        else:
+            name = sys.argv[3]
+            output_dir = sys.argv[4] if len(sys.argv) > 4 else "."
+            with span("extract_skill", "bundle", skill=name):
+                path = extract_skill(bundle_path, name, output_dir, as_directory)
+            print(f"✅ Extracted {name} to: {path}")
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
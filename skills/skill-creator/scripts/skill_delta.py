@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Skill Deltas - Ship only what changed between two versions of a .skill file
+
+A .skilldelta is a zip archive with:
+    delta.json       the target archive's entry list (metadata and content
+                     hashes), the deleted entry names, and the SHA-256 of
+                     both the base and the target archive
+    data/<n>         the raw compressed bytes of every added or changed entry
+
+Entries whose compressed bytes already exist in the base archive (found by
+the content hashes package_skill.py embeds in each entry comment, so renames
+are matched too) are not stored in the delta; the applier copies them from
+the base archive. The rebuilt archive is verified entry by entry against the
+embedded hashes and then as a whole against the target's SHA-256, so a delta
+applied to the wrong base or a corrupted download is rejected.
+
+Usage:
+    python skill_delta.py diff <old.skill> <new.skill> <delta>
+    python skill_delta.py apply <old.skill> <delta> <output.skill>
+
+Example:
+    python skill_delta.py diff dist/2.8.0/repo-explorer.skill dist/2.9.0/repo-explorer.skill repo-explorer.skilldelta
+    python skill_delta.py apply ~/.skills/repo-explorer.skill repo-explorer.skilldelta repo-explorer.skill
+"""
+
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import zipfile
+
+from devflow_trace import enable_from_argv, span
+from package_skill import COPY_CHUNK, HASH_PREFIX, file_sha256, read_raw_entry, write_entry
+
+DELTA_FORMAT = "devflow-skill-delta/1"
+DELTA_MANIFEST = "delta.json"
+DATA_DIR = "data/"
+# ZipInfo attributes that must be restored for a byte-identical rebuild
+ENTRY_FIELDS = ("date_time", "compress_type", "CRC", "compress_size", "file_size", "flag_bits",
+                "create_system", "create_version", "extract_version", "internal_attr", "external_attr")
+
+
+class DeltaError(Exception):
+    """The delta cannot be created or applied."""
+
+
+def _content_hash(zipf, info):
+    """Return an entry's content SHA-256: the embedded one, else computed."""
+    if info.comment.startswith(HASH_PREFIX):
+        return info.comment[len(HASH_PREFIX):].decode("ascii")
+    digest = hashlib.sha256()
+    with zipf.open(info) as f:
+        while chunk := f.read(COPY_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _same_raw_bytes(old_fp, old_info, new_fp, new_info):
+    """Compare two entries' compressed bytes chunk by chunk."""
+    if old_info.compress_size != new_info.compress_size:
+        return False
+    return all(a == b for a, b in zip(read_raw_entry(old_fp, old_info), read_raw_entry(new_fp, new_info)))
+
+
+def _member_chunks(delta, member):
+    with delta.open(member) as f:
+        while chunk := f.read(COPY_CHUNK):
+            yield chunk
+
+
+def create_delta(old_path, new_path, delta_path):
+    """
+    Write a delta that turns old_path into new_path.
+
+    Returns a dict with the counts of copied, stored and deleted entries and
+    the delta and target sizes.
+    """
+    with zipfile.ZipFile(old_path) as old, zipfile.ZipFile(new_path) as new, \
+            open(old_path, "rb") as old_fp, open(new_path, "rb") as new_fp:
+        if any(info.flag_bits & 0x09 for info in new.infolist()):
+            raise DeltaError("encrypted entries and data descriptors are not supported")
+        base = {}
+        for info in old.infolist():
+            base.setdefault((_content_hash(old, info), info.compress_type, info.compress_size), info)
+
+        entries = []
+        stored = []
+        for info in new.infolist():
+            digest = _content_hash(new, info)
+            entry = {field: getattr(info, field) for field in ENTRY_FIELDS}
+            entry.update(name=info.filename, sha256=digest,
+                         comment=base64.b64encode(info.comment).decode("ascii"),
+                         extra=base64.b64encode(info.extra).decode("ascii"))
+            candidate = base.get((digest, info.compress_type, info.compress_size))
+            # Only reuse bytes that are identical, not merely the same content
+            if candidate is not None and _same_raw_bytes(old_fp, candidate, new_fp, info):
+                entry["base"] = candidate.filename
+            else:
+                entry["data"] = f"{DATA_DIR}{len(stored)}"
+                stored.append((entry["data"], info))
+            entries.append(entry)
+
+        names = {info.filename for info in new.infolist()}
+        manifest = {
+            "format": DELTA_FORMAT,
+            "base_sha256": file_sha256(old_path),
+            "target_sha256": file_sha256(new_path),
+            "target_size": os.path.getsize(new_path),
+            "comment": base64.b64encode(new.comment).decode("ascii"),
+            "entries": entries,
+            "deleted": sorted(info.filename for info in old.infolist() if info.filename not in names),
+        }
+
+        tmp_path = delta_path + ".tmp"
+        try:
+            with zipfile.ZipFile(tmp_path, "w") as delta:
+                delta.writestr(zipfile.ZipInfo(DELTA_MANIFEST, (1980, 1, 1, 0, 0, 0)),
+                               json.dumps(manifest, indent=1), zipfile.ZIP_DEFLATED)
+                for member, info in stored:
+                    # Already compressed: store the raw bytes as they are
+                    with delta.open(zipfile.ZipInfo(member, (1980, 1, 1, 0, 0, 0)), "w") as dst:
+                        for chunk in read_raw_entry(new_fp, info):
+                            dst.write(chunk)
+            os.replace(tmp_path, delta_path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+            raise
+
+    return {
+        "copied": len(entries) - len(stored),
+        "stored": len(stored),
+        "deleted": len(manifest["deleted"]),
+        "delta_size": os.path.getsize(delta_path),
+        "target_size": manifest["target_size"],
+    }
+
+
+def _verify_entries(path):
+    """Check every entry's content against its embedded SHA-256."""
+    with zipfile.ZipFile(path) as zipf:
+        for info in zipf.infolist():
+            if not info.comment.startswith(HASH_PREFIX):
+                continue
+            digest = hashlib.sha256()
+            with zipf.open(info) as f:  # also checks the CRC
+                while chunk := f.read(COPY_CHUNK):
+                    digest.update(chunk)
+            if digest.hexdigest().encode("ascii") != info.comment[len(HASH_PREFIX):]:
+                raise DeltaError(f"{info.filename} does not match its manifest hash")
+
+
+def apply_delta(old_path, delta_path, output_path):
+    """
+    Rebuild the target archive from old_path and a delta, then verify it.
+
+    The output is only put in place once every check passed; raises DeltaError
+    when the base does not match or the result fails verification.
+    """
+    with zipfile.ZipFile(delta_path) as delta:
+        manifest = json.loads(delta.read(DELTA_MANIFEST))
+        if manifest.get("format") != DELTA_FORMAT:
+            raise DeltaError(f"unsupported delta format: {manifest.get('format')}")
+        if file_sha256(old_path) != manifest["base_sha256"]:
+            raise DeltaError(f"{old_path} is not the archive this delta was made from")
+
+        tmp_path = output_path + ".tmp"
+        try:
+            with zipfile.ZipFile(old_path) as old, open(old_path, "rb") as old_fp, \
+                    zipfile.ZipFile(tmp_path, "w") as zipf:
+                zipf.comment = base64.b64decode(manifest["comment"])
+                for entry in manifest["entries"]:
+                    zinfo = zipfile.ZipInfo(entry["name"], tuple(entry["date_time"]))
+                    for field in ENTRY_FIELDS:
+                        if field != "date_time":
+                            setattr(zinfo, field, entry[field])
+                    zinfo.comment = base64.b64decode(entry["comment"])
+                    zinfo.extra = base64.b64decode(entry["extra"])
+                    if "base" in entry:
+                        chunks = read_raw_entry(old_fp, old.getinfo(entry["base"]))
+                    else:
+                        chunks = _member_chunks(delta, entry["data"])
+                    write_entry(zipf, zinfo, chunks)
+                    if zinfo.compress_size != entry["compress_size"]:
+                        raise DeltaError(f"{entry['name']} has the wrong compressed size")
+
+            with span("verify", "delta"):
+                _verify_entries(tmp_path)
+                if file_sha256(tmp_path) != manifest["target_sha256"]:
+                    raise DeltaError("rebuilt archive does not match the target's SHA-256")
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+            raise
+    return output_path
+
+
+def main():
+    enable_from_argv(sys.argv)
+    if len(sys.argv) != 5 or sys.argv[1] not in ("diff", "apply"):
+        print("Usage: python skill_delta.py diff <old.skill> <new.skill> <delta>")
+        print("       python skill_delta.py apply <old.skill> <delta> <output.skill>")
+        print("\nExample:")
+        print("  python skill_delta.py diff dist/2.8.0/my-skill.skill dist/2.9.0/my-skill.skill my-skill.skilldelta")
+        print("  python skill_delta.py apply my-skill.skill my-skill.skilldelta my-skill.skill")
+        sys.exit(1)
+
+    command, first, second, third = sys.argv[1:]
+    try:
+        if command == "diff":
+            with span("create_delta", "delta"):
+                stats = create_delta(first, second, third)
+            print(f"✅ Delta written to: {third}")
+            print(f"   {stats['stored']} added/changed, {stats['copied']} unchanged, {stats['deleted']} deleted")
+            print(f"   {stats['delta_size']:,} bytes (full archive: {stats['target_size']:,} bytes)")
+        else:
+            with span("apply_delta", "delta"):
+                apply_delta(first, second, third)
+            print(f"✅ Rebuilt and verified: {third}")
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile, DeltaError) as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
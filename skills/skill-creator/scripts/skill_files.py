@@ -0,0 +1,149 @@
+"""
+Skill file walker - Lists the files of a skill folder that belong in a package
+
+Skips build debris with built-in defaults (DEFAULT_IGNORES) plus an optional
+gitignore-style .skillignore at the skill root. Ignored directories are pruned
+before descending, so a large node_modules or .venv costs one directory entry.
+
+Supported .skillignore syntax (as in .gitignore):
+    # comment             blank lines and comments are skipped
+    *.log                 no slash: matches the name at any depth
+    /build  docs/*.tmp    a leading or inner slash anchors to the skill root
+    cache/                a trailing slash matches directories only
+    **/fixtures  a/**/b   ** spans any number of directories
+    !keep.log             re-includes a previously ignored path
+
+The last matching pattern wins; files inside an ignored directory cannot be
+re-included, since the directory is never read.
+"""
+
+import os
+import re
+
+IGNORE_FILE = ".skillignore"
+
+# Build debris, caches and editor files that never belong in a .skill file
+DEFAULT_IGNORES = (
+    ".git/", ".hg/", ".svn/",
+    "__pycache__/", "*.py[cod]", ".pytest_cache/", ".mypy_cache/", ".ruff_cache/", ".tox/",
+    "node_modules/", ".venv/", "venv/", "*.egg-info/",
+    ".idea/", ".vscode/", "*.swp", "*.swo", "*~", ".DS_Store", "Thumbs.db",
+    "*.skill", "*.skill.tmp",
+    IGNORE_FILE,
+)
+
+
+def _translate(pattern):
+    """Translate one gitignore glob (without !, leading / or trailing /) to a regex."""
+    parts = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            parts.append("[^/]*")
+        elif c == "?":
+            parts.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                parts.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            parts.append(re.escape(pattern[i]))
+        else:
+            parts.append(re.escape(c))
+        i += 1
+    return "".join(parts)
+
+
+class IgnoreRules:
+    """Compiled ignore patterns, matched against paths relative to the skill root."""
+
+    def __init__(self, lines):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n")
+            if line.endswith(" ") and not line.endswith("\\ "):
+                line = line.rstrip(" ")
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            line = line.lstrip("/")
+            regex = _translate(line)
+            if not anchored:
+                regex = "(?:.*/)?" + regex
+            self.rules.append((re.compile(regex + r"\Z", re.DOTALL), negate, dir_only))
+
+    def ignored(self, relpath, is_dir):
+        """Return True if the "/"-separated relative path is ignored."""
+        ignored = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if ignored == negate and regex.match(relpath):
+                ignored = not negate
+        return ignored
+
+
+def load_ignore_rules(skill_path):
+    """Return the defaults plus the skill's .skillignore patterns."""
+    lines = list(DEFAULT_IGNORES)
+    try:
+        with open(os.path.join(skill_path, IGNORE_FILE), encoding="utf-8") as f:
+            lines.extend(f)
+    except FileNotFoundError:
+        pass
+    return IgnoreRules(lines)
+
+
+def walk_skill_files(skill_path, rules=None):
+    """
+    Return (relpath, absolute path, size) for every packable file, sorted.
+
+    Like Path.rglob, symlinked files are included but symlinked directories are
+    not descended into.
+    """
+    skill_path = os.path.abspath(skill_path)
+    if rules is None:
+        rules = load_ignore_rules(skill_path)
+    files = []
+    pending = [("", skill_path)]
+    while pending:
+        prefix, directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relpath = prefix + entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not rules.ignored(relpath, True):
+                            pending.append((relpath + "/", entry.path))
+                    elif entry.is_file() and not rules.ignored(relpath, False):
+                        files.append((relpath, entry.path, entry.stat().st_size))
+                except OSError:
+                    continue
+    files.sort()
+    return files
+
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Skill Router - Offline search over skill and agent descriptions
+
+Claude picks a skill or subagent from its name and description alone. This
+tool builds a BM25 index over those fields for every skill and agent in a
+repository (see validate_all.py for discovery) to show which ones a prompt
+would most likely hit and where descriptions overlap.
+
+The index stores, for each term, the precomputed BM25 weight of every
+document containing it, so a query is one dictionary lookup per query term.
+It is saved to $XDG_CACHE_HOME/devflow/routing-index-<root>.json with the
+SHA-256 of every source file and rebuilt automatically when a file is added, removed
+or changed (files whose size and mtime are unchanged are not re-hashed).
+
+Commands:
+    build                 rebuild the index and print its statistics
+    query "<prompt>"      rank skills and agents for one prompt
+    batch <prompts-file>  score many prompts (one per line; "name<TAB>prompt"
+                          lines also check the expected top match) and report
+                          ambiguous prompts, confused pairs and skills that
+                          are never the top match
+
+Usage:
+    python skill_router.py build [--root DIR]
+    python skill_router.py query "<prompt>" [--root DIR] [--top N]
+    python skill_router.py batch <prompts-file> [--root DIR] [--margin F]
+
+Example:
+    python skill_router.py query "open a merge request for my branch"
+    python skill_router.py batch sample-prompts.txt --margin 0.9
+
+Environment:
+    XDG_CACHE_HOME  Cache location (default ~/.cache); indexes are kept in
+                    devflow/routing-index-*.json, one per repository
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+
+from devflow_trace import enable_from_argv, span
+from frontmatter import FrontmatterError, read_frontmatter
+from package_skill import pop_option
+from validate_all import cache_path, discover_agents, discover_skills
+
+INDEX_NAME = "routing-index-{}.json"
+INDEX_FORMAT = 1
+# Standard BM25 parameters
+K1 = 1.2
+B = 0.75
+# A prompt is ambiguous when the runner-up scores at least this share of the top score
+DEFAULT_MARGIN = 0.9
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a an and are as at be by can for from has have how i if in into is it its me my
+of on or our so that the their them then there these this to use used uses
+using was we what when where which while who will with you your
+""".split())
+
+
+def tokenize(text):
+    """Lowercase words minus stopwords, with plurals folded ("issues" -> "issue")."""
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+            word = word[:-1]
+        terms.append(word)
+    return terms
+
+
+def _sources(root):
+    """Return [(kind, path relative to root, real path)] of every distinct skill and agent file."""
+    seen = set()
+    found = []
+    for kind, relpaths in (("skill", discover_skills(root)), ("agent", discover_agents(root))):
+        for relpath in relpaths:
+            path = os.path.join(relpath, "SKILL.md") if kind == "skill" else relpath
+            real = os.path.realpath(os.path.join(root, path))
+            if real not in seen:
+                seen.add(real)
+                # Name the real file rather than a plugin symlink to it
+                found.append((kind, os.path.relpath(real, os.path.realpath(root)), real))
+    return found
+
+
+def _sha256(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_index(root):
+    """
+    Build the routing index for every skill and agent under root.
+
+    Returns the index dict: the documents (kind, name, path), the per-term
+    postings [[document, weight], ...] sorted by weight, and the source
+    file fingerprints used to detect changes.
+    """
+    docs = []
+    term_counts = []
+    files = {}
+    for kind, path, real in _sources(root):
+        stat = os.stat(real)
+        files[path] = [stat.st_mtime_ns, stat.st_size, _sha256(real)]
+        try:
+            frontmatter = read_frontmatter(real)
+        except FrontmatterError:
+            continue
+        except Exception as e:
+            import yaml
+            if not isinstance(e, yaml.YAMLError):
+                raise
+            continue
+        if not isinstance(frontmatter, dict):
+            continue
+        name = frontmatter.get("name")
+        name = name if isinstance(name, str) and name.strip() else os.path.basename(os.path.dirname(path))
+        description = frontmatter.get("description")
+        text = f"{name} {description if isinstance(description, str) else ''}"
+        counts = {}
+        for term in tokenize(text):
+            counts[term] = counts.get(term, 0) + 1
+        docs.append({"kind": kind, "name": name.strip(), "path": path, "length": sum(counts.values())})
+        term_counts.append(counts)
+
+    average = sum(doc["length"] for doc in docs) / len(docs) if docs else 0.0
+    frequencies = {}
+    for counts in term_counts:
+        for term in counts:
+            frequencies[term] = frequencies.get(term, 0) + 1
+    postings = {}
+    for number, counts in enumerate(term_counts):
+        norm = K1 * (1 - B + B * docs[number]["length"] / average)
+        for term, count in counts.items():
+            idf = math.log(1 + (len(docs) - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+            postings.setdefault(term, []).append([number, round(idf * count * (K1 + 1) / (count + norm), 5)])
+    for entries in postings.values():
+        entries.sort(key=lambda entry: -entry[1])
+    return {"format": INDEX_FORMAT, "root": os.path.realpath(root), "files": files,
+            "docs": docs, "postings": postings}
+
+
+def index_path(root):
+    digest = hashlib.sha256(os.path.realpath(root).encode("utf-8")).hexdigest()[:12]
+    return cache_path(INDEX_NAME.format(digest))
+
+
+def _check_current(index, root):
+    """
+    Return "current", "touched" (same content, newer mtimes, which are
+    updated in the index) or "stale" for an index and the files under root.
+    """
+    if index.get("format") != INDEX_FORMAT or index.get("root") != os.path.realpath(root):
+        return "stale"
+    files = index["files"]
+    sources = _sources(root)
+    if {path for _, path, _ in sources} != set(files):
+        return "stale"
+    state = "current"
+    for _, path, real in sources:
+        mtime, size, digest = files[path]
+        stat = os.stat(real)
+        if (stat.st_mtime_ns, stat.st_size) == (mtime, size):
+            continue
+        if stat.st_size != size or _sha256(real) != digest:
+            return "stale"
+        files[path][0] = stat.st_mtime_ns
+        state = "touched"
+    return state
+
+
+def load_index(root, rebuild=False):
+    """
+    Return the index for root: the saved one if its sources are unchanged,
+    otherwise a freshly built one (which is then saved).
+    """
+    path = index_path(root)
+    state = "stale"
+    if not rebuild:
+        try:
+            with open(path) as f:
+                index = json.load(f)
+            with span("check_index", "route"):
+                state = _check_current(index, root)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    if state == "current":
+        return index
+    if state == "stale":
+        with span("build_index", "route"):
+            index = build_index(root)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"skill_router: cannot write index {path}: {e}", file=sys.stderr)
+    return index
+
+
+def query(index, prompt, top=5):
+    """Rank documents for a prompt; returns [(score, doc)] best first, only those that match."""
+    postings = index["postings"]
+    scores = {}
+    for term in set(tokenize(prompt)):
+        for number, weight in postings.get(term, ()):
+            scores[number] = scores.get(number, 0.0) + weight
+    best = sorted(scores.items(), key=lambda item: -item[1])[:top]
+    return [(score, index["docs"][number]) for number, score in best]
+
+
+def batch_report(index, prompts, margin=DEFAULT_MARGIN):
+    """
+    Score many prompts.
+
+    prompts is a list of (expected name or None, prompt). Returns a dict with
+    per-document top-match counts, the ambiguous prompts, the most confused
+    pairs, prompts that match nothing, mismatches against expected names,
+    and the documents that are never the top match.
+    """
+    wins = {doc["name"]: 0 for doc in index["docs"]}
+    ambiguous = []
+    confused = {}
+    unmatched = []
+    wrong = []
+    for expected, prompt in prompts:
+        ranked = query(index, prompt, top=2)
+        if not ranked:
+            unmatched.append(prompt)
+            if expected:
+                wrong.append((prompt, expected, None))
+            continue
+        winner = ranked[0][1]["name"]
+        wins[winner] += 1
+        if len(ranked) > 1 and ranked[1][0] >= margin * ranked[0][0]:
+            pair = tuple(sorted((winner, ranked[1][1]["name"])))
+            confused[pair] = confused.get(pair, 0) + 1
+            ambiguous.append((prompt, winner, ranked[1][1]["name"], ranked[1][0] / ranked[0][0]))
+        if expected and expected != winner:
+            wrong.append((prompt, expected, winner))
+    return {
+        "wins": wins,
+        "ambiguous": ambiguous,
+        "confused": sorted(confused.items(), key=lambda item: (-item[1], item[0])),
+        "unmatched": unmatched,
+        "wrong": wrong,
+        "unreachable": sorted(name for name, count in wins.items() if count == 0),
+    }
+
+
+def read_prompts(path):
+    """Read a prompts file: one prompt per line, optionally "expected-name<TAB>prompt"; # comments."""
+    prompts = []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            expected, tab, prompt = line.partition("\t")
+            prompts.append((expected.strip(), prompt) if tab else (None, line))
+    return prompts
+
+
+def usage():
+    print("Usage: python skill_router.py build [--root DIR]")
+    print('       python skill_router.py query "<prompt>" [--root DIR] [--top N]')
+    print("       python skill_router.py batch <prompts-file> [--root DIR] [--margin F]")
+    print("\nExample:")
+    print('  python skill_router.py query "open a merge request for my branch"')
+    print("  python skill_router.py batch sample-prompts.txt")
+    sys.exit(1)
+
+
+def main():
+    enable_from_argv(sys.argv)
+    root = pop_option(sys.argv, "--root") or "."
+    top = pop_option(sys.argv, "--top") or "5"
+    margin = pop_option(sys.argv, "--margin") or str(DEFAULT_MARGIN)
+    command = sys.argv[1] if len(sys.argv) > 1 else None
+    if not ((command == "build" and len(sys.argv) == 2)
+            or (command in ("query", "batch") and len(sys.argv) == 3)) or not top.isdigit():
+        usage()
+    try:
+        margin = float(margin)
+    except ValueError:
+        usage()
+
+    started = time.perf_counter()
+    index = load_index(root, rebuild=command == "build")
+    loaded = (time.perf_counter() - started) * 1000
+
+    if command == "build":
+        size = os.path.getsize(index_path(root))
+        print(f"✅ Indexed {len(index['docs'])} skills and agents, {len(index['postings'])} terms "
+              f"({size:,} bytes) in {loaded:.1f} ms")
+        print(f"   Index: {index_path(root)}")
+        return
+
+    if command == "query":
+        started = time.perf_counter()
+        with span("query", "route"):
+            ranked = query(index, sys.argv[2], int(top))
+        elapsed = (time.perf_counter() - started) * 1e6
+        if not ranked:
+            print("❌ No skill or agent matches")
+        for score, doc in ranked:
+            print(f"   {score:6.2f}  {doc['kind']:<5}  {doc['name']:<45}  {doc['path']}")
+        print(f"\n🔍 Query {elapsed:.0f} µs (index loaded and checked in {loaded:.1f} ms)")
+        return
+
+    try:
+        prompts = read_prompts(sys.argv[2])
+    except OSError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+    started = time.perf_counter()
+    with span("batch", "route", prompts=len(prompts)):
+        report = batch_report(index, prompts, margin)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print("📋 Top-match counts:")
+    for name, count in sorted(report["wins"].items(), key=lambda item: (-item[1], item[0])):
+        print(f"   {count:>6}  {name}")
+    if report["confused"]:
+        print(f"\n⚠️  Most confused pairs (runner-up within {margin:.0%} of the top score):")
+        for (first, second), count in report["confused"][:15]:
+            print(f"   {count:>6}  {first}  ~  {second}")
+    for prompt, expected, winner in report["wrong"][:20]:
+        print(f"❌ expected {expected}, got {winner or 'no match'}: {prompt}")
+    if report["unreachable"]:
+        print(f"\n❌ Never the top match: {', '.join(report['unreachable'])}")
+    print(f"\n🔍 {len(prompts)} prompts: {len(report['ambiguous'])} ambiguous, {len(report['unmatched'])} "
+          f"unmatched, {len(report['wrong'])} unexpected, {len(report['unreachable'])} never chosen "
+          f"in {elapsed:.0f} ms ({elapsed * 1000 / max(len(prompts), 1):.0f} µs per prompt)")
+    sys.exit(1 if report["unreachable"] or report["wrong"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Skill Watcher - Re-validates and re-packages skills as they are edited (Linux)
+
+Subscribes to inotify events under one or more skill folders (every
+subdirectory that would be packaged; ignored ones such as node_modules are
+not watched), waits until saves have been quiet for the debounce interval,
+then re-validates each affected skill and, unless --validate-only, packages
+it incrementally into the output directory.
+
+State stays in memory between runs: the validation cache, each skill's ignore
+rules (reloaded when its .skillignore changes) and the SHA-256 of every file
+by size and mtime, so a run only hashes and compresses what changed. Events
+for ignored paths (editor swap files, .skill outputs) are dropped, so an
+output directory inside a skill folder does not retrigger it.
+
+Also available as `package_skill.py <skill-folder> [output-directory] --watch`
+and `quick_validate.py <skill_directory>... --watch`.
+
+Usage:
+    python skill_watch.py <skill-folder>... [--output DIR] [--validate-only]
+                          [--debounce MS] [--compression SPEC] [--trace[=FILE]]
+
+Example:
+    python skill_watch.py skills/my-skill --output ./dist
+    python skill_watch.py skills/* --validate-only
+"""
+
+import contextlib
+import ctypes
+import ctypes.util
+import io
+import os
+import select
+import struct
+import sys
+import time
+
+from devflow_trace import enable_from_argv, span
+from skill_files import IGNORE_FILE, load_ignore_rules
+
+DEFAULT_DEBOUNCE_MS = 150
+
+# From <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify:
+    """Minimal inotify binding over libc with ctypes."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("--watch needs Linux inotify")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read(self, timeout):
+        """Return [(wd, mask, name)] of the events available within timeout seconds."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class SkillWatcher:
+    """Watches skill folders and rebuilds the ones that change."""
+
+    def __init__(self, skill_paths, output_dir=None, validate_only=False, compression="deflate",
+                 debounce=DEFAULT_DEBOUNCE_MS / 1000):
+        from validate_all import ValidationCache
+        self.skills = [os.path.realpath(path) for path in skill_paths]
+        self.output_dir = output_dir
+        self.validate_only = validate_only
+        self.compression = compression
+        self.debounce = debounce
+        self.cache = ValidationCache()
+        self.digests = {}
+        self.rules = {skill: load_ignore_rules(skill) for skill in self.skills}
+        self.watches = {}
+        self.inotify = Inotify()
+        for skill in self.skills:
+            self._watch_tree(skill, skill)
+
+    def _ignored(self, skill, path, is_dir):
+        relpath = os.path.relpath(path, skill).replace(os.sep, "/")
+        if relpath == ".":
+            return False
+        rules = self.rules[skill]
+        parts = relpath.split("/")
+        # A path is ignored when it or any directory above it is
+        return any(rules.ignored("/".join(parts[:i]), True) for i in range(1, len(parts))) \
+            or rules.ignored(relpath, is_dir)
+
+    def _watch_tree(self, skill, top):
+        for directory, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if not self._ignored(skill, os.path.join(directory, d), True)]
+            try:
+                self.watches[self.inotify.add_watch(directory)] = (skill, directory)
+            except OSError as e:
+                print(f"⚠️  Cannot watch {directory}: {e}")
+
+    def _affected(self, events):
+        """Map events to the set of skills they touch, adding watches for new directories."""
+        changed = set()
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: rebuild everything
+                return set(self.skills)
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            if wd not in self.watches:
+                continue
+            skill, directory = self.watches[wd]
+            path = os.path.join(directory, name) if name else directory
+            is_dir = bool(mask & IN_ISDIR)
+            if name == IGNORE_FILE and directory == skill:
+                self.rules[skill] = load_ignore_rules(skill)
+            elif name and self._ignored(skill, path, is_dir):
+                continue
+            if is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                self._watch_tree(skill, path)
+            changed.add(skill)
+        return changed
+
+    def rebuild(self, skill):
+        """Validate and (unless validate_only) package one skill; prints one summary line."""
+        from package_skill import package_skill
+        from validate_all import validate_skill_cached
+        name = os.path.basename(skill)
+        started = time.perf_counter()
+        log = io.StringIO()
+        with span("rebuild", "watch", skill=skill):
+            if self.validate_only:
+                ok, message = validate_skill_cached(skill, self.cache)
+            else:
+                with contextlib.redirect_stdout(log):
+                    ok = package_skill(skill, self.output_dir, incremental=True, compression=self.compression,
+                                       digests=self.digests, cache=self.cache) is not None
+                errors = [line.strip().lstrip("❌").strip()
+                          for line in log.getvalue().splitlines() if line.lstrip().startswith("❌")]
+                message = "; ".join(errors)
+            self.cache.save()
+        elapsed = (time.perf_counter() - started) * 1000
+        if not ok:
+            print(f"❌ {name}: {message or 'failed'} ({elapsed:.0f} ms)")
+        elif self.validate_only:
+            print(f"✅ {name}: valid ({elapsed:.0f} ms)")
+        else:
+            lines = log.getvalue().splitlines()
+            reused = sum(1 for line in lines if line.lstrip().startswith("Reused:"))
+            written = sum(1 for line in lines if line.lstrip().startswith(("Added:", "Stored:")))
+            print(f"✅ {name}: packaged, {written} changed, {reused} reused ({elapsed:.0f} ms)")
+        return ok
+
+    def run(self, once=False):
+        """Rebuild every skill, then wait for changes; with once, stop after the first batch."""
+        for skill in self.skills:
+            self.rebuild(skill)
+        print(f"\n👀 Watching {len(self.skills)} skill(s), {len(self.watches)} directories (Ctrl-C to stop)")
+        while True:
+            changed = self._affected(self.inotify.read(None))
+            # Debounce: keep collecting until saves have been quiet for a while
+            while events := self.inotify.read(self.debounce):
+                changed |= self._affected(events)
+            for skill in sorted(changed):
+                self.rebuild(skill)
+            if once and changed:
+                return
+
+    def close(self):
+        self.inotify.close()
+
+
+def watch(skill_paths, output_dir=None, validate_only=False, compression="deflate",
+          debounce=DEFAULT_DEBOUNCE_MS / 1000):
+    """Run the watcher until interrupted; returns a process exit status."""
+    for path in skill_paths:
+        if not os.path.isdir(path):
+            print(f"❌ Error: Skill folder not found: {path}")
+            return 1
+    try:
+        watcher = SkillWatcher(skill_paths, output_dir, validate_only, compression, debounce)
+    except OSError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+    return 0
+
+
+def main():
+    from package_skill import pop_option
+    enable_from_argv(sys.argv)
+    validate_only = "--validate-only" in sys.argv
+    if validate_only:
+        sys.argv.remove("--validate-only")
+    output_dir = pop_option(sys.argv, "--output")
+    debounce = pop_option(sys.argv, "--debounce") or str(DEFAULT_DEBOUNCE_MS)
+    compression = pop_option(sys.argv, "--compression") or "deflate"
+    if len(sys.argv) < 2 or any(arg.startswith("-") for arg in sys.argv[1:]) or not debounce.isdigit():
+        print("Usage: python skill_watch.py <skill-folder>... [--output DIR] [--validate-only]")
+        print("                             [--debounce MS] [--compression SPEC] [--trace[=FILE]]")
+        print("\nExample:")
+        print("  python skill_watch.py skills/my-skill --output ./dist")
+        print("  python skill_watch.py skills/* --validate-only")
+        sys.exit(1)
+    sys.exit(watch(sys.argv[1:], output_dir, validate_only, compression, int(debounce) / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Token Budget Analyzer - Estimates how much context each skill and agent costs
+
+Skills and agents load into context in tiers:
+
+    frontmatter  the name and description values; always in context
+    body         the rest of SKILL.md or the agent file; loaded when it triggers
+    reference    each file reachable from it (see link_graph.py) under
+                 references/ or ending in .md/.txt; loaded on demand
+
+Scripts and assets are not counted: they are run or copied, not read.
+
+Tokens are estimated as characters / 4 (adjustable with --chars-per-token),
+which is close enough for English Markdown to compare files and catch
+growth; it is not an exact tokenizer count. Every tier has a budget, checked
+per file; the report ranks the files that use the largest share of their
+budget across the whole repository, and the exit status is 1 when any file is
+over budget, so the script can gate packaging.
+
+Default budgets follow the guidance in SKILL.md: frontmatter 256 (a
+1024-character description), body 6500 (~5k words), reference 13000 (~10k
+words).
+
+Usage:
+    python token_budget.py [repository-root] [--budget TIER=TOKENS]... [--top N]
+                           [--chars-per-token N] [--trace[=FILE]]
+
+Example:
+    python token_budget.py
+    python token_budget.py . --budget body=4000 --budget reference=8000 --top 20
+"""
+
+import math
+import os
+import sys
+import time
+
+from devflow_trace import enable_from_argv, span
+from frontmatter import FrontmatterError, parse_frontmatter, split_frontmatter
+from link_graph import ReferenceCache, walk_entry
+from package_skill import pop_option
+from validate_all import discover_agents, discover_skills
+
+TIERS = ("frontmatter", "body", "reference")
+DEFAULT_BUDGETS = {"frontmatter": 256, "body": 6500, "reference": 13000}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+REFERENCE_EXTENSIONS = (".md", ".txt")
+
+
+def estimate_tokens(text, chars_per_token=DEFAULT_CHARS_PER_TOKEN):
+    return math.ceil(len(text) / chars_per_token)
+
+
+def _read(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _is_reference(path, skill_root):
+    if path.endswith(REFERENCE_EXTENSIONS):
+        return True
+    relpath = os.path.relpath(path, skill_root) if skill_root else ""
+    return relpath.split(os.sep)[0] == "references"
+
+
+def _always_loaded(frontmatter_text):
+    """The name and description that stay in context, or the raw text if unparseable."""
+    try:
+        frontmatter = parse_frontmatter(frontmatter_text)
+    except Exception:
+        return frontmatter_text
+    if not isinstance(frontmatter, dict):
+        return frontmatter_text
+    return " ".join(str(frontmatter.get(key) or "") for key in ("name", "description"))
+
+
+def entry_costs(entry, skill_root, root, cache, chars_per_token=DEFAULT_CHARS_PER_TOKEN):
+    """
+    Estimate the tokens of one skill or agent.
+
+    Returns a list of (tier, path, tokens): its frontmatter, its body and
+    each reachable reference, paths relative to root.
+    """
+    content = _read(entry)
+    try:
+        frontmatter_text, body = split_frontmatter(content)
+    except FrontmatterError:
+        # No frontmatter: the whole file is loaded as the body
+        frontmatter_text, body = "", content
+    relpath = os.path.relpath(entry, root)
+    costs = [
+        ("frontmatter", relpath, estimate_tokens(_always_loaded(frontmatter_text), chars_per_token)),
+        ("body", relpath, estimate_tokens(body, chars_per_token)),
+    ]
+    reachable, _ = walk_entry(entry, skill_root, root, cache)
+    for path in sorted(reachable):
+        if path != entry and _is_reference(path, skill_root):
+            costs.append(("reference", os.path.relpath(path, root),
+                          estimate_tokens(_read(path), chars_per_token)))
+    return costs
+
+
+def analyze(root, chars_per_token=DEFAULT_CHARS_PER_TOKEN):
+    """
+    Estimate the tokens of every skill and agent under root.
+
+    Returns a list of {"entry", "kind", "costs"} dicts, one per distinct
+    skill or agent (symlinked copies are counted once); costs as returned by
+    entry_costs. A reference shared by several skills appears under each.
+    """
+    root = os.path.realpath(root)
+    cache = ReferenceCache()
+    seen = set()
+    results = []
+    found = [("skill", relpath) for relpath in discover_skills(root)]
+    found += [("agent", relpath) for relpath in discover_agents(root)]
+    for kind, relpath in found:
+        real = os.path.realpath(os.path.join(root, relpath))
+        if real in seen:
+            continue
+        seen.add(real)
+        if kind == "skill":
+            entry, skill_root = os.path.join(real, "SKILL.md"), real
+        else:
+            entry, skill_root = real, None
+        with span("estimate", "tokens", path=relpath):
+            costs = entry_costs(entry, skill_root, root, cache, chars_per_token)
+        results.append({"entry": os.path.relpath(entry, root), "kind": kind, "costs": costs})
+    cache.save()
+    return results
+
+
+def over_budget(results, budgets):
+    """
+    Rank every (tier, path, tokens) by its share of the tier budget.
+
+    Returns (ranked, over): all distinct items sorted by tokens/budget,
+    highest first, and the ones above their budget.
+    """
+    items = {(tier, path): tokens for result in results for tier, path, tokens in result["costs"]}
+    ranked = sorted(((tier, path, tokens) for (tier, path), tokens in items.items()),
+                    key=lambda item: (-item[2] / budgets[item[0]], item[1]))
+    return ranked, [item for item in ranked if item[2] > budgets[item[0]]]
+
+
+def parse_budgets(values):
+    """Turn ["body=4000", ...] into a budgets dict; raises ValueError."""
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values:
+        tier, _, tokens = value.partition("=")
+        if tier not in budgets:
+            raise ValueError(f"unknown tier '{tier}' (expected {', '.join(TIERS)})")
+        if not tokens.isdigit() or int(tokens) < 1:
+            raise ValueError(f"budget for {tier} must be a positive number of tokens")
+        budgets[tier] = int(tokens)
+    return budgets
+
+
+def usage():
+    print("Usage: python token_budget.py [repository-root] [--budget TIER=TOKENS]... [--top N]")
+    print("                              [--chars-per-token N] [--trace[=FILE]]")
+    print(f"\nTiers: {', '.join(f'{tier} (default {DEFAULT_BUDGETS[tier]})' for tier in TIERS)}")
+    print("\nExample:")
+    print("  python token_budget.py . --budget body=4000 --top 20")
+    sys.exit(1)
+
+
+def main():
+    enable_from_argv(sys.argv)
+    budget_values = []
+    while (value := pop_option(sys.argv, "--budget")) is not None:
+        budget_values.append(value)
+    top = pop_option(sys.argv, "--top") or "10"
+    ratio = pop_option(sys.argv, "--chars-per-token") or str(DEFAULT_CHARS_PER_TOKEN)
+    if len(sys.argv) > 2 or any(arg.startswith("-") for arg in sys.argv[1:]) or not top.isdigit():
+        usage()
+    try:
+        budgets = parse_budgets(budget_values)
+        chars_per_token = float(ratio)
+        if chars_per_token <= 0:
+            raise ValueError("--chars-per-token must be positive")
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
+
+    root = sys.argv[1] if len(sys.argv) > 1 else "."
+    started = time.perf_counter()
+    with span("token_budget", "tokens", root=root):
+        results = analyze(root, chars_per_token)
+        ranked, over = over_budget(results, budgets)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    print(f"{'frontmatter':>12} {'body':>8} {'references':>11}  entry")
+    for result in sorted(results, key=lambda r: r["entry"]):
+        totals = {tier: sum(t for tr, _, t in result["costs"] if tr == tier) for tier in TIERS}
+        count = sum(1 for tier, _, _ in result["costs"] if tier == "reference")
+        print(f"{totals['frontmatter']:>12,} {totals['body']:>8,} {totals['reference']:>11,}  "
+              f"{result['entry']}" + (f" (+{count} reference{'s' if count > 1 else ''})" if count else ""))
+
+    always = sum(tokens for result in results for tier, _, tokens in result["costs"] if tier == "frontmatter")
+    print(f"\n📋 Largest share of budget (top {min(int(top), len(ranked))}):")
+    for tier, path, tokens in ranked[:int(top)]:
+        share = tokens / budgets[tier]
+        marker = "❌" if tokens > budgets[tier] else "  "
+        print(f" {marker} {share:>5.0%}  {tokens:>7,} / {budgets[tier]:<7,} {tier:<11} {path}")
+
+    print(f"\n🔍 {len(results)} skills and agents, ~{always:,} tokens always in context; "
+          f"{len(over)} files over budget in {elapsed:.0f} ms")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Bulk Skill Validator - Validates every skill and agent in a repository at once
+
+Finds every SKILL.md under <root>/skills/ and <root>/plugins/*/skills/ and
+every agent under <root>/agents/ and <root>/plugins/*/agents/, checks each
+distinct file (symlinked copies are checked once) in a process pool, and
+builds one in-memory index of their names and descriptions. Every problem is
+reported, not just the first one per file.
+
+Checks against the whole index, each a single pass over it:
+- the last segment of a name ("devflow:build:plan-issue") must match the
+  skill's directory or the agent's file name
+- names must be unique among skills and among agents
+- no two descriptions may be the same (ignoring case and whitespace)
+- symlinks in plugins/*/skills/ and plugins/*/agents/ must not be broken
+
+Per-file results are cached by the SHA-256 of the file content and the
+validator version (a hash of the validator sources, so editing the rules
+invalidates the cache). A warm re-run only hashes each file and re-checks the
+ones that changed. package_skill.py uses the same cache.
+
+Usage:
+    python validate_all.py [repository-root] [--workers N] [--no-cache] [--trace[=FILE]]
+
+Example:
+    python validate_all.py
+    python validate_all.py ~/src/claude-code-primitives --workers 4
+
+Environment:
+    XDG_CACHE_HOME  Cache location (default ~/.cache); results are kept in
+                    devflow/validate-cache.json
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from devflow_trace import enable_from_argv, span
+
+CACHE_NAME = "validate-cache.json"
+# Sources whose rules decide a file's result
+VALIDATOR_SOURCES = ("quick_validate.py", "frontmatter.py", "validate_all.py")
+# Enough for several checkouts; the least recently used results go first
+CACHE_MAX_ENTRIES = 4096
+PRUNED_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv"}
+
+_version = None
+
+
+def validator_version():
+    """Hash of the validator sources: any change to the rules invalidates cached results."""
+    global _version
+    if _version is None:
+        digest = hashlib.sha256()
+        for name in VALIDATOR_SOURCES:
+            with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), "rb") as f:
+                digest.update(f.read())
+        _version = digest.hexdigest()[:16]
+    return _version
+
+
+def cache_path(name=CACHE_NAME):
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "devflow", name)
+
+
+class ValidationCache:
+    """
+    Per-file records keyed by content hash, for one validator version. A
+    record is {"name", "description", "problems"}; name and description are
+    None unless they are strings.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or cache_path()
+        self.version = validator_version()
+        self.results = {}
+        self.dirty = False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == self.version:
+                self.results = data["results"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+
+    def get(self, key):
+        record = self.results.pop(key, None)
+        if record is not None:
+            # Re-insert so dict order tracks recent use
+            self.results[key] = record
+        return record
+
+    def put(self, key, record):
+        self.results.pop(key, None)
+        self.results[key] = record
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        results = dict(list(self.results.items())[-CACHE_MAX_ENTRIES:])
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"version": self.version, "results": results}, f)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"validate_all: cannot write cache {self.path}: {e}", file=sys.stderr)
+
+
+def file_digest(path):
+    """SHA-256 of a file's content, or None if it cannot be read."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def skill_md_digest(skill_path):
+    """SHA-256 of a skill's SKILL.md, or None if it cannot be read."""
+    return file_digest(os.path.join(skill_path, "SKILL.md"))
+
+
+def _record(frontmatter, problems):
+    frontmatter = frontmatter or {}
+    name = frontmatter.get("name")
+    description = frontmatter.get("description")
+    return {
+        "name": name.strip() if isinstance(name, str) else None,
+        "description": description.strip() if isinstance(description, str) else None,
+        "problems": problems,
+    }
+
+
+def skill_record(skill_path):
+    """Check one skill folder and return its index record."""
+    from quick_validate import skill_report
+    return _record(*skill_report(skill_path))
+
+
+def agent_record(agent_path):
+    """Check one agent file and return its index record."""
+    from frontmatter import FrontmatterError, read_frontmatter
+    try:
+        frontmatter = read_frontmatter(agent_path)
+    except FrontmatterError as e:
+        return _record(None, [str(e)])
+    except Exception as e:
+        import yaml
+        if not isinstance(e, yaml.YAMLError):
+            raise
+        return _record(None, [f"Invalid YAML in frontmatter: {e}"])
+    if not isinstance(frontmatter, dict):
+        return _record(None, ["Frontmatter must be a YAML dictionary"])
+
+    problems = []
+    for field in ("name", "description"):
+        value = frontmatter.get(field)
+        if field not in frontmatter:
+            problems.append(f"Missing '{field}' in frontmatter")
+        elif not isinstance(value, str) or not value.strip():
+            problems.append(f"'{field}' must be a non-empty string")
+    name = frontmatter.get("name")
+    if isinstance(name, str) and name.strip() and not re.match(r"^[a-z0-9]+(-[a-z0-9]+)*$", name.strip()):
+        problems.append(f"Name '{name.strip()}' should be hyphen-case (lowercase letters, digits, and hyphens only)")
+    return _record(frontmatter, problems)
+
+
+def validate_skill_cached(skill_path, cache=None):
+    """quick_validate.validate_skill, answered from the cache when SKILL.md is unchanged."""
+    own_cache = cache is None
+    if own_cache:
+        cache = ValidationCache()
+    digest = skill_md_digest(skill_path)
+    key = f"skill:{digest}"
+    record = cache.get(key) if digest else None
+    if record is None:
+        record = skill_record(skill_path)
+        if digest:
+            cache.put(key, record)
+    if own_cache:
+        cache.save()
+    problems = record["problems"]
+    return not problems, "; ".join(problems) or "Skill is valid!"
+
+
+def discover_skills(root):
+    """
+    Return sorted paths (relative to root) of every skill folder under
+    skills/ and plugins/*/skills/.
+    """
+    found = []
+    skills_root = os.path.join(root, "skills")
+    for directory, dirs, files in os.walk(skills_root):
+        dirs[:] = sorted(d for d in dirs if d not in PRUNED_DIRS)
+        if "SKILL.md" in files:
+            found.append(os.path.relpath(directory, root))
+    for plugin_skills in _plugin_dirs(root, "skills"):
+        for name in sorted(os.listdir(plugin_skills)):
+            if os.path.isfile(os.path.join(plugin_skills, name, "SKILL.md")):
+                found.append(os.path.relpath(os.path.join(plugin_skills, name), root))
+    return sorted(found)
+
+
+def discover_agents(root):
+    """
+    Return sorted paths (relative to root) of every agent file: *.md under
+    agents/ and every file in plugins/*/agents/ (usually symlinks).
+    """
+    found = []
+    agents_root = os.path.join(root, "agents")
+    try:
+        names = os.listdir(agents_root)
+    except OSError:
+        names = []
+    found.extend(os.path.join("agents", name) for name in names
+                 if name.endswith(".md") and os.path.isfile(os.path.join(agents_root, name)))
+    for plugin_agents in _plugin_dirs(root, "agents"):
+        for name in os.listdir(plugin_agents):
+            if os.path.isfile(os.path.join(plugin_agents, name)):
+                found.append(os.path.relpath(os.path.join(plugin_agents, name), root))
+    return sorted(found)
+
+
+def find_broken_links(root):
+    """Return sorted (relative path, target) of broken symlinks in plugins/*/skills and plugins/*/agents."""
+    broken = []
+    for kind in ("skills", "agents"):
+        for directory in _plugin_dirs(root, kind):
+            for entry in os.scandir(directory):
+                if entry.is_symlink() and not os.path.exists(entry.path):
+                    broken.append((os.path.relpath(entry.path, root), os.readlink(entry.path)))
+    return sorted(broken)
+
+
+def _plugin_dirs(root, kind):
+    plugins_root = os.path.join(root, "plugins")
+    try:
+        plugins = sorted(os.listdir(plugins_root))
+    except OSError:
+        return []
+    return [path for path in (os.path.join(plugins_root, plugin, kind) for plugin in plugins)
+            if os.path.isdir(path)]
+
+
+def _check_worker(job):
+    kind, path = job
+    return skill_record(path) if kind == "skill" else agent_record(path)
+
+
+def build_index(root, workers=None, use_cache=True):
+    """
+    Check every skill and agent under root once and index the results.
+
+    Returns a dict keyed by real path; each entry is a record (see
+    ValidationCache) plus "kind" ("skill" or "agent"), "paths" (every path
+    relative to root that reaches it, first the real one) and "cached".
+    """
+    cache = ValidationCache() if use_cache else None
+    found = [("skill", relpath) for relpath in discover_skills(root)]
+    found += [("agent", relpath) for relpath in discover_agents(root)]
+
+    index = {}
+    pending = {}
+    with span("hash", "validate", files=len(found)):
+        for kind, relpath in found:
+            real = os.path.realpath(os.path.join(root, relpath))
+            if real in index:
+                index[real]["paths"].append(relpath)
+                continue
+            digest = skill_md_digest(real) if kind == "skill" else file_digest(real)
+            key = f"{kind}:{digest}"
+            record = cache.get(key) if cache is not None and digest else None
+            index[real] = {"kind": kind, "paths": [relpath], "cached": record is not None}
+            if record is not None:
+                index[real].update(record)
+            else:
+                pending[real] = (kind, key if digest else None)
+
+    if pending:
+        jobs = [(kind, real) for real, (kind, _) in pending.items()]
+        with span("validate", "validate", files=len(jobs)):
+            if len(jobs) > 1 and workers != 1:
+                from concurrent.futures import ProcessPoolExecutor
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    records = list(executor.map(_check_worker, jobs))
+            else:
+                records = [_check_worker(job) for job in jobs]
+        for (_, real), record in zip(jobs, records):
+            key = pending[real][1]
+            if cache is not None and key:
+                cache.put(key, record)
+            index[real].update(record)
+
+    if cache is not None:
+        cache.save()
+    for entry in index.values():
+        # Report under the real file's own path when it is among the ones found
+        entry["paths"].sort(key=lambda relpath: os.path.islink(os.path.join(root, relpath)))
+    return index
+
+
+def cross_check(index, root):
+    """
+    Run the checks that need the whole index; returns {relative path: [problems]}
+    for the entries that fail them, plus broken plugin symlinks.
+    """
+    problems = {}
+    names = {}
+    descriptions = {}
+    for real, entry in index.items():
+        where = entry["paths"][0]
+        name = entry.get("name")
+        if name:
+            leaf = name.rsplit(":", 1)[-1]
+            expected = os.path.basename(real)
+            if entry["kind"] == "agent":
+                expected = os.path.splitext(expected)[0]
+            if leaf != expected:
+                problems.setdefault(where, []).append(
+                    f"Name '{name}' does not match its {'directory' if entry['kind'] == 'skill' else 'file name'} '{expected}'")
+            names.setdefault((entry["kind"], name), []).append(where)
+        description = entry.get("description")
+        if description:
+            descriptions.setdefault(" ".join(description.lower().split()), []).append(where)
+
+    for (kind, name), paths in names.items():
+        for where in paths:
+            others = ", ".join(other for other in paths if other != where)
+            if others:
+                problems.setdefault(where, []).append(f"Duplicate {kind} name '{name}' (also {others})")
+    for paths in descriptions.values():
+        for where in paths:
+            others = ", ".join(other for other in paths if other != where)
+            if others:
+                problems.setdefault(where, []).append(f"Same description as {others}")
+    for relpath, target in find_broken_links(root):
+        problems.setdefault(relpath, []).append(f"Broken symlink: {target} does not exist")
+    return problems
+
+
+def validate_all(root, workers=None, use_cache=True):
+    """
+    Validate every skill and agent under root, including the cross-file checks.
+
+    Returns a list of (relative path, kind, problems, cached) tuples sorted by
+    path; paths reached through symlinks share their target's problems, and
+    broken symlinks appear with kind "link".
+    """
+    index = build_index(root, workers, use_cache)
+    with span("cross_check", "validate", entries=len(index)):
+        extra = cross_check(index, root)
+
+    results = []
+    for entry in index.values():
+        problems = list(entry["problems"]) + extra.pop(entry["paths"][0], [])
+        for relpath in entry["paths"]:
+            results.append((relpath, entry["kind"], problems, entry["cached"]))
+    results.extend((relpath, "link", problems, False) for relpath, problems in extra.items())
+    return sorted(results)
+
+
+def main():
+    enable_from_argv(sys.argv)
+    use_cache = "--no-cache" not in sys.argv
+    if not use_cache:
+        sys.argv.remove("--no-cache")
+    workers = None
+    if "--workers" in sys.argv:
+        index = sys.argv.index("--workers")
+        value = sys.argv[index + 1] if index + 1 < len(sys.argv) else ""
+        if not value.isdigit() or int(value) < 1:
+            print("❌ Error: --workers needs a positive number")
+            sys.exit(1)
+        workers = int(value)
+        del sys.argv[index:index + 2]
+    if len(sys.argv) > 2 or any(arg.startswith('-') for arg in sys.argv[1:]):
+        print("Usage: python validate_all.py [repository-root] [--workers N] [--no-cache] [--trace[=FILE]]")
+        sys.exit(1)
+
+    root = sys.argv[1] if len(sys.argv) > 1 else "."
+    started = time.perf_counter()
+    with span("validate_all", "validate", root=root):
+        results = validate_all(root, workers, use_cache)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    invalid = [(relpath, problems) for relpath, _, problems, _ in results if problems]
+    for relpath, problems in invalid:
+        print(f"❌ {relpath}:")
+        for problem in problems:
+            print(f"   - {problem}")
+    skills = sum(1 for _, kind, _, _ in results if kind == "skill")
+    agents = sum(1 for _, kind, _, _ in results if kind == "agent")
+    links = len(results) - skills - agents
+    cached = sum(1 for *_, hit in results if hit)
+    broken = f", {links} broken links" if links else ""
+    print(f"\n🔍 {skills} skills, {agents} agents{broken}: {len(results) - len(invalid)} valid, {len(invalid)} invalid "
+          f"({cached} from cache) in {elapsed:.0f} ms")
+    sys.exit(1 if invalid else 0)
+
+
+if __name__ == "__main__":
+    main()